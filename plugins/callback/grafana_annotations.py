@@ -25,12 +25,15 @@ DOCUMENTATION = """
     author: "Rémi REY (@rrey)"
     description:
       - This callback will report start, failed and stats events to Grafana as annotations (https://grafana.com)
+      - The annotations can be sent to several Grafana instances or dashboards at once, listed in
+        C(grafana_targets_file). Each one is sent to concurrently over its own keep-alive connection.
     requirements:
       - whitelisting in configuration
     options:
       grafana_url:
-        description: Grafana annotations api URL
-        required: true
+        description:
+          - Grafana annotations api URL
+          - Required unless C(grafana_targets_file) is set.
         env:
           - name: GRAFANA_URL
         ini:
@@ -105,15 +108,146 @@ DOCUMENTATION = """
         default: []
         type: list
         elements: integer
+      grafana_dashboard_uid:
+        description: The grafana dashboard uid where the annotation shall be created.
+        env:
+          - name: GRAFANA_DASHBOARD_UID
+        ini:
+          - section: callback_grafana_annotations
+            key: grafana_dashboard_uid
+        type: string
+        version_added: "2.4.0"
+      grafana_targets_file:
+        description:
+          - Path of a YAML file listing other Grafana targets of the annotations, in addition to C(grafana_url).
+          - Each target is a dict with the keys C(url), the annotations api URL of the target, C(api_key), or
+            C(user) and C(password), C(validate_certs), C(dashboard_id), C(dashboard_uid) and C(panel_ids).
+          - The targets don't inherit the credentials of C(grafana_url), the other options apply to all of them.
+        env:
+          - name: GRAFANA_TARGETS_FILE
+        ini:
+          - section: callback_grafana_annotations
+            key: grafana_targets_file
+        type: path
+        version_added: "2.4.0"
+      queue_size:
+        description:
+          - Number of annotations waiting to be sent to Grafana above which the new annotations are dropped.
+          - The annotations are sent by a background thread over a single keep-alive connection, so that a slow
+            or unreachable Grafana doesn't slow down the playbook.
+        env:
+          - name: GRAFANA_QUEUE_SIZE
+        ini:
+          - section: callback_grafana_annotations
+            key: queue_size
+        default: 1000
+        type: integer
+        version_added: "2.4.0"
+      drain_timeout:
+        description:
+          - Number of seconds to wait at the end of the playbook for the queued annotations to be sent.
+          - The annotations still queued after that are dropped, or spooled when C(spool_dir) is set.
+        env:
+          - name: GRAFANA_DRAIN_TIMEOUT
+        ini:
+          - section: callback_grafana_annotations
+            key: drain_timeout
+        default: 10
+        type: float
+        version_added: "2.4.0"
+      failure_window:
+        description:
+          - Number of seconds during which the failures of a task are gathered in a single annotation listing the
+            failed hosts, C(0) sends one annotation per failure.
+          - The annotation is sent once the window since the first failure of the task has passed, or at the end
+            of the playbook.
+        env:
+          - name: GRAFANA_FAILURE_WINDOW
+        ini:
+          - section: callback_grafana_annotations
+            key: failure_window
+        default: 0
+        type: float
+        version_added: "2.4.0"
+      failure_max_hosts:
+        description:
+          - Maximum number of hosts listed in an annotation gathering failures, the other ones are only counted.
+        env:
+          - name: GRAFANA_FAILURE_MAX_HOSTS
+        ini:
+          - section: callback_grafana_annotations
+            key: failure_max_hosts
+        default: 20
+        type: integer
+        version_added: "2.4.0"
+      max_annotations:
+        description:
+          - Maximum number of failure annotations sent during a playbook run, C(0) for no limit.
+          - The annotations of the start and of the end of the playbook are always sent.
+        env:
+          - name: GRAFANA_MAX_ANNOTATIONS
+        ini:
+          - section: callback_grafana_annotations
+            key: max_annotations
+        default: 0
+        type: integer
+        version_added: "2.4.0"
+      spool_dir:
+        description:
+          - Directory where the annotations which couldn't be sent to Grafana are kept, to be sent at the start of
+            the next run.
+          - The annotations are tagged with an C(ansible_id:) key, so that an annotation created by Grafana
+            despite the error isn't created again.
+          - Without spool, the annotations which couldn't be sent are lost.
+        env:
+          - name: GRAFANA_SPOOL_DIR
+        ini:
+          - section: callback_grafana_annotations
+            key: spool_dir
+        type: path
+        version_added: "2.4.0"
+      slow_task_threshold:
+        description:
+          - Number of seconds above which a task is reported by a region annotation spanning its run, C(0) disables
+            these annotations.
+          - The durations of the plays and of the slowest tasks are reported in the annotation of the end of the
+            playbook in any case.
+        env:
+          - name: GRAFANA_SLOW_TASK_THRESHOLD
+        ini:
+          - section: callback_grafana_annotations
+            key: slow_task_threshold
+        default: 0
+        type: float
+        version_added: "2.4.0"
 """
 
+import errno
+import glob
+import hashlib
 import json
+import math
+import os
 import socket
 import getpass
+import ssl
+import threading
+import time
+import uuid
+import yaml
+from collections import OrderedDict
 from datetime import datetime
 
-from ansible.module_utils._text import to_text
-from ansible.module_utils.urls import open_url
+from ansible.module_utils._text import to_bytes, to_native, to_text
+from ansible.module_utils.six.moves import http_client, queue
+from ansible.module_utils.six.moves.urllib.parse import (
+    unquote,
+    urlencode,
+    urlsplit,
+    urlunsplit,
+)
+from ansible.module_utils.six.moves.urllib.request import getproxies, proxy_bypass
+from ansible.module_utils.urls import basic_auth_header
 from ansible.plugins.callback import CallbackBase
 
 
@@ -135,6 +269,21 @@ By user '{username}'
 debug: {result}
 """
 
+PLAYBOOK_FAILURES_TXT = """\
+Playbook {playbook} Failure !
+
+From '{hostname}'
+By user '{username}'
+
+'{task}' failed on {count} hosts: {hosts}
+
+debug ({host}): {result}
+"""
+
+# length above which the result of the first failure of an aggregated
+# annotation is truncated
+MAX_RESULT_LENGTH = 2000
+
 PLAYBOOK_STATS_TXT = """\
 Playbook {playbook}
 Duration: {duration}
@@ -145,11 +294,406 @@ By user '{username}'
 
 Result:
 {summary}
+{timing}"""
+
+PLAYBOOK_SLOW_TASK_TXT = """\
+Playbook {playbook} slow task
+
+'{task}' of play '{play}' took {duration:.3f}s
+p50 {p50:.3f}s, p95 {p95:.3f}s on {count} hosts
 """
 
+# number of tasks listed in the timing summary of the end of the playbook
+TIMING_SUMMARY_TASKS = 10
+
+
+# tag prefix of the key identifying an annotation sent again from the spool
+IDEMPOTENCY_TAG = "ansible_id:"
+# number of lines written to the spool between two syncs to the disk
+SPOOL_SYNC_LINES = 50
+# number of seconds during which the annotations are spooled after a failure
+SPOOL_RETRY_INTERVAL = 30
+
 
 def to_millis(dt):
-    return int(dt.strftime("%s")) * 1000
+    return int(time.mktime(dt.timetuple())) * 1000 + dt.microsecond // 1000
+
+
+def load_targets(path):
+    """Return the Grafana targets listed in the YAML file."""
+    with open(path) as f:
+        targets = yaml.safe_load(f)
+    if not isinstance(targets, list):
+        raise ValueError("the targets must be a list")
+    for target in targets:
+        if not isinstance(target, dict) or not target.get("url"):
+            raise ValueError("each target must be a dict with an url")
+    return targets
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of the values."""
+    values = sorted(values)
+    rank = int(math.ceil(percent / 100.0 * len(values)))
+    return values[max(rank, 1) - 1]
+
+
+def truncate(text, length):
+    if len(text) <= length:
+        return text
+    return text[: length - 3] + "..."
+
+
+class GrafanaAnnotationError(Exception):
+    def __init__(self, message, temporary=False):
+        super(GrafanaAnnotationError, self).__init__(message)
+        # whether sending the annotation later may succeed
+        self.temporary = temporary
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as e:
+        return e.errno != errno.ESRCH
+    return True
+
+
+class GrafanaAnnotationSpool(object):
+    """Append only file of the annotations which couldn't be sent.
+
+    The annotations are written one JSON document per line, and the file is
+    synced every SPOOL_SYNC_LINES lines and when the sender runs out of
+    annotations. At the start of a run, the file is renamed to a replay file
+    of the process, which is deleted once its annotations are sent again.
+    """
+
+    def __init__(self, directory, name):
+        self.directory = directory
+        self.path = os.path.join(directory, "%s.jsonl" % name)
+        self.lock = threading.Lock()
+        self.file = None
+        self.closed = False
+        self.unsynced = 0
+        self.count = 0
+        self.replay_files = []
+
+    def append(self, annotation):
+        """Append the annotation, return False when the spool is already closed."""
+        with self.lock:
+            # the file wouldn't be synced anymore
+            if self.closed:
+                return False
+            if self.file is None:
+                if not os.path.isdir(self.directory):
+                    os.makedirs(self.directory, 0o700)
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+                self.file = os.fdopen(fd, "a")
+            self.file.write(json.dumps(annotation, sort_keys=True) + "\n")
+            self.count += 1
+            self.unsynced += 1
+            if self.unsynced >= SPOOL_SYNC_LINES:
+                self._sync()
+            return True
+
+    def sync(self):
+        with self.lock:
+            self._sync()
+
+    def _sync(self):
+        if self.file is not None and self.unsynced:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self._sync()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def claim(self):
+        """Return the spooled annotations of the previous runs, in time order.
+
+        The replay files left by the runs which died before sending them are
+        claimed as well, the annotations are only returned once per
+        idempotency key.
+        """
+        replay_file = "%s.replay-%d" % (self.path, os.getpid())
+        try:
+            os.rename(self.path, replay_file)
+            self.replay_files.append(replay_file)
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        for leftover in glob.glob("%s.replay-*" % glob.escape(self.path)):
+            pid = leftover.rsplit("-", 1)[1]
+            if pid.isdigit() and not pid_alive(int(pid)):
+                self.replay_files.append(leftover)
+
+        annotations = OrderedDict()
+        for replay_file in self.replay_files:
+            with open(replay_file) as f:
+                for line in f:
+                    try:
+                        annotation = json.loads(line)
+                    except ValueError:
+                        # the last line of a run which died while writing it
+                        continue
+                    annotations.setdefault(idempotency_key(annotation), annotation)
+        return sorted(annotations.values(), key=lambda annotation: annotation["time"])
+
+    def forget_replayed(self):
+        for replay_file in self.replay_files:
+            os.remove(replay_file)
+        self.replay_files = []
+
+
+def idempotency_key(annotation):
+    return next(
+        (tag for tag in annotation["tags"] if tag.startswith(IDEMPOTENCY_TAG)), None
+    )
+
+
+class GrafanaAnnotationSender(object):
+    """Post the annotations of a bounded queue from a background thread.
+
+    The annotations are posted one after the other over a single keep-alive
+    connection, the callbacks only queue them and never wait for Grafana.
+
+    With a spool directory, the annotations which can't be sent because
+    Grafana is unreachable, or which don't fit in the queue, are appended to
+    the spool and replayed by the next run. Each annotation is tagged with an
+    idempotency key, a replayed annotation already created by Grafana is
+    skipped. After a failure, Grafana is left alone for SPOOL_RETRY_INTERVAL
+    seconds and the annotations go straight to the spool.
+
+    Like open_url, the proxy of the http_proxy or https_proxy environment
+    variable is used unless no_proxy matches Grafana. HTTPS requests are
+    tunneled through the proxy with CONNECT.
+    """
+
+    def __init__(
+        self,
+        url,
+        headers,
+        validate_certs=True,
+        queue_size=1000,
+        timeout=10,
+        spool_dir=None,
+    ):
+        self.grafana_url = url
+        self.url = urlsplit(url)
+        self.path = urlunsplit(("", "", self.url.path or "/", self.url.query, ""))
+        self.headers = headers
+        self.proxy = self._proxy()
+        self.proxy_headers = {}
+        if self.proxy is not None and self.proxy.username:
+            # set_tunnel formats the headers as text
+            self.proxy_headers["Proxy-Authorization"] = to_native(
+                basic_auth_header(
+                    unquote(self.proxy.username), unquote(self.proxy.password or "")
+                )
+            )
+        if self.proxy is not None and self.url.scheme != "https":
+            # a plain HTTP proxy gets the absolute URL in the request line
+            origin = urlunsplit((self.url.scheme, self.url.netloc, "", "", ""))
+            self.path = origin + self.path
+            self.headers = dict(headers, **self.proxy_headers)
+        self.validate_certs = validate_certs
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.connection = None
+        self.thread = None
+        self.dropped = 0
+        self.failed = 0
+        self.last_error = None
+        self.spool = None
+        if spool_dir:
+            name = hashlib.sha256(to_bytes(url)).hexdigest()[:16]
+            self.spool = GrafanaAnnotationSpool(spool_dir, "annotations-%s" % name)
+        self.unavailable_until = 0
+        # number of replayed annotations neither sent nor spooled again yet
+        self.replaying = 0
+        self.replaying_lock = threading.Lock()
+
+    def put(self, annotation, replayed=False):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="grafana_annotations")
+            self.thread.daemon = True
+            self.thread.start()
+        if self.spool is not None and not replayed:
+            annotation = dict(
+                annotation,
+                tags=annotation.get("tags", []) + [IDEMPOTENCY_TAG + uuid.uuid4().hex],
+            )
+        try:
+            self.queue.put_nowait((annotation, replayed))
+        except queue.Full:
+            if self.spool is None:
+                self.dropped += 1
+                return
+            self._spool(annotation)
+            return
+        if replayed:
+            self._replayed(1)
+
+    def replay(self):
+        """Queue the annotations spooled by the previous runs."""
+        if self.spool is None:
+            return
+        for annotation in self.spool.claim():
+            self.put(annotation, replayed=True)
+
+    def drain(self, timeout):
+        """Wait up to timeout seconds for the queued annotations to be sent.
+
+        The annotations still queued after the deadline are spooled, or
+        counted as dropped without spool, and the thread, a daemon one, is
+        left behind. The spool is closed, so the annotation being posted is
+        counted as dropped if its post fails afterwards.
+        """
+        if self.thread is None:
+            return
+        deadline = time.time() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self.queue.all_tasks_done.wait(remaining)
+            unsent = self.queue.unfinished_tasks
+        if unsent and self.spool is not None:
+            while True:
+                try:
+                    annotation, replayed = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._spool(annotation)
+                if replayed:
+                    self._replayed(-1)
+        elif unsent:
+            self.dropped += unsent
+        if not unsent or self.spool is not None:
+            # stop the thread, which closes the connection
+            self.queue.put_nowait(None)
+        if self.spool is not None:
+            self.spool.close()
+            # the annotation being sent when the deadline passed is replayed
+            if not self.replaying:
+                self.spool.forget_replayed()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    self._close()
+                    return
+                self._send(*item)
+            except Exception as e:
+                self.failed += 1
+                self.last_error = to_text(e)
+            finally:
+                self.queue.task_done()
+            if self.spool is not None and self.queue.empty():
+                self.spool.sync()
+
+    def _send(self, annotation, replayed):
+        try:
+            if self.spool is not None and time.time() < self.unavailable_until:
+                self._spool(annotation)
+            elif not (replayed and self._exists(annotation)):
+                self._post(annotation)
+        except GrafanaAnnotationError as e:
+            if self.spool is None or not e.temporary:
+                raise
+            self.unavailable_until = time.time() + SPOOL_RETRY_INTERVAL
+            self.last_error = to_text(e)
+            self._spool(annotation)
+        finally:
+            if replayed:
+                self._replayed(-1)
+
+    def _spool(self, annotation):
+        # the spool is closed by drain while an annotation may still be posted
+        if not self.spool.append(annotation):
+            self.dropped += 1
+
+    def _replayed(self, count):
+        with self.replaying_lock:
+            self.replaying += count
+
+    def _proxy(self):
+        """Return the split URL of the proxy of the environment, None without proxy."""
+        proxy = getproxies().get(self.url.scheme)
+        if not proxy or proxy_bypass(self.url.hostname):
+            return None
+        if "://" not in proxy:
+            proxy = "http://" + proxy
+        return urlsplit(proxy)
+
+    def _connect(self):
+        host, port = self.url.hostname, self.url.port
+        if self.proxy is not None:
+            host, port = self.proxy.hostname, self.proxy.port
+        if self.url.scheme == "https":
+            context = ssl.create_default_context()
+            if not self.validate_certs:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            connection = http_client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=context
+            )
+            if self.proxy is not None:
+                # TLS is negotiated with Grafana once the tunnel is open
+                connection.set_tunnel(
+                    self.url.hostname, self.url.port, self.proxy_headers
+                )
+            return connection
+        return http_client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _request(self, method, path, body=None):
+        # a keep-alive connection closed by Grafana only fails on its next use
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self._connect()
+            try:
+                self.connection.request(method, path, body, self.headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (http_client.HTTPException, socket.error) as e:
+                self._close()
+                if attempt:
+                    raise GrafanaAnnotationError(to_text(e), temporary=True)
+        if response.status >= 400:
+            raise GrafanaAnnotationError(
+                "Grafana answered with HTTP %d %s" % (response.status, response.reason),
+                temporary=response.status == 429 or response.status >= 500,
+            )
+        return content
+
+    def _post(self, annotation):
+        self._request("POST", self.path, json.dumps(annotation))
+
+    def _exists(self, annotation):
+        """Return whether Grafana has the annotation with the idempotency key of the annotation."""
+        params = [("tags", idempotency_key(annotation)), ("limit", 1)]
+        params.extend(
+            (name, annotation[name])
+            for name in ("dashboardId", "dashboardUID", "panelId")
+            if name in annotation
+        )
+        path = "%s?%s" % (self.path.partition("?")[0], urlencode(params))
+        return bool(json.loads(self._request("GET", path)))
 
 
 class CallbackModule(CallbackBase):
@@ -169,12 +713,23 @@ class CallbackModule(CallbackBase):
     def __init__(self, display=None):
         super(CallbackModule, self).__init__(display=display)
 
-        self.headers = {"Content-Type": "application/json"}
-        self.force_basic_auth = False
+        # sender, dashboard fields and panel ids of each Grafana target
+        self.targets = []
         self.hostname = socket.gethostname()
         self.username = getpass.getuser()
         self.start_time = datetime.now()
         self.errors = 0
+        # pending failures of the tasks, by task uuid
+        self.failures = OrderedDict()
+        self.annotations = 0
+        self.suppressed = 0
+        # name, start and end of the plays
+        self.plays = []
+        self.play = None
+        # timings of the running tasks, by task uuid
+        self.tasks = OrderedDict()
+        # name, play and host durations of the finished tasks
+        self.task_durations = []
 
     def set_options(self, task_keys=None, var_options=None, direct=None):
         super(CallbackModule, self).set_options(
@@ -189,23 +744,79 @@ class CallbackModule(CallbackBase):
         self.grafana_password = self.get_option("grafana_password")
         self.dashboard_id = self.get_option("grafana_dashboard_id")
         self.panel_ids = self.get_option("grafana_panel_ids")
+        self.drain_timeout = self.get_option("drain_timeout")
+        self.failure_window = self.get_option("failure_window")
+        self.failure_max_hosts = self.get_option("failure_max_hosts")
+        self.max_annotations = self.get_option("max_annotations")
+        self.slow_task_threshold = self.get_option("slow_task_threshold")
 
-        if self.grafana_api_key:
-            self.headers["Authorization"] = "Bearer %s" % self.grafana_api_key
-        else:
-            self.force_basic_auth = True
+        targets = []
+        if self.grafana_url is not None:
+            targets.append(
+                {
+                    "url": self.grafana_url,
+                    "api_key": self.grafana_api_key,
+                    "user": self.grafana_user,
+                    "password": self.grafana_password,
+                    "dashboard_id": self.dashboard_id,
+                    "dashboard_uid": self.get_option("grafana_dashboard_uid"),
+                    "panel_ids": self.panel_ids,
+                }
+            )
+        targets_file = self.get_option("grafana_targets_file")
+        if targets_file:
+            try:
+                targets.extend(load_targets(targets_file))
+            except (IOError, OSError, ValueError, yaml.YAMLError) as e:
+                self.disabled = True
+                self._display.warning(
+                    "Could not read the Grafana targets of %s: %s"
+                    % (targets_file, to_native(e))
+                )
+                return
 
-        if self.grafana_url is None:
+        if not targets:
             self.disabled = True
             self._display.warning(
                 "Grafana URL was not provided. The "
                 "Grafana URL can be provided using "
                 "the `GRAFANA_URL` environment variable."
             )
-        self._display.debug("Grafana URL: %s" % self.grafana_url)
+        for target in targets:
+            self.targets.append(self._target(target))
+            self._display.debug("Grafana URL: %s" % target["url"])
+
+    def _target(self, target):
+        headers = {"Content-Type": "application/json", "User-Agent": self.http_agent}
+        if target.get("api_key"):
+            headers["Authorization"] = "Bearer %s" % target["api_key"]
+        elif target.get("user"):
+            headers["Authorization"] = basic_auth_header(
+                target["user"], target.get("password")
+            )
+        dashboard = {}
+        if target.get("dashboard_id"):
+            dashboard["dashboardId"] = int(target["dashboard_id"])
+        if target.get("dashboard_uid"):
+            dashboard["dashboardUID"] = target["dashboard_uid"]
+        return {
+            "sender": GrafanaAnnotationSender(
+                target["url"],
+                headers,
+                validate_certs=target.get(
+                    "validate_certs", self.validate_grafana_certs
+                ),
+                queue_size=self.get_option("queue_size"),
+                spool_dir=self.get_option("spool_dir"),
+            ),
+            "dashboard": dashboard,
+            "panel_ids": [int(panel_id) for panel_id in target.get("panel_ids") or []],
+        }
 
     def v2_playbook_on_start(self, playbook):
         self.playbook = playbook._file_name
+        for target in self.targets:
+            target["sender"].replay()
         text = PLAYBOOK_START_TXT.format(
             playbook=self.playbook, hostname=self.hostname, username=self.username
         )
@@ -216,7 +827,46 @@ class CallbackModule(CallbackBase):
         }
         self._send_annotation(data)
 
+    def v2_playbook_on_play_start(self, play):
+        now = time.time()
+        self._finish_play(now)
+        self.play = to_text(play.get_name())
+        self.plays.append([self.play, now, None])
+
+    def v2_playbook_on_task_start(self, task, is_conditional):
+        now = time.time()
+        self._flush_failures(now)
+        self._finish_tasks()
+        if task._uuid not in self.tasks:
+            self.tasks[task._uuid] = {
+                "task": to_text(task.get_name()),
+                "play": self.play,
+                "start": now,
+                "end": now,
+                "running": {},
+                "durations": [],
+            }
+
+    v2_playbook_on_handler_task_start = v2_playbook_on_task_start
+
+    def v2_runner_on_start(self, host, task):
+        timing = self.tasks.get(task._uuid)
+        if timing is not None:
+            timing["running"][host.name] = time.time()
+
+    def v2_runner_on_ok(self, result, **kwargs):
+        self._task_done(result)
+
+    def v2_runner_on_skipped(self, result, **kwargs):
+        self._task_done(result)
+
+    def v2_runner_on_unreachable(self, result, **kwargs):
+        self._task_done(result)
+
     def v2_playbook_on_stats(self, stats):
+        self._flush_failures()
+        self._finish_tasks(everything=True)
+        self._finish_play(time.time())
         end_time = datetime.now()
         duration = end_time - self.start_time
         summarize_stat = {}
@@ -234,6 +884,7 @@ class CallbackModule(CallbackBase):
             status=status,
             username=self.username,
             summary=json.dumps(summarize_stat),
+            timing=self._timing_summary(),
         )
 
         data = {
@@ -243,49 +894,205 @@ class CallbackModule(CallbackBase):
             "text": text,
             "tags": ["ansible", "ansible_report", self.playbook, self.hostname],
         }
-        self._send_annotations(data)
+        self._send_annotations(data, capped=False)
+
+        # the targets are drained concurrently by their threads
+        deadline = time.time() + self.drain_timeout
+        for target in self.targets:
+            sender = target["sender"]
+            sender.drain(max(deadline - time.time(), 0))
+            if sender.failed:
+                self._display.warning(
+                    "Could not submit %d annotations to %s: %s"
+                    % (sender.failed, sender.grafana_url, sender.last_error)
+                )
+            if sender.dropped:
+                self._display.warning(
+                    "%d annotations were not sent to %s, the queue was full or "
+                    "Grafana didn't answer before the drain timeout"
+                    % (sender.dropped, sender.grafana_url)
+                )
+            if sender.spool is not None and sender.spool.count:
+                self._display.warning(
+                    "%d annotations were spooled to %s, they will be sent by the "
+                    "next run" % (sender.spool.count, sender.spool.path)
+                )
+        if self.suppressed:
+            self._display.warning(
+                "%d failure annotations were not sent to Grafana, above "
+                "max_annotations" % self.suppressed
+            )
 
     def v2_runner_on_failed(self, result, ignore_errors=False, **kwargs):
-        text = PLAYBOOK_ERROR_TXT.format(
-            playbook=self.playbook,
-            hostname=self.hostname,
-            username=self.username,
-            task=result._task,
-            host=result._host.name,
-            result=self._dump_results(result._result),
-        )
+        self._task_done(result)
         if ignore_errors:
             return
-        data = {
+        self.errors += 1
+        failure = {
+            "task": to_text(result._task),
+            "host": result._host.name,
+            "result": self._dump_results(result._result),
             "time": to_millis(datetime.now()),
+        }
+        if not self.failure_window:
+            self._send_annotations(self._failure_annotation(failure, [failure["host"]]))
+            return
+
+        now = time.time()
+        self._flush_failures(now)
+        pending = self.failures.get(result._task._uuid)
+        if pending is None:
+            pending = self.failures[result._task._uuid] = dict(
+                failure, start=now, hosts=[]
+            )
+        pending["hosts"].append(failure["host"])
+        pending["timeEnd"] = failure["time"]
+
+    def _finish_play(self, now):
+        if self.plays and self.plays[-1][2] is None:
+            self.plays[-1][2] = now
+
+    def _task_done(self, result):
+        timing = self.tasks.get(result._task._uuid)
+        if timing is None:
+            return
+        now = time.time()
+        start = timing["running"].pop(result._host.name, timing["start"])
+        timing["durations"].append(now - start)
+        timing["end"] = now
+
+    def _finish_tasks(self, everything=False):
+        """Record the durations of the tasks which don't run on any host anymore.
+
+        A region annotation is sent for the ones longer than slow_task_threshold.
+        """
+        for task_uuid, timing in list(self.tasks.items()):
+            if timing["running"] and not everything:
+                continue
+            del self.tasks[task_uuid]
+            if not timing["durations"]:
+                continue
+            self.task_durations.append(
+                (timing["task"], timing["play"], timing["durations"])
+            )
+            duration = timing["end"] - timing["start"]
+            if self.slow_task_threshold and duration >= self.slow_task_threshold:
+                text = PLAYBOOK_SLOW_TASK_TXT.format(
+                    playbook=self.playbook,
+                    task=timing["task"],
+                    play=timing["play"],
+                    duration=duration,
+                    p50=percentile(timing["durations"], 50),
+                    p95=percentile(timing["durations"], 95),
+                    count=len(timing["durations"]),
+                )
+                data = {
+                    "time": int(timing["start"] * 1000),
+                    "timeEnd": int(timing["end"] * 1000),
+                    "isRegion": True,
+                    "text": text,
+                    "tags": [
+                        "ansible",
+                        "ansible_slow_task",
+                        self.playbook,
+                        self.hostname,
+                    ],
+                }
+                self._send_annotations(data, capped=False)
+
+    def _timing_summary(self):
+        """Return the durations of the plays and of the slowest tasks by p95."""
+        lines = []
+        if self.plays:
+            lines.append("")
+            lines.append("Plays:")
+            for name, start, end in self.plays:
+                lines.append("  %s: %.3fs" % (name, end - start))
+        slowest = sorted(
+            (
+                (
+                    percentile(durations, 95),
+                    percentile(durations, 50),
+                    task,
+                    play,
+                    len(durations),
+                )
+                for task, play, durations in self.task_durations
+            ),
+            key=lambda timing: timing[0],
+            reverse=True,
+        )[:TIMING_SUMMARY_TASKS]
+        if slowest:
+            lines.append("")
+            lines.append("Slowest tasks (p50/p95 across hosts):")
+            for p95, p50, task, play, count in slowest:
+                lines.append(
+                    "  [%s] %s: %.3fs/%.3fs on %d hosts" % (play, task, p50, p95, count)
+                )
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _flush_failures(self, now=None):
+        """Send the pending failures whose window has passed, all of them without now."""
+        for task_uuid, pending in list(self.failures.items()):
+            if now is None or now - pending["start"] >= self.failure_window:
+                del self.failures[task_uuid]
+                self._send_annotations(
+                    self._failure_annotation(pending, pending["hosts"])
+                )
+
+    def _failure_annotation(self, failure, hosts):
+        """Return the annotation of the failures of a task on the hosts.
+
+        The result is the one of the first failure, the hosts above
+        failure_max_hosts are only counted.
+        """
+        if len(hosts) == 1:
+            text = PLAYBOOK_ERROR_TXT.format(
+                playbook=self.playbook,
+                hostname=self.hostname,
+                username=self.username,
+                task=failure["task"],
+                host=hosts[0],
+                result=failure["result"],
+            )
+        else:
+            listed = ", ".join(hosts[: self.failure_max_hosts])
+            if len(hosts) > self.failure_max_hosts:
+                listed += " and %d more" % (len(hosts) - self.failure_max_hosts)
+            text = PLAYBOOK_FAILURES_TXT.format(
+                playbook=self.playbook,
+                hostname=self.hostname,
+                username=self.username,
+                task=failure["task"],
+                count=len(hosts),
+                hosts=listed,
+                host=failure["host"],
+                result=truncate(failure["result"], MAX_RESULT_LENGTH),
+            )
+        data = {
+            "time": failure["time"],
             "text": text,
             "tags": ["ansible", "ansible_event_failure", self.playbook, self.hostname],
         }
-        self.errors += 1
-        self._send_annotations(data)
-
-    def _send_annotations(self, data):
-        if self.dashboard_id:
-            data["dashboardId"] = int(self.dashboard_id)
-        if self.panel_ids:
-            for panel_id in self.panel_ids:
-                data["panelId"] = int(panel_id)
-                self._send_annotation(data)
-        else:
-            self._send_annotation(data)
+        if failure.get("timeEnd", failure["time"]) > failure["time"]:
+            data.update(timeEnd=failure["timeEnd"], isRegion=True)
+        return data
+
+    def _send_annotations(self, data, capped=True):
+        if capped and self.max_annotations:
+            if self.annotations >= self.max_annotations:
+                self.suppressed += 1
+                return
+            self.annotations += 1
+        for target in self.targets:
+            # the queued annotations must not share the same dict
+            annotation = dict(data, **target["dashboard"])
+            if target["panel_ids"]:
+                for panel_id in target["panel_ids"]:
+                    target["sender"].put(dict(annotation, panelId=panel_id))
+            else:
+                target["sender"].put(annotation)
 
     def _send_annotation(self, annotation):
-        try:
-            open_url(
-                self.grafana_url,
-                data=json.dumps(annotation),
-                headers=self.headers,
-                method="POST",
-                validate_certs=self.validate_grafana_certs,
-                url_username=self.grafana_user,
-                url_password=self.grafana_password,
-                http_agent=self.http_agent,
-                force_basic_auth=self.force_basic_auth,
-            )
-        except Exception as e:
-            self._display.error("Could not submit message to Grafana: %s" % to_text(e))
+        for target in self.targets:
+            target["sender"].put(annotation)
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r"""options:
+  session_cache:
+    description:
+      - Path of a file caching the Grafana sessions of the basic auth users, on the host running the module.
+      - When set, the module logs in once with C(url_username) and C(url_password) and authenticates its requests with
+        the session cookie, which is reused by the following runs until it expires. Grafana then verifies the password
+        once instead of on every request.
+      - The module falls back to basic auth when the session is rejected.
+      - The file and the lock file next to it are created only readable by their owner.
+      - Not used when C(grafana_api_key) is set.
+    type: path
+    version_added: "2.4.0"
+    """
@@ -0,0 +1,255 @@
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+name: grafana_api
+author:
+  - community.grafana maintainers (@ansible-collections)
+version_added: "2.4.0"
+short_description: query the read-only endpoints of the Grafana API
+description:
+  - This lookup returns the response of GET requests to the Grafana API, one per term.
+  - The known paginated endpoints are requested page by page and their items returned in a single list.
+options:
+  _terms:
+    description: paths of the Grafana API endpoints, for example C(/api/datasources).
+    required: true
+  grafana_url:
+    description: url of grafana.
+    env:
+      - name: GRAFANA_URL
+    default: http://127.0.0.1:3000
+  grafana_api_key:
+    description:
+      - Grafana API key.
+      - When C(grafana_api_key) is set, the options C(grafana_user), C(grafana_password) and C(grafana_org_id) are ignored.
+    env:
+      - name: GRAFANA_API_KEY
+  grafana_user:
+    description: grafana authentication user.
+    env:
+      - name: GRAFANA_USER
+    default: admin
+  grafana_password:
+    description:  grafana authentication password.
+    env:
+      - name: GRAFANA_PASSWORD
+    default: admin
+  grafana_org_id:
+    description: grafana organisation id.
+    env:
+      - name: GRAFANA_ORG_ID
+    default: 1
+  params:
+    description: query parameters of the requests.
+    type: dict
+    default: {}
+  query:
+    description:
+      - JMESPath expression applied to each response, the whole response is returned when not set.
+      - Requires the C(jmespath) python library on the controller.
+    type: str
+  page_size:
+    description:
+      - Number of items requested at a time from the paginated endpoints.
+      - Grafana caps the number of results of a page of C(/api/search) to 5000, a larger value is lowered to 5000 for
+        this endpoint.
+    type: int
+    default: 1000
+  validate_certs:
+    description: flag to control SSL certificate validation
+    type: boolean
+    default: true
+  ca_path:
+    description: string of the file system path to CA cert bundle to use for validation
+    type: string
+  cache_ttl:
+    description:
+      - Number of seconds during which the response of the same request with the same credentials is reused,
+        C(0) disables the cache.
+      - The results are kept in memory and on disk, in C(cache_path).
+      - Set it to C(0) to see the changes made by the previous tasks of the play.
+    type: int
+    default: 3600
+    env:
+      - name: GRAFANA_CACHE_TTL
+  cache_path:
+    description:
+      - Directory where the cached results are stored, so that they are shared between the forks and the runs of
+        ansible on the controller.
+      - The directory and the files it contains are created only readable by their owner.
+      - When not set, the results are stored in the temporary directory of ansible on the controller, which is
+        removed at the end of the run. They are shared by all the hosts of the play but not between the runs.
+    type: path
+    env:
+      - name: GRAFANA_CACHE_PATH
+"""
+
+EXAMPLES = """
+- name: get the uid of a datasource once for all the hosts
+  set_fact:
+    prometheus_uid: "{{ lookup('community.grafana.grafana_api', '/api/datasources/name/Prometheus', query='uid') }}"
+
+- name: get the uid of a datasource once for all the runs of the next 5 minutes
+  set_fact:
+    prometheus_uid: "{{ lookup('community.grafana.grafana_api', '/api/datasources/name/Prometheus', query='uid', cache_ttl=300, cache_path='~/.ansible/grafana_cache') }}"
+
+- name: get the folders created by the previous tasks
+  set_fact:
+    folder_uids: "{{ lookup('community.grafana.grafana_api', '/api/folders', query='[].uid', cache_ttl=0) }}"
+
+- name: get the uids of the folders by title
+  set_fact:
+    folder_uids: "{{ lookup('community.grafana.grafana_api', '/api/folders', query='[].[title, uid]') | community.general.dict }}"
+
+- name: get the id of a team
+  set_fact:
+    ops_team_id: "{{ lookup('community.grafana.grafana_api', '/api/teams/search', params={'name': 'ops'}, query='[0].id') }}"
+"""
+
+RETURN = """
+_raw:
+  description: the responses of the endpoints, or the results of C(query), one per term.
+  type: list
+  elements: raw
+"""
+
+import os
+
+from ansible import constants as C
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+from ansible.module_utils._text import to_native
+from ansible.module_utils.six.moves.urllib.parse import parse_qsl, urlsplit
+from ansible.utils.display import Display
+from ansible_collections.community.grafana.plugins.plugin_utils.base import (
+    MISSING,
+    SEARCH_PAGE_LIMIT,
+    GrafanaAPIException,
+    GrafanaClient,
+    GrafanaResultCache,
+)
+
+try:
+    import jmespath
+
+    HAS_JMESPATH = True
+except ImportError:
+    HAS_JMESPATH = False
+
+display = Display()
+
+# paginated endpoints with their page size parameter, the key of their items
+# and the largest page returned by Grafana
+PAGINATED_ENDPOINTS = {
+    "/api/search": ("limit", None, SEARCH_PAGE_LIMIT),
+    "/api/folders": ("limit", None, None),
+    "/api/orgs": ("perpage", None, None),
+    "/api/users": ("perpage", None, None),
+    "/api/users/search": ("perpage", "users", None),
+    "/api/org/users/search": ("perpage", "orgUsers", None),
+    "/api/teams/search": ("perpage", "teams", None),
+    "/api/serviceaccounts/search": ("perpage", "serviceAccounts", None),
+}
+
+
+def query_params(params):
+    """Return the query parameters as pairs, one per value of the lists."""
+    pairs = []
+    for name, values in sorted(params.items()):
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        for value in values:
+            if isinstance(value, bool):
+                value = str(value).lower()
+            pairs.append((name, to_native(value)))
+    return pairs
+
+
+def grafana_query(api, headers, path, params, page_size):
+    """Return the response of the endpoint, all the items of paginated ones."""
+    if path not in PAGINATED_ENDPOINTS:
+        return api.grafana_get(path, params, headers, "query %s" % path)
+
+    size_param, items_key, max_page_size = PAGINATED_ENDPOINTS[path]
+    # a larger page would be truncated by Grafana and taken for the last one
+    if max_page_size:
+        page_size = min(page_size, max_page_size)
+    params = [param for param in params if param[0] not in (size_param, "page")]
+    items = []
+    page = 1
+    while True:
+        response = api.grafana_get(
+            path,
+            params + [(size_param, page_size), ("page", page)],
+            headers,
+            "query %s" % path,
+        )
+        page_items = (response.get(items_key) or []) if items_key else response
+        items.extend(page_items)
+        if len(page_items) < page_size:
+            return items
+        page += 1
+
+
+class LookupModule(LookupBase):
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        query = self.get_option("query")
+        if query and not HAS_JMESPATH:
+            raise AnsibleError(
+                "the query option of the grafana_api lookup requires the jmespath python library"
+            )
+
+        grafana = GrafanaClient(
+            validate_certs=self.get_option("validate_certs"),
+            ca_path=self.get_option("ca_path"),
+            **dict(
+                (name, self.get_option(name))
+                for name in (
+                    "grafana_url",
+                    "grafana_api_key",
+                    "grafana_user",
+                    "grafana_password",
+                    "grafana_org_id",
+                )
+                if self.get_option(name) is not None
+            )
+        )
+        # the temporary directory of the run is shared by the forks of all the hosts
+        cache = GrafanaResultCache(
+            self.get_option("cache_ttl"),
+            self.get_option("cache_path")
+            or os.path.join(C.DEFAULT_LOCAL_TMP, "grafana_api_cache"),
+        )
+        page_size = self.get_option("page_size")
+        headers = None
+
+        ret = []
+        for term in terms:
+            url = urlsplit(term)
+            params = parse_qsl(url.query) + query_params(self.get_option("params"))
+            key = GrafanaResultCache.key(
+                grafana.cache_identity(), url.path, params, query
+            )
+            result = cache.get(key)
+            if result is MISSING:
+                try:
+                    # the organization is switched once, on the first request
+                    if headers is None:
+                        headers = grafana.grafana_headers()
+                    result = grafana_query(
+                        grafana, headers, url.path, params, page_size
+                    )
+                except GrafanaAPIException as e:
+                    raise AnsibleError(to_native(e))
+                if query:
+                    result = jmespath.search(query, result)
+                cache.set(key, result)
+            else:
+                display.vvv("grafana_api lookup: using cached response of %s" % term)
+            ret.append(result)
+
+        return ret
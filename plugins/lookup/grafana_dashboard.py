@@ -41,6 +41,71 @@ options:
     description: optional filter for dashboard search.
     env:
       - name: GRAFANA_DASHBOARD_SEARCH
+  tag:
+    description:
+      - Only return the dashboards with all these tags.
+      - A comma separated list when set in the terms.
+    type: list
+    elements: str
+    version_added: "2.4.0"
+  folder_uids:
+    description:
+      - Only return the dashboards of these folders.
+      - A comma separated list when set in the terms.
+    type: list
+    elements: str
+    version_added: "2.4.0"
+  dashboard_uids:
+    description:
+      - Only return the dashboards with these uids.
+      - A comma separated list when set in the terms.
+    type: list
+    elements: str
+    version_added: "2.4.0"
+  type:
+    description:
+      - Only return the dashboards, C(dash-db), or the folders, C(dash-folder).
+    type: str
+    choices: ["dash-db", "dash-folder"]
+    version_added: "2.4.0"
+  starred:
+    description:
+      - Only return the dashboards starred by the user.
+    type: bool
+    default: false
+    version_added: "2.4.0"
+  org_ids:
+    description:
+      - Organizations whose dashboards are listed instead of the one of C(grafana_org_id), C(all) for all the
+        organizations of the Grafana instance or a comma separated list of organization ids.
+      - The organizations are searched in parallel, scoping each request with the C(X-Grafana-Org-Id) header
+        instead of switching the current organization of C(grafana_user).
+      - The C(orgId) key of the returned dashboards is set to their organization.
+      - Requires C(grafana_user) and C(grafana_password). Grafana only scopes a request to an organization the
+        user is a member of, even for a server admin, so C(all) stands for all the organizations of
+        C(grafana_user) and the listed organizations the user isn't a member of are skipped with a warning.
+    type: str
+    version_added: "2.4.0"
+  workers:
+    description:
+      - Maximum number of organizations of C(org_ids) searched in parallel.
+    type: int
+    default: 4
+    version_added: "2.4.0"
+  page_size:
+    description:
+      - Number of dashboards requested at a time, the pages are requested until all the dashboards are found.
+      - Grafana caps the number of dashboards of a page to 5000, a larger value is lowered to 5000.
+    type: int
+    default: 1000
+    version_added: "2.4.0"
+  fields:
+    description:
+      - Keys kept in the returned dashboards, all the keys returned by Grafana are kept when not set.
+      - A comma separated list when set in the terms.
+    type: list
+    elements: str
+    version_added: "2.4.0"
   validate_certs:
     description: flag to control SSL certificate validation
     type: boolean
@@ -48,6 +113,25 @@ options:
   ca_path:
     description: string of the file system path to CA cert bundle to use for validation
     type: string
+  cache_ttl:
+    description:
+      - Number of seconds during which the dashboards returned for the same Grafana URL, organization, search and
+        credentials are reused instead of searching again, C(0) disables the cache.
+      - The results are kept in memory and, when C(cache_path) is set, on disk.
+    type: int
+    default: 0
+    env:
+      - name: GRAFANA_CACHE_TTL
+    version_added: "2.4.0"
+  cache_path:
+    description:
+      - Directory where the cached results are stored, so that they are shared between the forks and the runs of
+        ansible on the controller.
+      - The directory and the files it contains are created only readable by their owner.
+    type: path
+    env:
+      - name: GRAFANA_CACHE_PATH
+    version_added: "2.4.0"
 """
 
 EXAMPLES = """
@@ -59,6 +143,18 @@ EXAMPLES = """
   set_fact:
     grafana_dashboards: "{{ lookup('grafana_dashboard', 'grafana_url=http://grafana.company.com grafana_api_key=' ~ grafana_api_key) }}"
 
+- name: get the uid and title of the dashboards tagged prod of two folders
+  set_fact:
+    grafana_dashboards: "{{ lookup('grafana_dashboard', 'grafana_url=http://grafana.company.com tag=prod folder_uids=ops,dev type=dash-db fields=uid,title') }}"
+
+- name: get the dashboards of all the organizations
+  set_fact:
+    grafana_dashboards: "{{ lookup('grafana_dashboard', 'grafana_url=http://grafana.company.com org_ids=all fields=uid,title,orgId') }}"
+
+- name: get grafana dashboards once for all the hosts
+  set_fact:
+    grafana_dashboards: "{{ lookup('grafana_dashboard', 'grafana_url=http://grafana.company.com search=foo', cache_ttl=300, cache_path='~/.ansible/grafana_cache') }}"
+
 - name: get project foo grafana dashboards (validate SSL certificates of the instance with custom CA Certificate Bundle)
   set_fact:
     grafana_dashboards: |
@@ -72,14 +168,24 @@ EXAMPLES = """
         }}
 """
 
-import json
 import os
 from ansible.errors import AnsibleError
 from ansible.plugins.lookup import LookupBase
-from ansible.module_utils.urls import basic_auth_header, open_url, SSLValidationError
+from ansible.module_utils.urls import basic_auth_header
 from ansible.module_utils._text import to_native
-from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.six import string_types
 from ansible.utils.display import Display
+from ansible_collections.community.grafana.plugins.module_utils.base import (
+    run_concurrently,
+)
+from ansible_collections.community.grafana.plugins.plugin_utils.base import (
+    MISSING,
+    SEARCH_PAGE_LIMIT,
+    GrafanaAPIException,
+    GrafanaClient,
+    GrafanaResultCache,
+)
 
 display = Display()
 
@@ -91,6 +197,14 @@ ANSIBLE_GRAFANA_PASSWORD = "admin"
 ANSIBLE_GRAFANA_ORG_ID = 1
 ANSIBLE_GRAFANA_DASHBOARD_SEARCH = None
 
+# filters of the lookup sent to /api/search with the name of their parameter
+SEARCH_LIST_FILTERS = (
+    ("tag", "tag"),
+    ("folder_uids", "folderUIDs"),
+    ("dashboard_uids", "dashboardUIDs"),
+)
+SEARCH_TYPES = ("dash-db", "dash-folder")
+
 if os.getenv("GRAFANA_URL") is not None:
     ANSIBLE_GRAFANA_URL = os.environ["GRAFANA_URL"]
 
@@ -110,98 +224,160 @@ if os.getenv("GRAFANA_DASHBOARD_SEARCH") is not None:
     ANSIBLE_GRAFANA_DASHBOARD_SEARCH = os.environ["GRAFANA_DASHBOARD_SEARCH"]
 
 
-class GrafanaAPIException(Exception):
-    pass
+def as_list(value):
+    """Return a list option, given as a comma separated list in the terms."""
+    if value is None:
+        return []
+    if isinstance(value, string_types):
+        return [item for item in value.split(",") if item]
+    return list(value)
 
 
-class GrafanaAPI:
+class GrafanaAPI(GrafanaClient):
     def __init__(self, validate_certs, ca_path, **kwargs):
-        self.grafana_url = kwargs.get("grafana_url", ANSIBLE_GRAFANA_URL)
-        self.grafana_api_key = kwargs.get("grafana_api_key", ANSIBLE_GRAFANA_API_KEY)
-        self.grafana_user = kwargs.get("grafana_user", ANSIBLE_GRAFANA_USER)
-        self.grafana_password = kwargs.get("grafana_password", ANSIBLE_GRAFANA_PASSWORD)
-        self.grafana_org_id = kwargs.get("grafana_org_id", ANSIBLE_GRAFANA_ORG_ID)
+        super(GrafanaAPI, self).__init__(
+            validate_certs,
+            ca_path,
+            grafana_url=kwargs.get("grafana_url", ANSIBLE_GRAFANA_URL),
+            grafana_api_key=kwargs.get("grafana_api_key", ANSIBLE_GRAFANA_API_KEY),
+            grafana_user=kwargs.get("grafana_user", ANSIBLE_GRAFANA_USER),
+            grafana_password=kwargs.get("grafana_password", ANSIBLE_GRAFANA_PASSWORD),
+            grafana_org_id=kwargs.get("grafana_org_id", ANSIBLE_GRAFANA_ORG_ID),
+        )
         self.search = kwargs.get("search", ANSIBLE_GRAFANA_DASHBOARD_SEARCH)
-        self.validate_certs = validate_certs
-        self.ca_path = ca_path
-
-    def grafana_switch_organisation(self, headers):
-        try:
-            r = open_url(
-                "%s/api/user/using/%s" % (self.grafana_url, self.grafana_org_id),
-                headers=headers,
-                method="POST",
-                validate_certs=self.validate_certs,
-                ca_path=self.ca_path,
-            )
-        except HTTPError as e:
-            raise GrafanaAPIException(
-                "Unable to switch to organization %s : %s"
-                % (self.grafana_org_id, to_native(e))
-            )
-        except SSLValidationError as e:
+        self.filters = dict(
+            (name, as_list(kwargs.get(name))) for name, param in SEARCH_LIST_FILTERS
+        )
+        self.type = kwargs.get("type")
+        if self.type is not None and self.type not in SEARCH_TYPES:
             raise GrafanaAPIException(
-                "Unable to validate server's certificate with %s: %s"
-                % (self.ca_path, to_native(e))
+                "type must be one of %s, got %s" % (", ".join(SEARCH_TYPES), self.type)
             )
-        if r.getcode() != 200:
+        self.starred = boolean(kwargs.get("starred") or False)
+        self.fields = as_list(kwargs.get("fields"))
+        # a larger page would be truncated by Grafana and taken for the last one
+        self.page_size = min(int(kwargs.get("page_size") or 1000), SEARCH_PAGE_LIMIT)
+        self.org_ids = kwargs.get("org_ids")
+        if self.org_ids and self.grafana_api_key:
             raise GrafanaAPIException(
-                "Unable to switch to organization %s : %s"
-                % (self.grafana_org_id, str(r.getcode()))
+                "org_ids can't be used with grafana_api_key, which belongs to one organization"
             )
+        self.workers = int(kwargs.get("workers") or 1)
 
-    def grafana_headers(self):
-        headers = {"content-type": "application/json; charset=utf8"}
-        if self.grafana_api_key:
-            headers["Authorization"] = "Bearer %s" % self.grafana_api_key
-        else:
-            headers["Authorization"] = basic_auth_header(
-                self.grafana_user, self.grafana_password
-            )
-            self.grafana_switch_organisation(headers)
+    def cache_identity(self):
+        identity = super(GrafanaAPI, self).cache_identity()
+        # the organizations of org_ids are searched instead of grafana_org_id
+        if self.org_ids:
+            identity[1] = self.org_ids
+        return identity
 
-        return headers
+    def cache_key(self):
+        """Return the cache key of the dashboards listed by this search."""
+        return GrafanaResultCache.key(
+            self.cache_identity(), self.search_params(), self.fields
+        )
 
-    def grafana_list_dashboards(self):
+    def search_params(self):
+        """Return the parameters of /api/search, filtering on the server."""
+        params = []
+        if self.search:
+            params.append(("query", self.search))
+        for name, param in SEARCH_LIST_FILTERS:
+            params.extend((param, value) for value in self.filters[name])
+        if self.type:
+            params.append(("type", self.type))
+        if self.starred:
+            params.append(("starred", "true"))
+        return params
+
+    def project(self, dashboard):
+        """Return the dashboard reduced to the selected fields."""
+        if not self.fields:
+            return dashboard
+        return dict((key, dashboard[key]) for key in self.fields if key in dashboard)
+
+    def grafana_search_page(self, headers, page):
+        params = self.search_params() + [("limit", self.page_size), ("page", page)]
+        return self.grafana_get(
+            "/api/search", params, headers, "list grafana dashboards"
+        )
+
+    def grafana_iter_dashboards(self, headers=None):
+        """Yield the dashboards found by the search, reduced to the selected fields.
+
+        The search is requested page by page until a page isn't full.
+        """
         # define http headers
-        headers = self.grafana_headers()
+        if headers is None:
+            headers = self.grafana_headers()
 
-        dashboard_list = []
-        try:
-            if self.search:
-                r = open_url(
-                    "%s/api/search?query=%s" % (self.grafana_url, self.search),
-                    headers=headers,
-                    method="GET",
-                    validate_certs=self.validate_certs,
-                    ca_path=self.ca_path,
-                )
-            else:
-                r = open_url(
-                    "%s/api/search/" % self.grafana_url,
-                    headers=headers,
-                    method="GET",
-                    validate_certs=self.validate_certs,
-                    ca_path=self.ca_path,
+        page = 1
+        while True:
+            dashboard_list = self.grafana_search_page(headers, page)
+            for dashboard in dashboard_list:
+                yield self.project(dashboard)
+            if len(dashboard_list) < self.page_size:
+                return
+            page += 1
+
+    def grafana_list_org_ids(self, headers):
+        if self.org_ids != "all":
+            try:
+                return [int(org_id) for org_id in as_list(self.org_ids)]
+            except ValueError:
+                raise GrafanaAPIException(
+                    "org_ids must be all or a list of organization ids, got %s"
+                    % self.org_ids
                 )
-        except HTTPError as e:
-            raise GrafanaAPIException("Unable to search dashboards : %s" % to_native(e))
-        except SSLValidationError as e:
-            raise GrafanaAPIException(
-                "Unable to validate server's certificate with %s: %s"
-                % (self.ca_path, to_native(e))
-            )
-        if r.getcode() == 200:
+        # the organizations of the user, the only ones its requests can be scoped to
+        orgs = self.grafana_get(
+            "/api/user/orgs", None, headers, "list grafana organizations"
+        )
+        return [org["orgId"] for org in orgs]
+
+    def grafana_list_org_dashboards(self):
+        """Return the dashboards of the organizations of org_ids.
+
+        The organizations are searched in parallel, each request is scoped to
+        its organization by a header instead of switching the organization of
+        the user, which other clients would see.
+        """
+        headers = {
+            "content-type": "application/json; charset=utf8",
+            "Authorization": basic_auth_header(
+                self.grafana_user, self.grafana_password
+            ),
+        }
+
+        def search_org(org_id):
+            org_headers = dict(headers)
+            org_headers["X-Grafana-Org-Id"] = str(org_id)
+            dashboards = []
             try:
-                dashboard_list = json.loads(r.read())
-            except Exception as e:
-                raise GrafanaAPIException("Unable to parse json list %s" % to_native(e))
-        else:
-            raise GrafanaAPIException(
-                "Unable to list grafana dashboards : %s" % str(r.getcode())
-            )
+                for dashboard in self.grafana_iter_dashboards(org_headers):
+                    dashboard["orgId"] = org_id
+                    dashboards.append(dashboard)
+            except GrafanaAPIException as e:
+                if e.status not in (401, 403):
+                    raise
+                display.warning(
+                    "Skipping grafana organization %s, %s isn't a member of it: %s"
+                    % (org_id, self.grafana_user, to_native(e))
+                )
+                return []
+            return dashboards
 
-        return dashboard_list
+        org_ids = self.grafana_list_org_ids(headers)
+        return [
+            dashboard
+            for dashboards in run_concurrently(search_org, org_ids, self.workers)
+            for dashboard in dashboards
+        ]
+
+    def grafana_list_dashboards(self):
+        if self.org_ids:
+            return self.grafana_list_org_dashboards()
+        return list(self.grafana_iter_dashboards())
 
 
 class LookupModule(LookupBase):
@@ -221,12 +397,39 @@ class LookupModule(LookupBase):
                 )
             grafana_dict[key] = value
 
-        grafana = GrafanaAPI(
-            validate_certs=self.get_option("validate_certs"),
-            ca_path=self.get_option("ca_path"),
-            **grafana_dict,
-        )
+        # the filters can also be set as keyword arguments of the lookup
+        for name in (
+            "tag",
+            "folder_uids",
+            "dashboard_uids",
+            "type",
+            "fields",
+            "page_size",
+            "org_ids",
+            "workers",
+        ):
+            if name not in grafana_dict and self.get_option(name) is not None:
+                grafana_dict[name] = self.get_option(name)
+        grafana_dict.setdefault("starred", self.get_option("starred"))
 
-        ret = grafana.grafana_list_dashboards()
+        try:
+            grafana = GrafanaAPI(
+                validate_certs=self.get_option("validate_certs"),
+                ca_path=self.get_option("ca_path"),
+                **grafana_dict,
+            )
+        except (GrafanaAPIException, TypeError) as e:
+            raise AnsibleError(to_native(e))
+
+        cache = GrafanaResultCache(
+            self.get_option("cache_ttl"), self.get_option("cache_path")
+        )
+        key = grafana.cache_key()
+        ret = cache.get(key)
+        if ret is MISSING:
+            ret = grafana.grafana_list_dashboards()
+            cache.set(key, ret)
+        else:
+            display.vvv("grafana_dashboard lookup: using cached dashboards")
 
         return ret
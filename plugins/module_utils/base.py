@@ -17,10 +17,43 @@
 # Copyright: (c) 2019, Rémi REY (@rrey)
 
 from __future__ import absolute_import, division, print_function
-from ansible.module_utils.urls import url_argument_spec
+
+import json
+import os
+import re
+import tempfile
+import time
+
+from email.utils import mktime_tz, parsedate_tz
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.six.moves.http_cookies import CookieError, SimpleCookie
+from ansible.module_utils.six.moves.urllib.parse import urlencode
+from ansible.module_utils.urls import url_argument_spec, fetch_url, basic_auth_header
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+
+    HAS_THREAD_POOL = True
+except ImportError:
+    HAS_THREAD_POOL = False
 
 __metaclass__ = type
 
+SESSION_COOKIE = "grafana_session"
+# lifetime of a session whose cookie doesn't tell when it expires
+SESSION_LIFETIME = 600
+# separator of the Set-Cookie headers merged by fetch_url, the commas of the
+# Expires dates aren't followed by a name=value pair
+SET_COOKIE_SEPARATOR = re.compile(r",\s*(?=[^\s;,=]+=)")
+
 
 def clean_url(url):
     return url.rstrip("/")
@@ -65,3 +98,178 @@ def parse_grafana_version(version):
         "pre_release": pre_release,
         "build_meta": build_meta,
     }
+
+
+def grafana_find_folder(get, title=None, uid=None, parent_uid=None, limit=1000):
+    """Return the folder with the uid, or else the title, in the parent folder.
+
+    get(path) returns the decoded response of a GET request on the Grafana
+    API. The folders are listed page by page until the folder is found.
+    """
+    params = [("limit", limit)]
+    if parent_uid:
+        params.append(("parentUid", parent_uid))
+    page = 1
+    while True:
+        folders = get("/api/folders?%s" % urlencode(params + [("page", page)])) or []
+        for folder in folders:
+            if (
+                folder.get("uid") == uid
+                if uid
+                else folder.get("title") == to_text(title)
+            ):
+                return folder
+        if len(folders) < limit:
+            return None
+        page += 1
+
+
+def run_concurrently(func, items, workers=1):
+    """Call func on every item with at most workers parallel calls.
+
+    Results are returned in the order of items and the first exception raised
+    by func is propagated to the caller.
+    """
+    items = list(items)
+    if workers > 1 and len(items) > 1 and HAS_THREAD_POOL:
+        with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+            return list(executor.map(func, items))
+    return [func(item) for item in items]
+
+
+def read_cache(path):
+    """Return the content of a JSON cache file, an empty dict if it can't be read."""
+    try:
+        with open(path) as cache:
+            data = json.load(cache)
+    except (IOError, OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def update_cache(path, entries):
+    """Merge entries in a JSON cache file only readable by its owner.
+
+    Entries whose value is None are removed. The file is locked while it is
+    read and rewritten, so that modules running in parallel for several hosts
+    don't lose each other's entries, and replaced atomically.
+    """
+    directory = os.path.dirname(path) or "."
+    if not os.path.isdir(directory):
+        os.makedirs(directory, 0o700)
+    lock = open(path + ".lock", "a")
+    try:
+        os.chmod(path + ".lock", 0o600)
+        if HAS_FCNTL:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        data = read_cache(path)
+        for key, value in entries.items():
+            if value is None:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        # mkstemp creates the file with mode 0600
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".cache-")
+        try:
+            with os.fdopen(fd, "w") as cache:
+                json.dump(data, cache, sort_keys=True)
+            os.rename(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    finally:
+        lock.close()
+    return data
+
+
+def grafana_session_argument_spec():
+    return dict(session_cache=dict(type="path"))
+
+
+def session_cache_key(module):
+    return "%s|%s" % (clean_url(module.params["url"]), module.params["url_username"])
+
+
+def session_expiry(info, now):
+    """Return when the session cookie set by a login response expires."""
+    expires = now + SESSION_LIFETIME
+    cookies = SimpleCookie()
+    for header in SET_COOKIE_SEPARATOR.split(info.get("set-cookie") or ""):
+        try:
+            cookies.load(header)
+        except CookieError:
+            continue
+    session = cookies.get(SESSION_COOKIE)
+    if session is not None:
+        max_age = session["max-age"]
+        date = parsedate_tz(session["expires"])
+        if max_age.isdigit():
+            expires = now + int(max_age)
+        elif date is not None:
+            expires = mktime_tz(date)
+    # Grafana asks the clients to rotate the session token after this date
+    rotation = (info.get("cookies") or {}).get("grafana_session_expiry")
+    if rotation and rotation.isdigit():
+        expires = min(expires, int(rotation))
+    return expires
+
+
+def grafana_login(module):
+    """Log in with url_username and url_password, return the new session."""
+    resp, info = fetch_url(
+        module,
+        "%s/login" % clean_url(module.params["url"]),
+        data=json.dumps(
+            {
+                "user": module.params["url_username"],
+                "password": module.params["url_password"],
+            }
+        ),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    cookie = (info.get("cookies") or {}).get(SESSION_COOKIE)
+    if info["status"] != 200 or not cookie:
+        return None
+    return {"cookie": cookie, "expires": session_expiry(info, time.time())}
+
+
+def grafana_session_headers(module, headers):
+    """Authenticate with a session cookie instead of basic auth in headers.
+
+    The session of url_username is read from the session_cache file and
+    reused until it expires, a new one is created with a single login
+    otherwise. Headers are left with basic auth when session_cache isn't set
+    or the login fails.
+    """
+    path = module.params.get("session_cache")
+    if not path or module.params.get("grafana_api_key"):
+        return False
+    key = session_cache_key(module)
+    session = read_cache(path).get(key)
+    if not session or session.get("expires", 0) <= time.time():
+        session = grafana_login(module)
+        if session is None:
+            return False
+        update_cache(path, {key: session})
+    headers.pop("Authorization", None)
+    headers["Cookie"] = "%s=%s" % (SESSION_COOKIE, session["cookie"])
+    return True
+
+
+def grafana_basic_auth_fallback(module, headers):
+    """Switch headers from a rejected session cookie back to basic auth.
+
+    Return True when the request has to be sent again, the session is removed
+    from the cache so that the next run logs in again. Requests sent in
+    parallel with the same session are sent again as well.
+    """
+    if "Cookie" not in headers:
+        return getattr(module, "_grafana_session_rejected", False)
+    module._grafana_session_rejected = True
+    headers["Authorization"] = basic_auth_header(
+        module.params["url_username"], module.params["url_password"]
+    )
+    if headers.pop("Cookie", None) is not None:
+        update_cache(module.params["session_cache"], {session_cache_key(module): None})
+    return True
@@ -0,0 +1,504 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+---
+module: grafana_alert_rule_group
+author:
+  - community.grafana maintainers (@ansible-collections)
+version_added: "2.4.0"
+short_description: Manage Grafana Alert Rule Groups
+description:
+  - Create/Update/Delete Grafana alert rule groups via the provisioning API.
+  - All the rules of a group are written in a single request, and only if the group differs from the existing one.
+options:
+  name:
+    description:
+      - The title of the rule group.
+    type: str
+    required: true
+  folder_uid:
+    description:
+      - The UID of the folder of the rule group.
+      - Mutually exclusive with C(folder_title).
+    type: str
+  folder_title:
+    description:
+      - The title of the folder of the rule group.
+      - Mutually exclusive with C(folder_uid).
+    type: str
+  parent_uid:
+    description:
+      - The UID of the parent folder of C(folder_title).
+      - Available with subfolder feature of Grafana 11.
+    type: str
+  interval:
+    description:
+      - The evaluation interval of the rule group, in seconds.
+    type: int
+    default: 60
+  rules:
+    description:
+      - The alert rules of the group, in the format of the Grafana provisioning API.
+      - The C(folderUID) and C(ruleGroup) fields of the rules are set by the module.
+      - A rule without C(uid) takes the UID of the existing rule with the same C(title), if any.
+      - Required when C(state=present).
+    type: list
+    elements: dict
+  state:
+    description:
+      - Status of the rule group.
+    type: str
+    default: present
+    choices:
+      - present
+      - absent
+  org_id:
+    description:
+      - The organization ID.
+    type: int
+    default: 1
+  org_name:
+    description:
+      - The name of the organization.
+    type: str
+  provisioning:
+    description:
+      - Indicates if provisioning is enabled.
+    type: bool
+    default: true
+extends_documentation_fragment:
+  - community.grafana.basic_auth
+  - community.grafana.api_key
+notes:
+  - Rules are compared in a canonical form, the fields managed by Grafana (C(id), C(orgID), C(updated), C(provenance)),
+    empty values and the defaults filled in by Grafana (for example C(keep_firing_for=0s) or the empty
+    C(relativeTimeRange) of the expressions) are ignored.
+  - Deleting a rule group requires Grafana 11 or later.
+"""
+
+EXAMPLES = """
+- name: Create alert rule group
+  community.grafana.grafana_alert_rule_group:
+    grafana_url: "{{ grafana_url }}"
+    grafana_user: "{{ grafana_username }}"
+    grafana_password: "{{ grafana_password }}"
+    folder_title: alerts
+    name: disk
+    interval: 60
+    rules:
+      - uid: disk-usage
+        title: Disk usage
+        condition: C
+        for: 5m
+        noDataState: NoData
+        execErrState: Error
+        labels:
+          team: ops
+        data:
+          - refId: A
+            datasourceUid: prometheus
+            relativeTimeRange:
+              from: 600
+              to: 0
+            model:
+              expr: node_filesystem_avail_bytes / node_filesystem_size_bytes
+          - refId: C
+            datasourceUid: __expr__
+            model:
+              type: threshold
+              expression: A
+              conditions:
+                - evaluator:
+                    type: lt
+                    params: [0.1]
+
+- name: Delete alert rule group
+  community.grafana.grafana_alert_rule_group:
+    grafana_url: "{{ grafana_url }}"
+    grafana_user: "{{ grafana_username }}"
+    grafana_password: "{{ grafana_password }}"
+    folder_title: alerts
+    name: disk
+    state: absent
+"""
+
+RETURN = """
+rule_group:
+  description: The alert rule group sent to or returned by Grafana.
+  returned: success
+  type: dict
+  sample:
+    title: disk
+    folderUid: alerts
+    interval: 60
+    rules:
+      - uid: disk-usage
+        title: Disk usage
+state:
+  description: The state of the rule group.
+  returned: success
+  type: str
+  sample: present
+"""
+
+import copy
+import json
+import re
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.urls import fetch_url
+from ansible.module_utils._text import to_text
+from ansible.module_utils.six import string_types
+from ansible.module_utils.six.moves.urllib.parse import quote
+from ansible_collections.community.grafana.plugins.module_utils.base import (
+    grafana_argument_spec,
+    grafana_find_folder,
+    clean_url,
+)
+from ansible.module_utils.urls import basic_auth_header
+
+# rule fields managed by Grafana, ignored when comparing rules
+RULE_SERVER_FIELDS = ("id", "orgID", "updated", "provenance")
+
+# rule fields filled in by Grafana when the rule doesn't set them, durations
+# in seconds
+RULE_SERVER_DEFAULTS = {"for": 0, "keep_firing_for": 0, "isPaused": False}
+
+# query fields filled in by Grafana, the expressions get an empty time range
+QUERY_SERVER_DEFAULTS = {"relativeTimeRange": {"from": 0, "to": 0}}
+
+# query model fields filled in by Grafana
+MODEL_SERVER_DEFAULTS = {"intervalMs": 1000, "maxDataPoints": 43200}
+
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+class GrafanaAPIException(Exception):
+    pass
+
+
+def duration_seconds(value):
+    """Return the number of seconds of a Grafana duration such as C(1h30m)."""
+    if not isinstance(value, string_types):
+        return value
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h|d|w)", value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return value
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def _canonical_value(value):
+    if isinstance(value, dict):
+        return dict(
+            (key, _canonical_value(item))
+            for key, item in value.items()
+            if item not in (None, "", [], {})
+        )
+    if isinstance(value, list):
+        return [_canonical_value(item) for item in value]
+    return value
+
+
+def _without_defaults(value, defaults):
+    return dict(
+        (key, item)
+        for key, item in value.items()
+        if key not in defaults or item != defaults[key]
+    )
+
+
+def canonical_query(query):
+    """Return a comparable form of a query of an alert rule."""
+    canonical = _without_defaults(query, QUERY_SERVER_DEFAULTS)
+    if isinstance(canonical.get("model"), dict):
+        model = _without_defaults(canonical["model"], MODEL_SERVER_DEFAULTS)
+        # Grafana copies the refId of the query in its model
+        if model.get("refId") == canonical.get("refId"):
+            model.pop("refId", None)
+        canonical["model"] = model
+    return canonical
+
+
+def canonical_rule(rule):
+    """Return a comparable form of an alert rule.
+
+    The fields managed by Grafana, the empty values and the defaults filled
+    in by Grafana are left out, and the durations converted to seconds.
+    """
+    canonical = _canonical_value(
+        dict(
+            (key, value) for key, value in rule.items() if key not in RULE_SERVER_FIELDS
+        )
+    )
+    for key in ("for", "keep_firing_for"):
+        if key in canonical:
+            canonical[key] = duration_seconds(canonical[key])
+    canonical = _without_defaults(canonical, RULE_SERVER_DEFAULTS)
+    if isinstance(canonical.get("data"), list):
+        canonical["data"] = [
+            canonical_query(query) if isinstance(query, dict) else query
+            for query in canonical["data"]
+        ]
+    return canonical
+
+
+def canonical_rule_group(group):
+    """Return a comparable form of a rule group, keeping the order of its rules."""
+    if not group:
+        return {}
+    return {
+        "title": group.get("title"),
+        "folderUid": group.get("folderUid"),
+        "interval": group.get("interval"),
+        "rules": [canonical_rule(rule) for rule in group.get("rules") or []],
+    }
+
+
+def rule_group_provenance(rule_group):
+    return any(rule.get("provenance") for rule in (rule_group or {}).get("rules") or [])
+
+
+def grafana_rule_group_payload(data, folder_uid, current=None):
+    """Build the rule group sent to Grafana.
+
+    Rules without uid get the uid of the current rule with the same title so
+    that Grafana updates them instead of replacing them.
+    """
+    current_uids = dict(
+        (rule.get("title"), rule.get("uid"))
+        for rule in (current or {}).get("rules") or []
+    )
+    rules = []
+    for rule in data["rules"] or []:
+        rule = copy.deepcopy(rule)
+        if not rule.get("uid") and current_uids.get(rule.get("title")):
+            rule["uid"] = current_uids[rule["title"]]
+        rule["folderUID"] = folder_uid
+        rule["ruleGroup"] = data["name"]
+        rules.append(rule)
+    return {
+        "title": data["name"],
+        "folderUid": folder_uid,
+        "interval": data["interval"],
+        "rules": rules,
+    }
+
+
+class GrafanaAlertRuleGroupInterface(object):
+    def __init__(self, module):
+        self._module = module
+        self.org_id = None
+        # {{{ Authentication header
+        self.headers = {"Content-Type": "application/json"}
+        if module.params.get("grafana_api_key", None):
+            self.headers["Authorization"] = (
+                "Bearer %s" % module.params["grafana_api_key"]
+            )
+        else:
+            self.headers["Authorization"] = basic_auth_header(
+                module.params["url_username"], module.params["url_password"]
+            )
+            self.org_id = (
+                self.grafana_organization_by_name(
+                    module.params, module.params["org_name"]
+                )
+                if module.params["org_name"]
+                else module.params["org_id"]
+            )
+            self.grafana_switch_organisation(module.params, self.org_id)
+        # }}}
+
+    def grafana_organization_by_name(self, data, org_name):
+        r, info = fetch_url(
+            self._module,
+            "%s/api/user/orgs" % data["url"],
+            headers=self.headers,
+            method="GET",
+        )
+        organizations = json.loads(to_text(r.read()))
+        orga = next((org for org in organizations if org["name"] == org_name), None)
+        if orga:
+            return orga["orgId"]
+
+        raise GrafanaAPIException(
+            "Current user isn't member of organization: %s" % org_name
+        )
+
+    def grafana_switch_organisation(self, data, org_id):
+        r, info = fetch_url(
+            self._module,
+            "%s/api/user/using/%s" % (data["url"], org_id),
+            headers=self.headers,
+            method="POST",
+        )
+        if info["status"] != 200:
+            raise GrafanaAPIException(
+                "Unable to switch to organization '%s': %s" % (org_id, info)
+            )
+
+    def grafana_get(self, data, url):
+        r, info = fetch_url(
+            self._module, data["url"] + url, headers=self.headers, method="GET"
+        )
+        if info["status"] != 200:
+            raise GrafanaAPIException("Unable to get '%s': %s" % (url, info))
+        return json.loads(to_text(r.read()))
+
+    def grafana_get_folder_uid(self, data):
+        if data["folder_uid"]:
+            return data["folder_uid"]
+
+        folder = grafana_find_folder(
+            lambda url: self.grafana_get(data, url),
+            data["folder_title"],
+            parent_uid=data["parent_uid"],
+        )
+        if folder is None:
+            raise GrafanaAPIException(
+                "Folder '%s' does not exist" % data["folder_title"]
+            )
+        return folder["uid"]
+
+    def grafana_rule_group_url(self, data, folder_uid):
+        return "%s/api/v1/provisioning/folder/%s/rule-groups/%s" % (
+            data["url"],
+            quote(folder_uid),
+            quote(data["name"], safe=""),
+        )
+
+    def grafana_get_rule_group(self, data, folder_uid):
+        r, info = fetch_url(
+            self._module,
+            self.grafana_rule_group_url(data, folder_uid),
+            headers=self.headers,
+            method="GET",
+        )
+
+        if info["status"] == 200:
+            group = json.loads(to_text(r.read()))
+            # Grafana answers with an empty group when the folder exists but not the group
+            return group if group.get("rules") else None
+        elif info["status"] == 404:
+            return None
+        else:
+            raise GrafanaAPIException("Unable to get rule group: %s" % info)
+
+    def grafana_api_provisioning_headers(self, data, rule_group):
+        headers = dict(self.headers)
+        provenance = rule_group_provenance(rule_group)
+        if not provenance and not data.get("provisioning"):
+            headers["X-Disable-Provenance"] = "true"
+        elif provenance and not data.get("provisioning"):
+            self._module.fail_json(
+                msg="Unable to update rule group '%s': provisioning cannot be disabled if it's already enabled"
+                % data["name"]
+            )
+        return headers
+
+    def grafana_put_rule_group(self, data, folder_uid, payload, headers):
+        r, info = fetch_url(
+            self._module,
+            self.grafana_rule_group_url(data, folder_uid),
+            data=json.dumps(payload),
+            headers=headers,
+            method="PUT",
+        )
+
+        if info["status"] == 200:
+            return json.loads(to_text(r.read()))
+        else:
+            raise GrafanaAPIException("Unable to update rule group: %s" % info)
+
+    def grafana_delete_rule_group(self, data, folder_uid, headers):
+        r, info = fetch_url(
+            self._module,
+            self.grafana_rule_group_url(data, folder_uid),
+            headers=headers,
+            method="DELETE",
+        )
+
+        if info["status"] not in (200, 204):
+            raise GrafanaAPIException("Unable to delete rule group: %s" % info)
+
+    def grafana_handle_rule_group(self, data):
+        folder_uid = self.grafana_get_folder_uid(data)
+        rule_group = self.grafana_get_rule_group(data, folder_uid)
+        headers = self.grafana_api_provisioning_headers(data, rule_group)
+
+        if data["state"] == "absent":
+            if rule_group is None:
+                return {"changed": False, "state": data["state"]}
+            self.grafana_delete_rule_group(data, folder_uid, headers)
+            return {"changed": True, "state": data["state"], "rule_group": rule_group}
+
+        payload = grafana_rule_group_payload(data, folder_uid, rule_group)
+        if canonical_rule_group(rule_group) == canonical_rule_group(
+            payload
+        ) and rule_group_provenance(rule_group) == bool(data["provisioning"]):
+            return {"changed": False, "state": data["state"], "rule_group": rule_group}
+
+        rule_group = self.grafana_put_rule_group(data, folder_uid, payload, headers)
+        return {"changed": True, "state": data["state"], "rule_group": rule_group}
+
+
+def setup_module_object():
+    argument_spec = grafana_argument_spec()
+    argument_spec.update(
+        name=dict(type="str", required=True),
+        folder_uid=dict(type="str"),
+        folder_title=dict(type="str"),
+        parent_uid=dict(type="str"),
+        interval=dict(type="int", default=60),
+        rules=dict(type="list", elements="dict"),
+        org_id=dict(type="int", default=1),
+        org_name=dict(type="str"),
+        provisioning=dict(type="bool", default=True),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=False,
+        required_together=[["url_username", "url_password", "org_id"]],
+        mutually_exclusive=[
+            ["url_username", "grafana_api_key"],
+            ["folder_uid", "folder_title"],
+        ],
+        required_one_of=[["folder_uid", "folder_title"]],
+        required_if=[["state", "present", ["rules"]]],
+    )
+    return module
+
+
+def main():
+    module = setup_module_object()
+    module.params["url"] = clean_url(module.params["url"])
+
+    try:
+        grafana_iface = GrafanaAlertRuleGroupInterface(module)
+        result = grafana_iface.grafana_handle_rule_group(module.params)
+    except GrafanaAPIException as e:
+        module.fail_json(msg=str(e))
+    module.exit_json(failed=False, **result)
+
+
+if __name__ == "__main__":
+    main()
@@ -29,11 +29,31 @@ short_description: Manage Grafana Contact Points
 description:
   - Create/Update/Delete Grafana Contact Points via API.
 options:
+  contact_points:
+    description:
+      - List of contact points to synchronise in a single module run.
+      - Each element accepts the options of a single contact point, from C(uid) and C(name) to the integration specific
+        options like C(email_addresses), and its own C(state).
+      - The C(uid) of each contact point must be unique in the list.
+      - The existing contact points are downloaded once, only the contact points which differ are created, updated
+        or deleted.
+      - Mutually exclusive with C(uid).
+    type: list
+    elements: dict
+    version_added: "2.4.0"
   disable_resolve_message:
     description:
       - Disables the resolve message.
     type: bool
     default: false
+  enforce_secure_data:
+    description:
+      - Secure settings are not compared per default (see notes!)
+      - To update secure settings of an existing contact point you have to enable this option!
+      - Enabling this, the contact point is always sent to Grafana when it has secure settings.
+    type: bool
+    default: false
+    version_added: "2.4.0"
   include_image:
     description:
       - Whether to include an image in the notification.
@@ -58,6 +78,14 @@ options:
       - Indicates if provisioning is enabled.
     type: bool
     default: true
+  prune:
+    description:
+      - Delete the contact points which are not listed in C(contact_points).
+      - Contact points provisioned from files are never deleted.
+      - Only used with C(contact_points).
+    type: bool
+    default: false
+    version_added: "2.4.0"
   state:
     description:
       - Status of the contact point.
@@ -95,8 +123,15 @@ options:
     description:
       - The unique ID of the contact point.
       - Normally the uid is generated randomly, but it is required for handling the contact point via API.
+      - Required unless C(contact_points) is set.
+      - Mutually exclusive with C(contact_points).
     type: str
-    required: true
+  workers:
+    description:
+      - Maximum number of parallel requests sent to Grafana when applying C(contact_points).
+    type: int
+    default: 4
+    version_added: "2.4.0"
   alertmanager_password:
     description:
       - Password for accessing Alertmanager.
@@ -637,6 +672,11 @@ options:
 extends_documentation_fragment:
   - community.grafana.basic_auth
   - community.grafana.api_key
+notes:
+- The existing contact point is compared with the requested one and Grafana is only updated when they differ, because every
+  update reloads the alertmanager configuration.
+- Secure settings (tokens, passwords, webhook URLs, ...) are redacted by the Grafana API, thus they can only be compared by presence.
+  To force the update of secure settings you have to set I(enforce_secure_data=True).
 """
 
 
@@ -659,6 +699,23 @@ EXAMPLES = """
     grafana_password: "{{ grafana_password }}"
     uid: email
     state: absent
+
+- name: Synchronise all contact points and delete the unmanaged ones
+  community.grafana.grafana_contact_point:
+    grafana_url: "{{ grafana_url }}"
+    grafana_user: "{{ grafana_username }}"
+    grafana_password: "{{ grafana_password }}"
+    prune: true
+    contact_points:
+      - uid: email
+        name: E-Mail
+        type: email
+        email_addresses:
+          - example@example.com
+      - uid: teams
+        name: Teams
+        type: teams
+        teams_url: "{{ teams_webhook_url }}"
 """
 
 RETURN = """
@@ -702,6 +759,26 @@ contact_point:
       description: The secure fields config of the contact point.
       returned: success
       type: dict
+created:
+  description: The uids of the contact points created from C(contact_points).
+  returned: when C(contact_points) is set
+  type: list
+  elements: str
+  sample:
+    - email
+updated:
+  description: The uids of the contact points updated from C(contact_points).
+  returned: when C(contact_points) is set
+  type: list
+  elements: str
+  sample:
+    - teams
+deleted:
+  description: The uids of the contact points deleted from C(contact_points) or by C(prune).
+  returned: when C(contact_points) is set
+  type: list
+  elements: str
+  sample: []
 diff:
   description: Difference between previous and updated contact point.
   returned: changed
@@ -739,216 +816,355 @@ import json
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.urls import fetch_url
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_native, to_text
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
 from ansible_collections.community.grafana.plugins.module_utils.base import (
     grafana_argument_spec,
     clean_url,
+    run_concurrently,
 )
 from ansible.module_utils.urls import basic_auth_header
 
+REDACTED_SECURE_VALUE = "[REDACTED]"
+
 
 class GrafanaAPIException(Exception):
     pass
 
 
+def _field(setting_key, suffix, transform=None, required=False, **spec):
+    spec.setdefault("type", "str")
+    return (setting_key, suffix, transform, required, spec)
+
+
+def _join_semicolon(value):
+    return ";".join(value)
+
+
+def _join_comma(value):
+    return ",".join(value)
+
+
+def _pushover_priority(value):
+    return {
+        "emergency": "2",
+        "high": "1",
+        "normal": "0",
+        "low": "-1",
+        "lowest": "-2",
+    }[value]
+
+
+def _dingding_message_type(value):
+    return {
+        "link": "link",
+        "action_card": "actionCard",
+    }[value]
+
+
+# Settings of every integration: the Grafana setting key, the module option
+# suffix (prefixed with the integration name), an optional transformation of
+# the option value and the argument spec of the option.
+CONTACT_POINT_INTEGRATIONS = {
+    "alertmanager": [
+        _field("basicAuthPassword", "password", no_log=True),
+        _field("url", "url", required=True),
+        _field("basicAuthUser", "username"),
+    ],
+    "dingding": [
+        _field("message", "message"),
+        _field("msgType", "message_type", transform=_dingding_message_type),
+        _field("title", "title"),
+        _field("url", "url", required=True),
+    ],
+    "discord": [
+        _field("avatar_url", "avatar_url"),
+        _field("message", "message"),
+        _field("title", "title"),
+        _field("url", "url", no_log=True, required=True),
+        _field("use_discord_username", "use_username", type="bool", default=False),
+    ],
+    "email": [
+        _field(
+            "addresses",
+            "addresses",
+            transform=_join_semicolon,
+            type="list",
+            elements="str",
+            required=True,
+        ),
+        _field("message", "message"),
+        _field("singleEmail", "single", type="bool", default=False),
+        _field("subject", "subject"),
+    ],
+    "googlechat": [
+        _field("url", "url", no_log=True, required=True),
+        _field("message", "message"),
+        _field("title", "title"),
+    ],
+    "kafka": [
+        _field("apiVersion", "api_version", default="v2"),
+        _field("kafkaClusterId", "cluster_id"),
+        _field("description", "description"),
+        _field("details", "details"),
+        _field("password", "password", no_log=True),
+        _field("kafkaRestProxy", "rest_proxy_url", no_log=True, required=True),
+        _field("kafkaTopic", "topic", required=True),
+        _field("username", "username"),
+    ],
+    "line": [
+        _field("description", "description"),
+        _field("title", "title"),
+        _field("token", "token", no_log=True, required=True),
+    ],
+    "opsgenie": [
+        _field("apiKey", "api_key", no_log=True, required=True),
+        _field("autoClose", "auto_close", type="bool"),
+        _field("description", "description"),
+        _field("message", "message"),
+        _field("overridePriority", "override_priority", type="bool"),
+        _field("responders", "responders", type="list", elements="dict"),
+        _field("sendTagsAs", "send_tags_as"),
+        _field("apiUrl", "url", required=True),
+    ],
+    "pagerduty": [
+        _field("class", "class"),
+        _field("client", "client"),
+        _field("client_url", "client_url"),
+        _field("component", "component"),
+        _field("details", "details", type="list", elements="dict"),
+        _field("group", "group"),
+        _field("integrationKey", "integration_key", no_log=True, required=True),
+        _field(
+            "severity", "severity", choices=["critical", "error", "warning", "info"]
+        ),
+        _field("source", "source"),
+        _field("summary", "summary"),
+    ],
+    "pushover": [
+        _field("apiToken", "api_token", no_log=True, required=True),
+        _field(
+            "device", "devices", transform=_join_semicolon, type="list", elements="str"
+        ),
+        _field("expire", "expire", type="int"),
+        _field("message", "message"),
+        _field("okPriority", "ok_priority", type="int"),
+        _field("okSound", "ok_sound"),
+        _field("priority", "priority", transform=_pushover_priority, type="int"),
+        _field("retry", "retry", type="int"),
+        _field("sound", "sound"),
+        _field("title", "title"),
+        _field("uploadImage", "upload_image", type="bool", default=True),
+        _field("userKey", "user_key", no_log=True, required=True),
+    ],
+    "sensugo": [
+        _field("apiKey", "api_key", no_log=True, required=True),
+        _field("url", "url", required=True),
+        _field("check", "check"),
+        _field("entity", "entity"),
+        _field("handler", "handler"),
+        _field("message", "message"),
+        _field("namespace", "namespace"),
+    ],
+    "slack": [
+        _field("endpointUrl", "endpoint_url"),
+        _field("icon_emoji", "icon_emoji"),
+        _field("icon_url", "icon_url"),
+        _field("mentionChannel", "mention_channel", choices=["here", "channel"]),
+        _field(
+            "mentionGroups",
+            "mention_groups",
+            transform=_join_comma,
+            type="list",
+            elements="str",
+        ),
+        _field(
+            "mentionUsers",
+            "mention_users",
+            transform=_join_comma,
+            type="list",
+            elements="str",
+        ),
+        _field("recipient", "recipient", required=True),
+        _field("text", "text"),
+        _field("title", "title"),
+        _field("token", "token", no_log=True, required=True),
+        _field("url", "url", no_log=True, required=True),
+        _field("username", "username"),
+    ],
+    "teams": [
+        _field("message", "message"),
+        _field("sectiontitle", "section_title"),
+        _field("title", "title"),
+        _field("url", "url", no_log=True, required=True),
+    ],
+    "telegram": [
+        _field("chatid", "chat_id", required=True),
+        _field("disable_notification", "disable_notifications", type="bool"),
+        _field("message", "message"),
+        _field("parse_mode", "parse_mode"),
+        _field("protect_content", "protect_content", type="bool"),
+        _field("bottoken", "token", no_log=True, required=True),
+        _field("disable_web_page_preview", "web_page_view", type="bool"),
+    ],
+    "threema": [
+        _field("api_secret", "api_secret", no_log=True, required=True),
+        _field("description", "description"),
+        _field("gateway_id", "gateway_id", required=True),
+        _field("recipient_id", "recipient_id", required=True),
+        _field("title", "title"),
+    ],
+    "victorops": [
+        _field("description", "description"),
+        _field("messageType", "message_type", choices=["CRITICAL", "RECOVERY"]),
+        _field("title", "title"),
+        _field("url", "url", required=True),
+    ],
+    "webex": [
+        _field("api_url", "api_url"),
+        _field("message", "message"),
+        _field("room_id", "room_id", required=True),
+        _field("bot_token", "token", no_log=True, required=True),
+    ],
+    "webhook": [
+        _field("authorization_credentials", "authorization_credentials", no_log=True),
+        _field("authorization_scheme", "authorization_scheme"),
+        _field("httpMethod", "http_method", choices=["POST", "PUT"]),
+        _field("maxAlerts", "max_alerts", type="int"),
+        _field("message", "message"),
+        _field("password", "password", no_log=True),
+        _field("title", "title"),
+        _field("url", "url", required=True),
+        _field("username", "username"),
+    ],
+    "wecom": [
+        _field("agent_id", "agent_id", required=True),
+        _field("corp_id", "corp_id", required=True),
+        _field("message", "message"),
+        _field("msgtype", "msg_type"),
+        _field("secret", "secret", no_log=True, required=True),
+        _field("title", "title"),
+        _field("touser", "to_user", type="list", elements="str"),
+        _field("url", "url", no_log=True, required=True),
+    ],
+}
+
+CONTACT_POINT_API_TYPES = {"alertmanager": "prometheus-alertmanager"}
+
+# (setting key, option, transform) tuples used to build the payloads
+CONTACT_POINT_SETTINGS = dict(
+    (
+        integration,
+        [
+            (setting_key, "%s_%s" % (integration, suffix), transform)
+            for setting_key, suffix, transform, required, spec in fields
+        ],
+    )
+    for integration, fields in CONTACT_POINT_INTEGRATIONS.items()
+)
+
+
+def grafana_contact_point_builder(integration):
+    """Return a function building the payloads of the integration's contact points.
+
+    The settings of the integration are split once into the transformed ones
+    and the ones copied as they are, then reused for every contact point.
+    """
+    api_type = CONTACT_POINT_API_TYPES.get(integration, integration)
+    settings = CONTACT_POINT_SETTINGS.get(integration, ())
+    transformed = [
+        (setting_key, option, transform)
+        for setting_key, option, transform in settings
+        if transform is not None
+    ]
+    copied = [
+        (setting_key, option)
+        for setting_key, option, transform in settings
+        if transform is None
+    ]
+
+    def build(data):
+        payload_settings = {}
+        for setting_key, option, transform in transformed:
+            value = data[option]
+            if value is not None:
+                payload_settings[setting_key] = transform(value)
+        for setting_key, option in copied:
+            value = data[option]
+            if value:
+                payload_settings[setting_key] = value
+        return {
+            "uid": data["uid"],
+            "name": data["name"],
+            "type": api_type,
+            "disableResolveMessage": data["disable_resolve_message"],
+            "settings": payload_settings,
+        }
+
+    return build
+
+
 def grafana_contact_point_payload(data):
-    payload = {
-        "uid": data["uid"],
-        "name": data["name"],
-        "type": data["type"],
-        "disableResolveMessage": data["disable_resolve_message"],
-        "settings": {},
-    }
+    return grafana_contact_point_builder(data["type"])(data)
+
+
+def grafana_contact_point_payloads(datas):
+    """Return the payloads of the contact points, with one builder per integration."""
+    builders = {}
+    payloads = []
+    for data in datas:
+        if data["type"] not in builders:
+            builders[data["type"]] = grafana_contact_point_builder(data["type"])
+        payloads.append(builders[data["type"]](data))
+    return payloads
+
+
+def _canonical_settings(settings):
+    # the payload never carries empty settings, so drop them on both sides
+    return dict(
+        (key, value)
+        for key, value in (settings or {}).items()
+        if value not in (None, "", False, [], {})
+    )
+
 
-    if data["type"] == "alertmanager":
-        payload["type"] = "prometheus-alertmanager"
-
-    type_settings_map = {
-        "alertmanager": {
-            "basicAuthPassword": "alertmanager_password",
-            "url": "alertmanager_url",
-            "basicAuthUser": "alertmanager_username",
-        },
-        "dingding": {
-            "message": "dingding_message",
-            "msgType": "dingding_message_type",
-            "title": "dingding_title",
-            "url": "dingding_url",
-        },
-        "discord": {
-            "avatar_url": "discord_avatar_url",
-            "message": "discord_message",
-            "title": "discord_title",
-            "url": "discord_url",
-            "use_discord_username": "discord_use_username",
-        },
-        "email": {
-            "addresses": "email_addresses",
-            "message": "email_message",
-            "singleEmail": "email_single",
-            "subject": "email_subject",
-        },
-        "googlechat": {
-            "url": "googlechat_url",
-            "message": "googlechat_message",
-            "title": "googlechat_title",
-        },
-        "kafka": {
-            "apiVersion": "kafka_api_version",
-            "kafkaClusterId": "kafka_cluster_id",
-            "description": "kafka_description",
-            "details": "kafka_details",
-            "password": "kafka_password",
-            "kafkaRestProxy": "kafka_rest_proxy_url",
-            "kafkaTopic": "kafka_topic",
-            "username": "kafka_username",
-        },
-        "line": {
-            "description": "line_description",
-            "title": "line_title",
-            "token": "line_token",
-        },
-        "opsgenie": {
-            "apiKey": "opsgenie_api_key",
-            "autoClose": "opsgenie_auto_close",
-            "description": "opsgenie_description",
-            "message": "opsgenie_message",
-            "overridePriority": "opsgenie_override_priority",
-            "responders": "opsgenie_responders",
-            "sendTagsAs": "opsgenie_send_tags_as",
-            "apiUrl": "opsgenie_url",
-        },
-        "pagerduty": {
-            "class": "pagerduty_class",
-            "client": "pagerduty_client",
-            "client_url": "pagerduty_client_url",
-            "component": "pagerduty_component",
-            "details": "pagerduty_details",
-            "group": "pagerduty_group",
-            "integrationKey": "pagerduty_integration_key",
-            "severity": "pagerduty_severity",
-            "source": "pagerduty_source",
-            "summary": "pagerduty_summary",
-        },
-        "pushover": {
-            "apiToken": "pushover_api_token",
-            "device": "pushover_devices",
-            "expire": "pushover_expire",
-            "message": "pushover_message",
-            "okPriority": "pushover_ok_priority",
-            "okSound": "pushover_ok_sound",
-            "priority": "pushover_priority",
-            "retry": "pushover_retry",
-            "sound": "pushover_sound",
-            "title": "pushover_title",
-            "uploadImage": "pushover_upload_image",
-            "userKey": "pushover_user_key",
-        },
-        "sensugo": {
-            "apiKey": "sensugo_api_key",
-            "url": "sensugo_url",
-            "check": "sensugo_check",
-            "entity": "sensugo_entity",
-            "handler": "sensugo_handler",
-            "message": "sensugo_message",
-            "namespace": "sensugo_namespace",
-        },
-        "slack": {
-            "endpointUrl": "slack_endpoint_url",
-            "icon_emoji": "slack_icon_emoji",
-            "icon_url": "slack_icon_url",
-            "mentionChannel": "slack_mention_channel",
-            "mentionGroups": "slack_mention_groups",
-            "mentionUsers": "slack_mention_users",
-            "recipient": "slack_recipient",
-            "text": "slack_text",
-            "title": "slack_title",
-            "token": "slack_token",
-            "url": "slack_url",
-            "username": "slack_username",
-        },
-        "teams": {
-            "message": "teams_message",
-            "sectiontitle": "teams_section_title",
-            "title": "teams_title",
-            "url": "teams_url",
-        },
-        "telegram": {
-            "chatid": "telegram_chat_id",
-            "disable_notification": "telegram_disable_notifications",
-            "message": "telegram_message",
-            "parse_mode": "telegram_parse_mode",
-            "protect_content": "telegram_protect_content",
-            "bottoken": "telegram_token",
-            "disable_web_page_preview": "telegram_web_page_view",
-        },
-        "threema": {
-            "api_secret": "threema_api_secret",
-            "description": "threema_description",
-            "gateway_id": "threema_gateway_id",
-            "recipient_id": "threema_recipient_id",
-            "title": "threema_title",
-        },
-        "victorops": {
-            "description": "victorops_description",
-            "messageType": "victorops_message_type",
-            "title": "victorops_title",
-            "url": "victorops_url",
-        },
-        "webex": {
-            "api_url": "webex_api_url",
-            "message": "webex_message",
-            "room_id": "webex_room_id",
-            "bot_token": "webex_token",
-        },
-        "webhook": {
-            "authorization_credentials": "webhook_authorization_credentials",
-            "authorization_scheme": "webhook_authorization_scheme",
-            "httpMethod": "webhook_http_method",
-            "maxAlerts": "webhook_max_alerts",
-            "message": "webhook_message",
-            "password": "webhook_password",
-            "title": "webhook_title",
-            "url": "webhook_url",
-            "username": "webhook_username",
-        },
-        "wecom": {
-            "agent_id": "wecom_agent_id",
-            "corp_id": "wecom_corp_id",
-            "message": "wecom_message",
-            "msgtype": "wecom_msg_type",
-            "secret": "wecom_secret",
-            "title": "wecom_title",
-            "touser": "wecom_to_user",
-            "url": "wecom_url",
-        },
+def compare_contact_points(new, current, data, compareSecureData=False):
+    before = {
+        "uid": current.get("uid"),
+        "name": current.get("name"),
+        "type": current.get("type"),
+        "disableResolveMessage": bool(current.get("disableResolveMessage")),
+        "provisioning": bool(current.get("provenance")),
+        "settings": _canonical_settings(current.get("settings")),
     }
+    after = {
+        "uid": new["uid"],
+        "name": new["name"],
+        "type": new["type"],
+        "disableResolveMessage": bool(new["disableResolveMessage"]),
+        "provisioning": bool(data.get("provisioning")),
+        "settings": _canonical_settings(new["settings"]),
+    }
+
+    # secure settings are either reported as redacted values or listed in
+    # secureFields, in both cases the stored value can't be read back
+    secure_fields = set(
+        key
+        for key, value in (current.get("settings") or {}).items()
+        if value == REDACTED_SECURE_VALUE
+    )
+    secure_fields.update(
+        key for key, value in (current.get("secureFields") or {}).items() if value
+    )
+    for key in secure_fields:
+        if key in after["settings"]:
+            if not compareSecureData:
+                # only the presence of the secure setting can be compared
+                before["settings"][key] = after["settings"][key]
+            else:
+                before["settings"][key] = REDACTED_SECURE_VALUE
 
-    type_settings = type_settings_map.get(data["type"])
-    if type_settings:
-        for setting_key, data_key in type_settings.items():
-            if data[data_key] is not None:
-                if data_key == "pushover_priority":
-                    payload["settings"][setting_key] = {
-                        "emergency": "2",
-                        "high": "1",
-                        "normal": "0",
-                        "low": "-1",
-                        "lowest": "-2",
-                    }[data[data_key]]
-                elif data_key == "dingding_message_type":
-                    payload["settings"][setting_key] = {
-                        "link": "link",
-                        "action_card": "actionCard",
-                    }[data[data_key]]
-                elif data_key in ["email_addresses", "pushover_devices"]:
-                    payload["settings"][setting_key] = ";".join(data[data_key])
-                elif data_key in ["slack_mention_users", "slack_mention_groups"]:
-                    payload["settings"][setting_key] = ",".join(data[data_key])
-                elif data.get(data_key):
-                    payload["settings"][setting_key] = data[data_key]
-
-    return payload
+    return dict(before=before, after=after)
 
 
 class GrafanaContactPointInterface(object):
@@ -974,20 +1190,30 @@ class GrafanaContactPointInterface(object):
             )
             self.grafana_switch_organisation(module.params, self.org_id)
         # }}}
-        self.contact_point = self.grafana_check_contact_point_match(module.params)
+        self.contact_point = None
+        self.contact_points = None
+        if module.params.get("contact_points") is not None:
+            self.contact_points = dict(
+                (cp["uid"], cp) for cp in self.grafana_get_contact_points(module.params)
+            )
+        else:
+            self.contact_point = self.grafana_check_contact_point_match(module.params)
 
-    def grafana_handle_api_provisioning(self, data):
-        if not self.contact_point or (
-            not self.contact_point.get("provenance") and not data.get("provisioning")
+    def grafana_api_provisioning_headers(self, data, contact_point):
+        headers = dict(self.headers)
+        if not contact_point or (
+            not contact_point.get("provenance") and not data.get("provisioning")
         ):
-            self.headers["X-Disable-Provenance"] = "true"
-        elif self.contact_point.get("provenance") and not data.get("provisioning"):
+            headers["X-Disable-Provenance"] = "true"
+        elif contact_point.get("provenance") and not data.get("provisioning"):
             self._module.fail_json(
                 msg="Unable to update contact point '%s': provisioning cannot be disabled if it's already enabled"
                 % data["uid"]
             )
-        else:
-            pass
+        return headers
+
+    def grafana_handle_api_provisioning(self, data):
+        self.headers = self.grafana_api_provisioning_headers(data, self.contact_point)
 
     def grafana_organization_by_name(self, data, org_name):
         r, info = fetch_url(
@@ -1017,7 +1243,7 @@ class GrafanaContactPointInterface(object):
                 "Unable to switch to organization '%s': %s" % (org_id, info)
             )
 
-    def grafana_check_contact_point_match(self, data):
+    def grafana_get_contact_points(self, data):
         r, info = fetch_url(
             self._module,
             "%s/api/v1/provisioning/contact-points" % data["url"],
@@ -1026,11 +1252,7 @@ class GrafanaContactPointInterface(object):
         )
 
         if info["status"] == 200:
-            contact_points = json.loads(to_text(r.read()))
-            contact_point = next(
-                (cp for cp in contact_points if cp["uid"] == data["uid"]), None
-            )
-            return contact_point
+            return json.loads(to_text(r.read()))
         elif info["status"] == 404:
             self._module.fail_json(
                 msg="Unable to get contact point: API endpoint not found - please check your Grafana version"
@@ -1040,12 +1262,75 @@ class GrafanaContactPointInterface(object):
                 "Unable to get contact point '%s': %s" % (data["uid"], info)
             )
 
+    def grafana_check_contact_point_match(self, data):
+        contact_points = self.grafana_get_contact_points(data)
+        return next((cp for cp in contact_points if cp["uid"] == data["uid"]), None)
+
+    def grafana_sync_contact_points(self, data):
+        items = []
+        for params in data["contact_points"]:
+            item = dict(data)
+            item.update(params)
+            items.append(item)
+        payloads = grafana_contact_point_payloads(items)
+
+        actions = []
+        managed_uids = set()
+        for item, payload in zip(items, payloads):
+            managed_uids.add(item["uid"])
+            contact_point = self.contact_points.get(item["uid"])
+            if item["state"] == "present":
+                headers = self.grafana_api_provisioning_headers(item, contact_point)
+                if contact_point is None:
+                    actions.append(("created", item, payload, headers))
+                else:
+                    diff = compare_contact_points(
+                        payload, contact_point, item, item["enforce_secure_data"]
+                    )
+                    if diff["before"] != diff["after"]:
+                        actions.append(("updated", item, payload, headers))
+            elif contact_point is not None:
+                actions.append(("deleted", item, None, self.headers))
+
+        if data["prune"]:
+            for uid, contact_point in self.contact_points.items():
+                # file provisioned contact points can't be managed through the API
+                if uid in managed_uids or contact_point.get("provenance") == "file":
+                    continue
+                item = dict(data, uid=uid, state="absent")
+                actions.append(("deleted", item, None, self.headers))
+
+        def apply(action):
+            verb, item, payload, headers = action
+            if verb == "created":
+                self.grafana_create_contact_point(item, payload, headers)
+            elif verb == "updated":
+                self.grafana_put_contact_point(item, payload, headers)
+            else:
+                self.grafana_delete_contact_point(item, headers)
+            return verb, item["uid"]
+
+        result = {"changed": False, "created": [], "updated": [], "deleted": []}
+        for verb, uid in run_concurrently(apply, actions, data["workers"]):
+            result[verb].append(uid)
+            result["changed"] = True
+        return result
+
     def grafana_handle_contact_point(self, data):
         payload = grafana_contact_point_payload(data)
 
         if data["state"] == "present":
             self.grafana_handle_api_provisioning(data)
             if self.contact_point:
+                diff = compare_contact_points(
+                    payload, self.contact_point, data, data["enforce_secure_data"]
+                )
+                if diff["before"] == diff["after"]:
+                    return {
+                        "changed": False,
+                        "contact_point": self.contact_point,
+                        "state": data["state"],
+                    }
                 return self.grafana_update_contact_point(data, payload)
             else:
                 return self.grafana_create_contact_point(data, payload)
@@ -1055,12 +1340,12 @@ class GrafanaContactPointInterface(object):
             else:
                 return {"changed": False, "state": data["state"]}
 
-    def grafana_create_contact_point(self, data, payload):
+    def grafana_create_contact_point(self, data, payload, headers=None):
         r, info = fetch_url(
             self._module,
             "%s/api/v1/provisioning/contact-points" % data["url"],
             data=json.dumps(payload),
-            headers=self.headers,
+            headers=headers or self.headers,
             method="POST",
         )
 
@@ -1074,44 +1359,46 @@ class GrafanaContactPointInterface(object):
         else:
             raise GrafanaAPIException("Unable to create contact point: %s" % info)
 
-    def grafana_update_contact_point(self, data, payload):
+    def grafana_put_contact_point(self, data, payload, headers=None):
         r, info = fetch_url(
             self._module,
             "%s/api/v1/provisioning/contact-points/%s" % (data["url"], data["uid"]),
             data=json.dumps(payload),
-            headers=self.headers,
+            headers=headers or self.headers,
             method="PUT",
         )
 
-        if info["status"] == 202:
-            contact_point = self.grafana_check_contact_point_match(data)
-
-            if contact_point.get("provenance") and data.get("provisioning"):
-                del contact_point["provenance"]
-
-            if self.contact_point == contact_point:
-                return {
-                    "changed": False,
-                    "contact_point": contact_point,
-                    "state": data["state"],
-                }
-            else:
-                return {
-                    "changed": True,
-                    "diff": {"before": self.contact_point, "after": contact_point},
-                    "contact_point": contact_point,
-                    "state": data["state"],
-                }
-        else:
+        if info["status"] != 202:
             raise GrafanaAPIException(
                 "Unable to update contact point '%s': %s" % (data["uid"], info)
             )
 
-    def grafana_delete_contact_point(self, data):
+    def grafana_update_contact_point(self, data, payload):
+        self.grafana_put_contact_point(data, payload)
+        contact_point = self.grafana_check_contact_point_match(data)
+
+        if contact_point.get("provenance") and data.get("provisioning"):
+            del contact_point["provenance"]
+
+        if self.contact_point == contact_point:
+            return {
+                "changed": False,
+                "contact_point": contact_point,
+                "state": data["state"],
+            }
+        else:
+            return {
+                "changed": True,
+                "diff": {"before": self.contact_point, "after": contact_point},
+                "contact_point": contact_point,
+                "state": data["state"],
+            }
+
+    def grafana_delete_contact_point(self, data, headers=None):
         r, info = fetch_url(
             self._module,
             "%s/api/v1/provisioning/contact-points/%s" % (data["url"], data["uid"]),
-            headers=self.headers,
+            headers=headers or self.headers,
             method="DELETE",
         )
 
@@ -1129,225 +1416,119 @@ class GrafanaContactPointInterface(object):
             )
 
 
-def main():
-    argument_spec = grafana_argument_spec()
-    argument_spec.update(
-        # general arguments
+def contact_point_argument_spec():
+    argument_spec = dict(
         disable_resolve_message=dict(type="bool", default=False),
+        enforce_secure_data=dict(type="bool", default=False),
         include_image=dict(type="bool", default=False),
         name=dict(type="str"),
-        org_id=dict(type="int", default=1),
-        org_name=dict(type="str"),
         provisioning=dict(type="bool", default=True),
-        type=dict(
-            type="str",
-            choices=[
-                "alertmanager",
-                "dingding",
-                "discord",
-                "email",
-                "googlechat",
-                "kafka",
-                "line",
-                "opsgenie",
-                "pagerduty",
-                "pushover",
-                "sensugo",
-                "slack",
-                "teams",
-                "telegram",
-                "threema",
-                "victorops",
-                "webex",
-                "webhook",
-                "wecom",
-            ],
-        ),
+        state=dict(type="str", choices=["present", "absent"], default="present"),
+        type=dict(type="str", choices=list(CONTACT_POINT_INTEGRATIONS)),
         uid=dict(required=True, type="str"),
-        # alertmanager
-        alertmanager_password=dict(type="str", no_log=True),
-        alertmanager_url=dict(type="str"),
-        alertmanager_username=dict(type="str"),
-        # dingding
-        dingding_message=dict(type="str"),
-        dingding_message_type=dict(type="str"),
-        dingding_title=dict(type="str"),
-        dingding_url=dict(type="str"),
-        # discord
-        discord_avatar_url=dict(type="str"),
-        discord_message=dict(type="str"),
-        discord_title=dict(type="str"),
-        discord_url=dict(type="str", no_log=True),
-        discord_use_username=dict(type="bool", default=False),
-        # email
-        email_addresses=dict(type="list", elements="str"),
-        email_message=dict(type="str"),
-        email_single=dict(type="bool", default=False),
-        email_subject=dict(type="str"),
-        # googlechat
-        googlechat_url=dict(type="str", no_log=True),
-        googlechat_message=dict(type="str"),
-        googlechat_title=dict(type="str"),
-        # kafka
-        kafka_api_version=dict(type="str", default="v2"),
-        kafka_cluster_id=dict(type="str"),
-        kafka_description=dict(type="str"),
-        kafka_details=dict(type="str"),
-        kafka_password=dict(type="str", no_log=True),
-        kafka_rest_proxy_url=dict(type="str", no_log=True),
-        kafka_topic=dict(type="str"),
-        kafka_username=dict(type="str"),
-        # line
-        line_description=dict(type="str"),
-        line_title=dict(type="str"),
-        line_token=dict(type="str", no_log=True),
-        # opsgenie
-        opsgenie_api_key=dict(type="str", no_log=True),
-        opsgenie_auto_close=dict(type="bool"),
-        opsgenie_description=dict(type="str"),
-        opsgenie_message=dict(type="str"),
-        opsgenie_override_priority=dict(type="bool"),
-        opsgenie_responders=dict(type="list", elements="dict"),
-        opsgenie_send_tags_as=dict(type="str"),
-        opsgenie_url=dict(type="str"),
-        # pagerduty
-        pagerduty_class=dict(type="str"),
-        pagerduty_client=dict(type="str"),
-        pagerduty_client_url=dict(type="str"),
-        pagerduty_component=dict(type="str"),
-        pagerduty_details=dict(type="list", elements="dict"),
-        pagerduty_group=dict(type="str"),
-        pagerduty_integration_key=dict(type="str", no_log=True),
-        pagerduty_severity=dict(
-            type="str", choices=["critical", "error", "warning", "info"]
-        ),
-        pagerduty_source=dict(type="str"),
-        pagerduty_summary=dict(type="str"),
-        # pushover
-        pushover_api_token=dict(type="str", no_log=True),
-        pushover_devices=dict(type="list", elements="str"),
-        pushover_expire=dict(type="int"),
-        pushover_message=dict(type="str"),
-        pushover_ok_priority=dict(type="int"),
-        pushover_ok_sound=dict(type="str"),
-        pushover_priority=dict(type="int"),
-        pushover_retry=dict(type="int"),
-        pushover_sound=dict(type="str"),
-        pushover_title=dict(type="str"),
-        pushover_upload_image=dict(type="bool", default=True),
-        pushover_user_key=dict(type="str", no_log=True),
-        # sensugo
-        sensugo_api_key=dict(type="str", no_log=True),
-        sensugo_url=dict(type="str"),
-        sensugo_check=dict(type="str"),
-        sensugo_entity=dict(type="str"),
-        sensugo_handler=dict(type="str"),
-        sensugo_message=dict(type="str"),
-        sensugo_namespace=dict(type="str"),
-        # slack
-        slack_endpoint_url=dict(type="str"),
-        slack_icon_emoji=dict(type="str"),
-        slack_icon_url=dict(type="str"),
-        slack_mention_channel=dict(type="str", choices=["here", "channel"]),
-        slack_mention_groups=dict(type="list", elements="str"),
-        slack_mention_users=dict(type="list", elements="str"),
-        slack_recipient=dict(type="str"),
-        slack_text=dict(type="str"),
-        slack_title=dict(type="str"),
-        slack_token=dict(type="str", no_log=True),
-        slack_url=dict(type="str", no_log=True),
-        slack_username=dict(type="str"),
-        # teams
-        teams_message=dict(type="str"),
-        teams_section_title=dict(type="str"),
-        teams_title=dict(type="str"),
-        teams_url=dict(type="str", no_log=True),
-        # telegram
-        telegram_chat_id=dict(type="str"),
-        telegram_disable_notifications=dict(type="bool"),
-        telegram_message=dict(type="str"),
-        telegram_parse_mode=dict(type="str"),
-        telegram_protect_content=dict(type="bool"),
-        telegram_token=dict(type="str", no_log=True),
-        telegram_web_page_view=dict(type="bool"),
-        # threema
-        threema_api_secret=dict(type="str", no_log=True),
-        threema_description=dict(type="str"),
-        threema_gateway_id=dict(type="str"),
-        threema_recipient_id=dict(type="str"),
-        threema_title=dict(type="str"),
-        # victorops
-        victorops_description=dict(type="str"),
-        victorops_message_type=dict(type="str", choices=["CRITICAL", "RECOVERY"]),
-        victorops_title=dict(type="str"),
-        victorops_url=dict(type="str"),
-        # webex
-        webex_api_url=dict(type="str"),
-        webex_message=dict(type="str"),
-        webex_room_id=dict(type="str"),
-        webex_token=dict(type="str", no_log=True),
-        # webhook
-        webhook_authorization_credentials=dict(type="str", no_log=True),
-        webhook_authorization_scheme=dict(type="str"),
-        webhook_http_method=dict(type="str", choices=["POST", "PUT"]),
-        webhook_max_alerts=dict(type="int"),
-        webhook_message=dict(type="str"),
-        webhook_password=dict(type="str", no_log=True),
-        webhook_title=dict(type="str"),
-        webhook_url=dict(type="str"),
-        webhook_username=dict(type="str"),
-        # wecom
-        wecom_agent_id=dict(type="str"),
-        wecom_corp_id=dict(type="str"),
-        wecom_message=dict(type="str"),
-        wecom_msg_type=dict(type="str"),
-        wecom_secret=dict(type="str", no_log=True),
-        wecom_title=dict(type="str"),
-        wecom_to_user=dict(type="list", elements="str"),
-        wecom_url=dict(type="str", no_log=True),
+    )
+    for integration, fields in CONTACT_POINT_INTEGRATIONS.items():
+        for setting_key, suffix, transform, required, spec in fields:
+            argument_spec["%s_%s" % (integration, suffix)] = dict(spec)
+    return argument_spec
+
+
+def contact_point_required_if():
+    return [
+        [
+            "type",
+            integration,
+            [
+                "%s_%s" % (integration, suffix)
+                for setting_key, suffix, transform, required, spec in fields
+                if required
+            ],
+        ]
+        for integration, fields in CONTACT_POINT_INTEGRATIONS.items()
+    ]
+
+
+def validate_contact_point(module, params):
+    validator = ArgumentSpecValidator(
+        contact_point_argument_spec(),
+        required_if=[["state", "present", ["name", "type"]]]
+        + contact_point_required_if(),
+    )
+    result = validator.validate(params)
+    if result.error_messages:
+        module.fail_json(
+            msg="Invalid contact point '%s': %s"
+            % (params.get("uid"), ", ".join(result.error_messages))
+        )
+    # the contact points are a plain list of dicts for AnsibleModule, mask
+    # their secure settings like the ones of a single contact point
+    for name, spec in contact_point_argument_spec().items():
+        value = result.validated_parameters.get(name)
+        if spec.get("no_log") and value:
+            values = value if isinstance(value, list) else [value]
+            module.no_log_values.update(to_native(item) for item in values)
+    return result.validated_parameters
+
+
+def setup_module_object():
+    argument_spec = grafana_argument_spec()
+    argument_spec.update(contact_point_argument_spec())
+    argument_spec.update(
+        uid=dict(type="str"),
+        org_id=dict(type="int", default=1),
+        org_name=dict(type="str"),
+        contact_points=dict(type="list", elements="dict"),
+        prune=dict(type="bool", default=False),
+        workers=dict(type="int", default=4),
     )
 
     module = AnsibleModule(
         argument_spec=argument_spec,
         supports_check_mode=False,
         required_together=[["url_username", "url_password", "org_id"]],
-        mutually_exclusive=[["url_username", "grafana_api_key"]],
-        required_if=[
-            ["state", "present", ["name", "type"]],
-            ["type", "alertmanager", ["alertmanager_url"]],
-            ["type", "dingding", ["dingding_url"]],
-            ["type", "discord", ["discord_url"]],
-            ["type", "email", ["email_addresses"]],
-            ["type", "googlechat", ["googlechat_url"]],
-            ["type", "kafka", ["kafka_rest_proxy_url", "kafka_topic"]],
-            ["type", "line", ["line_token"]],
-            ["type", "opsgenie", ["opsgenie_api_key", "opsgenie_url"]],
-            ["type", "pagerduty", ["pagerduty_integration_key"]],
-            ["type", "pushover", ["pushover_api_token", "pushover_user_key"]],
-            ["type", "sensugo", ["sensugo_api_key", "sensugo_url"]],
-            ["type", "slack", ["slack_recipient", "slack_token", "slack_url"]],
-            ["type", "teams", ["teams_url"]],
-            ["type", "telegram", ["telegram_chat_id", "telegram_token"]],
-            [
-                "type",
-                "threema",
-                ["threema_api_secret", "threema_gateway_id", "threema_recipient_id"],
-            ],
-            ["type", "victorops", ["victorops_url"]],
-            ["type", "webex", ["webex_token", "webex_room_id"]],
-            ["type", "webhook", ["webhook_url"]],
-            [
-                "type",
-                "wecom",
-                ["wecom_url", "wecom_agent_id", "wecom_corp_id", "wecom_secret"],
-            ],
+        mutually_exclusive=[
+            ["url_username", "grafana_api_key"],
+            ["uid", "contact_points"],
         ],
+        required_one_of=[["uid", "contact_points"]],
+        required_if=contact_point_required_if(),
     )
+    if module.params["contact_points"] is not None:
+        module.params["contact_points"] = [
+            validate_contact_point(module, contact_point)
+            for contact_point in module.params["contact_points"]
+        ]
+        uids = [
+            contact_point["uid"] for contact_point in module.params["contact_points"]
+        ]
+        duplicates = sorted(set(uid for uid in uids if uids.count(uid) > 1))
+        if duplicates:
+            module.fail_json(
+                msg="contact_points lists the same uid more than once: %s"
+                % ", ".join(duplicates)
+            )
+    elif module.params["state"] == "present":
+        missing = [key for key in ("name", "type") if module.params[key] is None]
+        if missing:
+            module.fail_json(
+                msg="state is present but all of the following are missing: %s"
+                % ", ".join(missing)
+            )
+    return module
 
+
+def main():
+    module = setup_module_object()
     module.params["url"] = clean_url(module.params["url"])
     grafana_iface = GrafanaContactPointInterface(module)
 
-    result = grafana_iface.grafana_handle_contact_point(module.params)
+    try:
+        if module.params["contact_points"] is not None:
+            result = grafana_iface.grafana_sync_contact_points(module.params)
+        else:
+            result = grafana_iface.grafana_handle_contact_point(module.params)
+    except GrafanaAPIException as e:
+        module.fail_json(msg=str(e))
     module.exit_json(failed=False, **result)
 
 
@@ -376,6 +376,7 @@ options:
     default: false
 extends_documentation_fragment:
 - community.grafana.basic_auth
+- community.grafana.session
 - community.grafana.api_key
 notes:
 - Secure data will get encrypted by the Grafana API, thus it can not be compared on subsequent runs. To workaround this, secure
@@ -746,6 +747,7 @@ class GrafanaInterface(object):
             self.headers["Authorization"] = basic_auth_header(
                 module.params["url_username"], module.params["url_password"]
             )
+            base.grafana_session_headers(module, self.headers)
             self.org_id = (
                 self.organization_by_name(module.params["org_name"])
                 if module.params["org_name"]
@@ -764,6 +766,12 @@ class GrafanaInterface(object):
         resp, info = fetch_url(
             self._module, full_url, data=data, headers=headers, method=method
         )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, headers
+        ):
+            resp, info = fetch_url(
+                self._module, full_url, data=data, headers=headers, method=method
+            )
         status_code = info["status"]
         if status_code == 404:
             return None
@@ -816,6 +824,7 @@ class GrafanaInterface(object):
 
 def setup_module_object():
     argument_spec = base.grafana_argument_spec()
+    argument_spec.update(base.grafana_session_argument_spec())
 
     argument_spec.update(
         name=dict(required=True, type="str"),
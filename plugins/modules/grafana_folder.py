@@ -78,6 +78,7 @@ options:
     version_added: "1.2.0"
 extends_documentation_fragment:
 - community.grafana.basic_auth
+- community.grafana.session
 - community.grafana.api_key
 """
 
@@ -226,6 +227,7 @@ class GrafanaFolderInterface(object):
             self.headers["Authorization"] = basic_auth_header(
                 module.params["url_username"], module.params["url_password"]
             )
+            base.grafana_session_headers(module, self.headers)
             self.org_id = (
                 self.organization_by_name(module.params["org_name"])
                 if module.params["org_name"]
@@ -257,6 +259,12 @@ class GrafanaFolderInterface(object):
         resp, info = fetch_url(
             self._module, full_url, data=data, headers=headers, method=method
         )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, headers
+        ):
+            resp, info = fetch_url(
+                self._module, full_url, data=data, headers=headers, method=method
+            )
         status_code = info["status"]
         if status_code == 404:
             return None
@@ -313,20 +321,12 @@ class GrafanaFolderInterface(object):
         return response
 
     def get_folder(self, title, uid=None, parent_uid=None):
-        url = "/api/folders%s" % ("?parentUid=%s" % parent_uid if parent_uid else "")
-        response = self._send_request(url, headers=self.headers, method="GET")
-        if response:
-            if uid:
-                folders = [item for item in response if item.get("uid") == uid]
-            else:
-                folders = [
-                    item for item in response if item.get("title") == to_text(title)
-                ]
-
-            if folders:
-                return folders[0]
-
-        return None
+        return base.grafana_find_folder(
+            lambda url: self._send_request(url, headers=self.headers, method="GET"),
+            title,
+            uid,
+            parent_uid,
+        )
 
     def delete_folder(self, folder_uid):
         url = "/api/folders/%s" % folder_uid
@@ -336,6 +336,7 @@ class GrafanaFolderInterface(object):
 
 def main():
     argument_spec = base.grafana_argument_spec()
+    argument_spec.update(base.grafana_session_argument_spec())
     argument_spec.update(
         name=dict(type="str", aliases=["title"], required=True),
         org_id=dict(default=1, type="int"),
@@ -0,0 +1,624 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import absolute_import, division, print_function
+
+DOCUMENTATION = """
+---
+module: grafana_folder_permission
+author:
+  - community.grafana maintainers (@ansible-collections)
+version_added: "2.4.0"
+short_description: Manage Grafana folder and dashboard permissions
+description:
+  - Set the permissions of Grafana folders and dashboards through the folder and dashboard permissions APIs.
+  - The complete list of permissions of a folder or a dashboard is compared with the current one, regardless of the
+    order of the entries, and written in a single request only when it differs.
+options:
+  folder_uid:
+    description:
+      - The UID of the folder.
+      - Mutually exclusive with C(folder_title), C(dashboard_uid), C(folders) and C(dashboards).
+    type: str
+  folder_title:
+    description:
+      - The title of the folder.
+      - Mutually exclusive with C(folder_uid), C(dashboard_uid), C(folders) and C(dashboards).
+    type: str
+  dashboard_uid:
+    description:
+      - The UID of the dashboard.
+      - Mutually exclusive with C(folder_uid), C(folder_title), C(folders) and C(dashboards).
+    type: str
+  parent_uid:
+    description:
+      - The UID of the parent folder of C(folder_title).
+      - Available with subfolder feature of Grafana 11.
+    type: str
+  permissions:
+    description:
+      - The complete list of permissions of the folder or the dashboard, the permissions which are not listed are
+        removed.
+      - Permissions inherited from the parent folders are not managed.
+      - Required with C(folder_uid), C(folder_title) or C(dashboard_uid).
+    type: list
+    elements: dict
+    suboptions:
+      role:
+        description:
+          - The organization role granted the permission.
+          - Mutually exclusive with C(team) and C(user).
+        type: str
+        choices: ["Viewer", "Editor"]
+      team:
+        description:
+          - The name of the team granted the permission.
+          - Mutually exclusive with C(role) and C(user).
+        type: str
+      user:
+        description:
+          - The login or email of the user granted the permission.
+          - Mutually exclusive with C(role) and C(team).
+        type: str
+      permission:
+        description:
+          - The permission granted on the folder or the dashboard.
+        type: str
+        required: true
+        choices: ["View", "Edit", "Admin"]
+  folders:
+    description:
+      - List of folders whose permissions are set in a single module run.
+      - The folders are handled with at most C(workers) parallel requests.
+      - Mutually exclusive with C(folder_uid), C(folder_title) and C(dashboard_uid).
+    type: list
+    elements: dict
+    suboptions:
+      uid:
+        description:
+          - The UID of the folder.
+          - Mutually exclusive with C(title).
+        type: str
+      title:
+        description:
+          - The title of the folder.
+          - Mutually exclusive with C(uid).
+        type: str
+      parent_uid:
+        description:
+          - The UID of the parent folder of C(title).
+        type: str
+      permissions:
+        description:
+          - The complete list of permissions of the folder, see the C(permissions) option.
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+          role:
+            description:
+              - The organization role granted the permission.
+              - Mutually exclusive with C(team) and C(user).
+            type: str
+            choices: ["Viewer", "Editor"]
+          team:
+            description:
+              - The name of the team granted the permission.
+              - Mutually exclusive with C(role) and C(user).
+            type: str
+          user:
+            description:
+              - The login or email of the user granted the permission.
+              - Mutually exclusive with C(role) and C(team).
+            type: str
+          permission:
+            description:
+              - The permission granted on the folder.
+            type: str
+            required: true
+            choices: ["View", "Edit", "Admin"]
+  dashboards:
+    description:
+      - List of dashboards whose permissions are set in a single module run.
+      - The dashboards are handled with at most C(workers) parallel requests, along with the C(folders).
+      - Mutually exclusive with C(folder_uid), C(folder_title) and C(dashboard_uid).
+    type: list
+    elements: dict
+    suboptions:
+      uid:
+        description:
+          - The UID of the dashboard.
+        type: str
+        required: true
+      permissions:
+        description:
+          - The complete list of permissions of the dashboard, see the C(permissions) option.
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+          role:
+            description:
+              - The organization role granted the permission.
+              - Mutually exclusive with C(team) and C(user).
+            type: str
+            choices: ["Viewer", "Editor"]
+          team:
+            description:
+              - The name of the team granted the permission.
+              - Mutually exclusive with C(role) and C(user).
+            type: str
+          user:
+            description:
+              - The login or email of the user granted the permission.
+              - Mutually exclusive with C(role) and C(team).
+            type: str
+          permission:
+            description:
+              - The permission granted on the dashboard.
+            type: str
+            required: true
+            choices: ["View", "Edit", "Admin"]
+  workers:
+    description:
+      - Maximum number of parallel requests sent to Grafana when applying C(folders) and C(dashboards).
+    type: int
+    default: 4
+  org_id:
+    description:
+      - Grafana organization ID of the folders and dashboards.
+      - Not used when C(grafana_api_key) is set, because the C(grafana_api_key) only
+        belongs to one organization.
+      - Mutually exclusive with C(org_name).
+    default: 1
+    type: int
+  org_name:
+    description:
+      - Grafana organization name of the folders and dashboards.
+      - Not used when C(grafana_api_key) is set, because the C(grafana_api_key) only
+        belongs to one organization.
+      - Mutually exclusive with C(org_id).
+    type: str
+extends_documentation_fragment:
+  - community.grafana.basic_auth
+  - community.grafana.session
+  - community.grafana.api_key
+notes:
+  - Supports C(check_mode).
+"""
+
+EXAMPLES = """
+---
+- name: Set the permissions of a folder
+  community.grafana.grafana_folder_permission:
+    url: "https://grafana.example.com"
+    grafana_api_key: "{{ some_api_token_value }}"
+    folder_title: "grafana_working_group"
+    permissions:
+      - role: Viewer
+        permission: View
+      - team: ops
+        permission: Edit
+      - user: jane.doe@example.com
+        permission: Admin
+
+- name: Set the permissions of several folders
+  community.grafana.grafana_folder_permission:
+    url: "https://grafana.example.com"
+    grafana_api_key: "{{ some_api_token_value }}"
+    folders:
+      - uid: ops
+        permissions:
+          - team: ops
+            permission: Admin
+      - uid: dev
+        permissions:
+          - team: dev
+            permission: Edit
+          - role: Viewer
+            permission: View
+
+- name: Set the permissions of a dashboard
+  community.grafana.grafana_folder_permission:
+    url: "https://grafana.example.com"
+    grafana_api_key: "{{ some_api_token_value }}"
+    dashboard_uid: "node-exporter"
+    permissions:
+      - team: ops
+        permission: Edit
+"""
+
+RETURN = """
+---
+permissions:
+    description: The permissions sent to Grafana, in the format of the folder and dashboard permissions APIs.
+    returned: when C(folder_uid), C(folder_title) or C(dashboard_uid) is set
+    type: list
+    elements: dict
+    sample:
+        - role: Viewer
+          permission: 1
+        - teamId: 2
+          permission: 2
+changed_folders:
+    description: The UIDs of the folders whose permissions were updated.
+    returned: when C(folders) is set
+    type: list
+    elements: str
+    sample:
+        - ops
+changed_dashboards:
+    description: The UIDs of the dashboards whose permissions were updated.
+    returned: when C(dashboards) is set
+    type: list
+    elements: str
+    sample:
+        - node-exporter
+"""
+
+import json
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.urls import fetch_url, basic_auth_header
+from ansible_collections.community.grafana.plugins.module_utils import base
+from ansible.module_utils.six.moves.urllib.parse import quote
+
+__metaclass__ = type
+
+PERMISSIONS = {"View": 1, "Edit": 2, "Admin": 4}
+
+
+def acl_key(item):
+    """Return the hashable identity of an entry of a folder or dashboard ACL."""
+    if item.get("role"):
+        return ("role", item["role"], item["permission"])
+    if item.get("teamId"):
+        return ("teamId", item["teamId"], item["permission"])
+    return ("userId", item.get("userId"), item["permission"])
+
+
+def acl_set(items):
+    """Return the ACL entries as a set, ignoring the inherited ones."""
+    return set(acl_key(item) for item in items or [] if not item.get("inherited"))
+
+
+def permissions_url(uid, dashboard=False):
+    """Return the path of the permissions API of a folder or a dashboard."""
+    if dashboard:
+        return "/api/dashboards/uid/{uid}/permissions".format(uid=quote(uid))
+    return "/api/folders/{uid}/permissions".format(uid=quote(uid))
+
+
+class GrafanaFolderPermissionInterface(object):
+    def __init__(self, module):
+        self._module = module
+        self.grafana_url = base.clean_url(module.params.get("url"))
+        self.org_id = None
+        self.folder_uids = {}
+        self.team_ids = None
+        self.user_ids = None
+        # {{{ Authentication header
+        self.headers = {"Content-Type": "application/json"}
+        if module.params.get("grafana_api_key", None):
+            self.headers["Authorization"] = (
+                "Bearer %s" % module.params["grafana_api_key"]
+            )
+        else:
+            self.headers["Authorization"] = basic_auth_header(
+                module.params["url_username"], module.params["url_password"]
+            )
+            base.grafana_session_headers(module, self.headers)
+            self.org_id = (
+                self.organization_by_name(module.params["org_name"])
+                if module.params["org_name"]
+                else module.params["org_id"]
+            )
+            self.switch_organization(self.org_id)
+        # }}}
+
+    def _send_request(self, url, data=None, headers=None, method="GET"):
+        if data is not None:
+            data = json.dumps(data, sort_keys=True)
+        if not headers:
+            headers = []
+
+        full_url = "{grafana_url}{path}".format(grafana_url=self.grafana_url, path=url)
+        resp, info = fetch_url(
+            self._module, full_url, data=data, headers=headers, method=method
+        )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, headers
+        ):
+            resp, info = fetch_url(
+                self._module, full_url, data=data, headers=headers, method=method
+            )
+        status_code = info["status"]
+        if status_code == 404:
+            return None
+        elif status_code == 401:
+            self._module.fail_json(
+                failed=True,
+                msg="Unauthorized to perform action '%s' on '%s'" % (method, full_url),
+            )
+        elif status_code == 403:
+            self._module.fail_json(failed=True, msg="Permission Denied")
+        elif status_code == 200:
+            response = resp.read() or "{}"
+            return self._module.from_json(response)
+        self._module.fail_json(
+            failed=True,
+            msg="Grafana permissions API answered with HTTP %d" % status_code,
+        )
+
+    def switch_organization(self, org_id):
+        url = "/api/user/using/%d" % org_id
+        self._send_request(url, headers=self.headers, method="POST")
+
+    def organization_by_name(self, org_name):
+        url = "/api/user/orgs"
+        organizations = self._send_request(url, headers=self.headers, method="GET")
+        orga = next((org for org in organizations if org["name"] == org_name), None)
+        if orga:
+            return orga["orgId"]
+
+        self._module.fail_json(
+            failed=True, msg="Current user isn't member of organization: %s" % org_name
+        )
+
+    def _paginate(self, url, key=None, size_param="perpage", perpage=1000):
+        """Return all the items of a paginated listing."""
+        items = []
+        page = 1
+        separator = "&" if "?" in url else "?"
+        while True:
+            response = self._send_request(
+                "%s%s%s=%d&page=%d" % (url, separator, size_param, perpage, page),
+                headers=self.headers,
+                method="GET",
+            )
+            page_items = (response or {}).get(key) if key else response
+            items.extend(page_items or [])
+            if len(page_items or []) < perpage:
+                return items
+            page += 1
+
+    def get_folder_uid(self, title, parent_uid=None):
+        if parent_uid not in self.folder_uids:
+            url = "/api/folders"
+            if parent_uid:
+                url += "?parentUid=%s" % quote(parent_uid)
+            self.folder_uids[parent_uid] = dict(
+                (folder["title"], folder["uid"])
+                for folder in self._paginate(url, size_param="limit")
+            )
+        uid = self.folder_uids[parent_uid].get(title)
+        if uid is None:
+            self._module.fail_json(failed=True, msg="Folder '%s' not found" % title)
+        return uid
+
+    def get_team_id(self, name):
+        if self.team_ids is None:
+            self.team_ids = dict(
+                (team["name"], team["id"])
+                for team in self._paginate("/api/teams/search", "teams")
+            )
+        if name not in self.team_ids:
+            self._module.fail_json(failed=True, msg="Team '%s' not found" % name)
+        return self.team_ids[name]
+
+    def get_user_id(self, login):
+        if self.user_ids is None:
+            self.user_ids = {}
+            for user in self._paginate("/api/org/users/search", "orgUsers"):
+                for key in ("login", "email"):
+                    if user.get(key):
+                        self.user_ids[user[key]] = user["userId"]
+        if login not in self.user_ids:
+            self._module.fail_json(
+                failed=True, msg="User '%s' not found in organization" % login
+            )
+        return self.user_ids[login]
+
+    def acl_items(self, permissions):
+        """Return the permissions in the format of the permissions APIs."""
+        items = []
+        for entry in permissions:
+            item = {"permission": PERMISSIONS[entry["permission"]]}
+            if entry["role"]:
+                item["role"] = entry["role"]
+            elif entry["team"]:
+                item["teamId"] = self.get_team_id(entry["team"])
+            else:
+                item["userId"] = self.get_user_id(entry["user"])
+            items.append(item)
+        return items
+
+    def get_permissions(self, uid, dashboard=False):
+        url = permissions_url(uid, dashboard)
+        response = self._send_request(url, headers=self.headers, method="GET")
+        if response is None:
+            self._module.fail_json(
+                failed=True,
+                msg="%s '%s' not found" % ("Dashboard" if dashboard else "Folder", uid),
+            )
+        return response
+
+    def set_permissions(self, uid, items, dashboard=False):
+        url = permissions_url(uid, dashboard)
+        return self._send_request(
+            url, data={"items": items}, headers=self.headers, method="POST"
+        )
+
+    def resolve_folder(self, uid, title, parent_uid, permissions):
+        """Return the uid of a folder and its ACL in the format of the API."""
+        if not uid:
+            uid = self.get_folder_uid(title, parent_uid)
+        return uid, self.acl_items(permissions)
+
+    def reconcile_permissions(self, uid, items, dashboard=False):
+        """Write the ACL of the folder, or the dashboard when dashboard is set, if it changed.
+
+        Return whether the ACL differed from the current one.
+        """
+        if acl_set(self.get_permissions(uid, dashboard)) == acl_set(items):
+            return False
+        if not self._module.check_mode:
+            self.set_permissions(uid, items, dashboard)
+        return True
+
+    def reconcile_folders(self, folders, workers=1, dashboards=None):
+        # names and titles are resolved before starting the workers
+        resolved = [
+            self.resolve_folder(
+                folder["uid"],
+                folder["title"],
+                folder["parent_uid"],
+                folder["permissions"],
+            )
+            + (False,)
+            for folder in folders or []
+        ] + [
+            (dashboard["uid"], self.acl_items(dashboard["permissions"]), True)
+            for dashboard in dashboards or []
+        ]
+
+        def apply(resource):
+            return self.reconcile_permissions(*resource)
+
+        changed = [
+            (uid, dashboard)
+            for (uid, items, dashboard), resource_changed in zip(
+                resolved, base.run_concurrently(apply, resolved, workers)
+            )
+            if resource_changed
+        ]
+        result = {"changed": bool(changed)}
+        if folders is not None:
+            result["changed_folders"] = [
+                uid for uid, dashboard in changed if not dashboard
+            ]
+        if dashboards is not None:
+            result["changed_dashboards"] = [
+                uid for uid, dashboard in changed if dashboard
+            ]
+        return result
+
+
+def setup_module_object():
+    permission_options = dict(
+        role=dict(type="str", choices=["Viewer", "Editor"]),
+        team=dict(type="str"),
+        user=dict(type="str"),
+        permission=dict(type="str", required=True, choices=list(PERMISSIONS)),
+    )
+    permissions_spec = dict(
+        type="list",
+        elements="dict",
+        options=permission_options,
+        mutually_exclusive=[["role", "team", "user"]],
+        required_one_of=[["role", "team", "user"]],
+    )
+    argument_spec = base.grafana_argument_spec()
+    argument_spec.update(base.grafana_session_argument_spec())
+    argument_spec.pop("state")
+    argument_spec.update(
+        folder_uid=dict(type="str"),
+        folder_title=dict(type="str"),
+        dashboard_uid=dict(type="str"),
+        parent_uid=dict(type="str"),
+        permissions=permissions_spec,
+        folders=dict(
+            type="list",
+            elements="dict",
+            options=dict(
+                uid=dict(type="str"),
+                title=dict(type="str"),
+                parent_uid=dict(type="str"),
+                permissions=dict(permissions_spec, required=True),
+            ),
+            mutually_exclusive=[["uid", "title"]],
+            required_one_of=[["uid", "title"]],
+        ),
+        dashboards=dict(
+            type="list",
+            elements="dict",
+            options=dict(
+                uid=dict(type="str", required=True),
+                permissions=dict(permissions_spec, required=True),
+            ),
+        ),
+        workers=dict(type="int", default=4),
+        org_id=dict(default=1, type="int"),
+        org_name=dict(type="str"),
+    )
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+        required_together=base.grafana_required_together()
+        + [["url_username", "url_password", "org_id"]],
+        mutually_exclusive=base.grafana_mutually_exclusive()
+        + [
+            ["org_id", "org_name"],
+            ["folder_uid", "folder_title", "dashboard_uid", "folders"],
+            ["folder_uid", "folder_title", "dashboard_uid", "dashboards"],
+            ["permissions", "folders"],
+            ["permissions", "dashboards"],
+        ],
+        required_one_of=[
+            ["folder_uid", "folder_title", "dashboard_uid", "folders", "dashboards"]
+        ],
+        required_by={
+            "folder_uid": "permissions",
+            "folder_title": "permissions",
+            "dashboard_uid": "permissions",
+        },
+    )
+    return module
+
+
+def main():
+    module = setup_module_object()
+    module.params["url"] = base.clean_url(module.params["url"])
+
+    grafana_iface = GrafanaFolderPermissionInterface(module)
+
+    if module.params["folders"] is not None or module.params["dashboards"] is not None:
+        result = grafana_iface.reconcile_folders(
+            module.params["folders"],
+            module.params["workers"],
+            module.params["dashboards"],
+        )
+        module.exit_json(**result)
+
+    if module.params["dashboard_uid"]:
+        uid = module.params["dashboard_uid"]
+        items = grafana_iface.acl_items(module.params["permissions"])
+    else:
+        uid, items = grafana_iface.resolve_folder(
+            module.params["folder_uid"],
+            module.params["folder_title"],
+            module.params["parent_uid"],
+            module.params["permissions"],
+        )
+    changed = grafana_iface.reconcile_permissions(
+        uid, items, dashboard=bool(module.params["dashboard_uid"])
+    )
+    module.exit_json(changed=changed, permissions=items)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible. If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+DOCUMENTATION = """
+---
+module: grafana_notification_policy
+author:
+  - community.grafana maintainers (@ansible-collections)
+version_added: "2.4.0"
+short_description: Manage Grafana Notification Policies
+description:
+  - Create/Update/Delete routes of the Grafana notification policy tree via API.
+  - The policy tree is downloaded once, every requested route edit is applied to it and the tree is written back
+    in a single request, only if it changed.
+options:
+  org_id:
+    description:
+      - The organization ID.
+    type: int
+    default: 1
+  org_name:
+    description:
+      - The name of the organization.
+    type: str
+  provisioning:
+    description:
+      - Indicates if provisioning is enabled.
+    type: bool
+    default: true
+  routes:
+    description:
+      - List of route edits applied to the notification policy tree.
+    type: list
+    elements: dict
+    required: true
+    suboptions:
+      path:
+        description:
+          - The object matchers of every route from the root policy down to the edited route.
+          - Each element is the list of C([label, operator, value]) matchers of one level of the tree.
+          - An empty list addresses the root policy, which can't be deleted.
+          - A route which does not exist yet is created in its parent, the parent has to exist.
+        type: list
+        elements: list
+        default: []
+      state:
+        description:
+          - Status of the route.
+        type: str
+        default: present
+        choices:
+          - present
+          - absent
+      receiver:
+        description:
+          - The name of the contact point receiving the notifications of the route.
+          - Required for the root policy.
+        type: str
+      group_by:
+        description:
+          - The labels used to group the alerts of the route.
+        type: list
+        elements: str
+      group_wait:
+        description:
+          - Time to wait before sending the first notification of a group, e.g. C(30s).
+        type: str
+      group_interval:
+        description:
+          - Time to wait before sending notifications about new alerts of a group, e.g. C(5m).
+        type: str
+      repeat_interval:
+        description:
+          - Time to wait before resending a notification, e.g. C(4h).
+        type: str
+      continue:
+        description:
+          - Continue matching the sibling routes after this one.
+        type: bool
+      mute_time_intervals:
+        description:
+          - The names of the mute timings of the route.
+        type: list
+        elements: str
+      active_time_intervals:
+        description:
+          - The names of the time intervals during which the route is active.
+        type: list
+        elements: str
+      routes:
+        description:
+          - The nested routes of the route, in the format of the Grafana API.
+          - Replaces all the nested routes when set.
+        type: list
+        elements: dict
+extends_documentation_fragment:
+  - community.grafana.basic_auth
+  - community.grafana.api_key
+notes:
+  - Route fields which are not set are left unchanged.
+  - Every write of the policy tree reloads the alertmanager configuration, the tree is therefore only written when the
+    canonical form of the edited tree differs from the current one.
+  - Supports C(check_mode) and C(diff).
+"""
+
+EXAMPLES = """
+- name: Route the alerts of the ops team to the ops contact point
+  community.grafana.grafana_notification_policy:
+    grafana_url: "{{ grafana_url }}"
+    grafana_user: "{{ grafana_username }}"
+    grafana_password: "{{ grafana_password }}"
+    routes:
+      - path: []
+        receiver: default
+        group_by:
+          - grafana_folder
+          - alertname
+      - path:
+          - [["team", "=", "ops"]]
+        receiver: ops
+        group_wait: 30s
+      - path:
+          - [["team", "=", "ops"]]
+          - [["severity", "=", "critical"]]
+        receiver: ops-pager
+        repeat_interval: 1h
+
+- name: Delete the route of the dev team
+  community.grafana.grafana_notification_policy:
+    grafana_url: "{{ grafana_url }}"
+    grafana_user: "{{ grafana_username }}"
+    grafana_password: "{{ grafana_password }}"
+    routes:
+      - path:
+          - [["team", "=", "dev"]]
+        state: absent
+"""
+
+RETURN = """
+policy:
+  description: The notification policy tree after the edits.
+  returned: success
+  type: dict
+  sample:
+    receiver: default
+    group_by:
+      - grafana_folder
+      - alertname
+    routes:
+      - receiver: ops
+        object_matchers:
+          - ["team", "=", "ops"]
+diff:
+  description: Difference between the previous and the updated notification policy tree.
+  returned: changed
+  type: complex
+  contains:
+    before:
+      description: Previous notification policy tree.
+      returned: changed
+      type: dict
+    after:
+      description: Updated notification policy tree.
+      returned: changed
+      type: dict
+"""
+
+import copy
+import json
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.urls import fetch_url
+from ansible.module_utils._text import to_text
+from ansible_collections.community.grafana.plugins.module_utils.base import (
+    grafana_argument_spec,
+    clean_url,
+)
+from ansible.module_utils.urls import basic_auth_header
+
+# route options which are copied as is in the policy tree
+ROUTE_FIELDS = (
+    "receiver",
+    "group_by",
+    "group_wait",
+    "group_interval",
+    "repeat_interval",
+    "continue",
+    "mute_time_intervals",
+    "active_time_intervals",
+    "routes",
+)
+
+
+class GrafanaAPIException(Exception):
+    pass
+
+
+def canonical_matchers(matchers):
+    return sorted(
+        tuple(to_text(item) for item in matcher) for matcher in matchers or []
+    )
+
+
+def canonical_policy(route):
+    """Return a comparable form of a route and its nested routes.
+
+    Empty fields, which Grafana omits or fills with defaults, are dropped and
+    the matchers and grouping labels, whose order does not matter, are sorted.
+    The order of the nested routes is kept as it defines the matching order.
+    """
+    canonical = {}
+    for key, value in route.items():
+        if key == "provenance" or value in (None, "", False, [], {}):
+            continue
+        if key == "object_matchers":
+            value = canonical_matchers(value)
+        elif key == "group_by":
+            value = sorted(value)
+        elif key == "routes":
+            value = [canonical_policy(child) for child in value]
+        canonical[key] = value
+    return canonical
+
+
+def find_route(tree, path):
+    """Return the parent of the route addressed by path, its index and the route.
+
+    The parent is None when one of the intermediate routes of path does not
+    exist, the index and the route are None when the route does not exist.
+    """
+    parent, index, route = None, None, tree
+    for level in path:
+        if route is None:
+            return None, None, None
+        matchers = canonical_matchers(level)
+        parent = route
+        index = next(
+            (
+                position
+                for position, child in enumerate(parent.get("routes") or [])
+                if canonical_matchers(child.get("object_matchers")) == matchers
+            ),
+            None,
+        )
+        route = parent["routes"][index] if index is not None else None
+    return parent, index, route
+
+
+def apply_route_edit(tree, edit):
+    """Apply a route edit to the policy tree in place."""
+    path = edit["path"] or []
+    parent, index, route = find_route(tree, path)
+
+    if edit["state"] == "absent":
+        if not path:
+            raise GrafanaAPIException("The root notification policy can't be deleted")
+        if route is not None:
+            del parent["routes"][index]
+            if not parent["routes"]:
+                parent.pop("routes")
+        return
+
+    if route is None:
+        if parent is None:
+            raise GrafanaAPIException(
+                "Parent of the notification policy %s does not exist" % path
+            )
+        route = {"object_matchers": [list(matcher) for matcher in path[-1]]}
+        parent.setdefault("routes", []).append(route)
+
+    for field in ROUTE_FIELDS:
+        if edit.get(field) is not None:
+            route[field] = copy.deepcopy(edit[field])
+
+
+class GrafanaNotificationPolicyInterface(object):
+    def __init__(self, module):
+        self._module = module
+        self.org_id = None
+        # {{{ Authentication header
+        self.headers = {"Content-Type": "application/json"}
+        if module.params.get("grafana_api_key", None):
+            self.headers["Authorization"] = (
+                "Bearer %s" % module.params["grafana_api_key"]
+            )
+        else:
+            self.headers["Authorization"] = basic_auth_header(
+                module.params["url_username"], module.params["url_password"]
+            )
+            self.org_id = (
+                self.grafana_organization_by_name(
+                    module.params, module.params["org_name"]
+                )
+                if module.params["org_name"]
+                else module.params["org_id"]
+            )
+            self.grafana_switch_organisation(module.params, self.org_id)
+        # }}}
+        self.policy = self.grafana_get_policy(module.params)
+
+    def grafana_handle_api_provisioning(self, data):
+        if not self.policy.get("provenance") and not data.get("provisioning"):
+            self.headers["X-Disable-Provenance"] = "true"
+        elif self.policy.get("provenance") and not data.get("provisioning"):
+            self._module.fail_json(
+                msg="Unable to update notification policy: provisioning cannot be disabled if it's already enabled"
+            )
+
+    def grafana_organization_by_name(self, data, org_name):
+        r, info = fetch_url(
+            self._module,
+            "%s/api/user/orgs" % data["url"],
+            headers=self.headers,
+            method="GET",
+        )
+        organizations = json.loads(to_text(r.read()))
+        orga = next((org for org in organizations if org["name"] == org_name), None)
+        if orga:
+            return orga["orgId"]
+
+        raise GrafanaAPIException(
+            "Current user isn't member of organization: %s" % org_name
+        )
+
+    def grafana_switch_organisation(self, data, org_id):
+        r, info = fetch_url(
+            self._module,
+            "%s/api/user/using/%s" % (data["url"], org_id),
+            headers=self.headers,
+            method="POST",
+        )
+        if info["status"] != 200:
+            raise GrafanaAPIException(
+                "Unable to switch to organization '%s': %s" % (org_id, info)
+            )
+
+    def grafana_get_policy(self, data):
+        r, info = fetch_url(
+            self._module,
+            "%s/api/v1/provisioning/policies" % data["url"],
+            headers=self.headers,
+            method="GET",
+        )
+
+        if info["status"] == 200:
+            return json.loads(to_text(r.read()))
+        elif info["status"] == 404:
+            self._module.fail_json(
+                msg="Unable to get notification policy: API endpoint not found - please check your Grafana version"
+            )
+        else:
+            raise GrafanaAPIException("Unable to get notification policy: %s" % info)
+
+    def grafana_update_policy(self, data, policy):
+        r, info = fetch_url(
+            self._module,
+            "%s/api/v1/provisioning/policies" % data["url"],
+            data=json.dumps(policy),
+            headers=self.headers,
+            method="PUT",
+        )
+
+        if info["status"] != 202:
+            raise GrafanaAPIException("Unable to update notification policy: %s" % info)
+
+    def grafana_handle_policy(self, data):
+        policy = copy.deepcopy(self.policy)
+        policy.pop("provenance", None)
+        for edit in data["routes"]:
+            apply_route_edit(policy, edit)
+
+        before = canonical_policy(self.policy)
+        after = canonical_policy(policy)
+        if before == after:
+            return {"changed": False, "policy": self.policy}
+
+        if not self._module.check_mode:
+            self.grafana_handle_api_provisioning(data)
+            self.grafana_update_policy(data, policy)
+        return {
+            "changed": True,
+            "policy": policy,
+            "diff": {"before": before, "after": after},
+        }
+
+
+def setup_module_object():
+    argument_spec = grafana_argument_spec()
+    argument_spec.pop("state")
+    argument_spec.update(
+        org_id=dict(type="int", default=1),
+        org_name=dict(type="str"),
+        provisioning=dict(type="bool", default=True),
+        routes=dict(
+            type="list",
+            elements="dict",
+            required=True,
+            options={
+                "path": dict(type="list", elements="list", default=[]),
+                "state": dict(
+                    type="str", choices=["present", "absent"], default="present"
+                ),
+                "receiver": dict(type="str"),
+                "group_by": dict(type="list", elements="str"),
+                "group_wait": dict(type="str"),
+                "group_interval": dict(type="str"),
+                "repeat_interval": dict(type="str"),
+                "continue": dict(type="bool"),
+                "mute_time_intervals": dict(type="list", elements="str"),
+                "active_time_intervals": dict(type="list", elements="str"),
+                "routes": dict(type="list", elements="dict"),
+            },
+        ),
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+        required_together=[["url_username", "url_password", "org_id"]],
+        mutually_exclusive=[["url_username", "grafana_api_key"]],
+    )
+    return module
+
+
+def main():
+    module = setup_module_object()
+    module.params["url"] = clean_url(module.params["url"])
+
+    try:
+        grafana_iface = GrafanaNotificationPolicyInterface(module)
+        result = grafana_iface.grafana_handle_policy(module.params)
+    except GrafanaAPIException as e:
+        module.fail_json(msg=str(e))
+    module.exit_json(failed=False, **result)
+
+
+if __name__ == "__main__":
+    main()
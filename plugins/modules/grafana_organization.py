@@ -33,7 +33,7 @@ options:
   name:
     description:
       - The name of the Grafana Organization.
-    required: true
+      - Required unless C(organizations) is set.
     type: str
   state:
     description:
@@ -41,8 +41,44 @@ options:
     default: present
     type: str
     choices: ["present", "absent"]
+  organizations:
+    description:
+      - List of organizations to reconcile in a single module run.
+      - Each element accepts the options C(name) and C(state) of a single organization.
+      - The existing organizations are listed once, then the missing organizations are created and the absent ones
+        deleted with at most C(workers) parallel requests.
+      - Mutually exclusive with C(name).
+    type: list
+    elements: dict
+    version_added: "2.4.0"
+  prune:
+    description:
+      - Delete the organizations which are not listed in C(organizations).
+      - The organizations listed in C(protected_organizations) and the main organization (id 1) are never deleted.
+      - Only used with C(organizations).
+    type: bool
+    default: false
+    version_added: "2.4.0"
+  protected_organizations:
+    description:
+      - Names of the organizations which are never deleted by C(prune).
+    type: list
+    elements: str
+    default: []
+    version_added: "2.4.0"
+  workers:
+    description:
+      - Maximum number of parallel requests sent to Grafana when applying C(organizations).
+    type: int
+    default: 4
+    version_added: "2.4.0"
+notes:
+- Unlike other modules from the collection, this module does not support C(grafana_api_key) authentication type. The
+  Grafana API endpoint for organizations management requires basic auth and server admin privileges, which service
+  account tokens can't be granted because they belong to one organization.
 extends_documentation_fragment:
 - community.grafana.basic_auth
+- community.grafana.session
 """
 
 EXAMPLES = """
@@ -55,6 +91,23 @@ EXAMPLES = """
     name: orgtest
     state: present
 
+- name: Reconcile the Grafana organizations
+  community.grafana.grafana_organization:
+    url: "https://grafana.example.com"
+    url_username: admin
+    url_password: changeme
+    prune: true
+    protected_organizations:
+      - legacy
+    organizations:
+      - name: ops
+      - name: dev
+  register: grafana_orgs
+
+- name: Use the id of an organization without resolving its name
+  ansible.builtin.debug:
+    msg: "{{ grafana_orgs.orgs['ops'] }}"
+
 - name: Delete a Grafana organization
   community.grafana.grafana_organization:
     url: "https://grafana.example.com"
@@ -94,17 +147,44 @@ org:
                 country: ""
                 state: ""
                 zipCode: ""
+orgs:
+    description: The ids of all the organizations, indexed by name, after the changes.
+    returned: when C(organizations) is set
+    type: dict
+    sample:
+        "Main Org.": 1
+        ops: 2
+created:
+    description: The names of the organizations created from C(organizations).
+    returned: when C(organizations) is set
+    type: list
+    elements: str
+    sample:
+        - ops
+deleted:
+    description: The names of the organizations deleted from C(organizations) or by C(prune).
+    returned: when C(organizations) is set
+    type: list
+    elements: str
+    sample: []
 """
 
 import json
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
 from ansible.module_utils.urls import fetch_url, basic_auth_header
 from ansible_collections.community.grafana.plugins.module_utils import base
+from ansible_collections.community.grafana.plugins.module_utils.base import (
+    run_concurrently,
+)
 from ansible.module_utils.six.moves.urllib.parse import quote
 
 __metaclass__ = type
 
+# the main organization can't be deleted
+MAIN_ORG_ID = 1
+
 
 class GrafanaOrgInterface(object):
     def __init__(self, module):
@@ -114,6 +194,7 @@ class GrafanaOrgInterface(object):
         self.headers["Authorization"] = basic_auth_header(
             module.params["url_username"], module.params["url_password"]
         )
+        base.grafana_session_headers(module, self.headers)
         # }}}
         self.grafana_url = base.clean_url(module.params.get("url"))
 
@@ -127,6 +208,12 @@ class GrafanaOrgInterface(object):
         resp, info = fetch_url(
             self._module, full_url, data=data, headers=headers, method=method
         )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, headers
+        ):
+            resp, info = fetch_url(
+                self._module, full_url, data=data, headers=headers, method=method
+            )
         status_code = info["status"]
         if status_code == 404:
             return None
@@ -159,11 +246,31 @@ class GrafanaOrgInterface(object):
         url = "/api/orgs/name/{name}".format(name=quote(name))
         return self._send_request(url, headers=self.headers, method="GET")
 
-    def create_org(self, name):
+    def get_orgs(self, perpage=1000):
+        """Return the ids of all the organizations indexed by name."""
+        # https://grafana.com/docs/grafana/latest/http_api/org/#search-all-organizations
+        orgs = {}
+        page = 1
+        while True:
+            url = "/api/orgs?perpage={perpage}&page={page}".format(
+                perpage=perpage, page=page
+            )
+            response = self._send_request(url, headers=self.headers, method="GET")
+            for org in response or []:
+                orgs[org["name"]] = org["id"]
+            if len(response or []) < perpage:
+                return orgs
+            page += 1
+
+    def create_org(self, name, lookup=True):
         # https://grafana.com/docs/http_api/org/#create-organization
         url = "/api/orgs"
         org = dict(name=name)
-        self._send_request(url, data=org, headers=self.headers, method="POST")
+        response = self._send_request(
+            url, data=org, headers=self.headers, method="POST"
+        )
+        if not lookup:
+            return response
         return self.get_actual_org(name)
 
     def delete_org(self, org_id):
@@ -171,20 +278,91 @@ class GrafanaOrgInterface(object):
         url = "/api/orgs/{org_id}".format(org_id=org_id)
         return self._send_request(url, headers=self.headers, method="DELETE")
 
+    def sync_orgs(self, organizations, prune=False, protected=None, workers=1):
+        """Create or delete organizations after a single listing of the
+        existing ones and return the ids of all the organizations by name."""
+        orgs = self.get_orgs()
+        listed = set(org["name"] for org in organizations)
+        protected = set(protected or [])
+        actions = []
+        for org in organizations:
+            if org["state"] == "present" and org["name"] not in orgs:
+                actions.append(("created", org["name"]))
+            elif org["state"] == "absent" and org["name"] in orgs:
+                actions.append(("deleted", org["name"]))
+        # an organization listed twice is handled once
+        actions = list(dict.fromkeys(actions))
+        if prune:
+            actions.extend(
+                ("deleted", name)
+                for name, org_id in orgs.items()
+                if name not in listed
+                and name not in protected
+                and org_id != MAIN_ORG_ID
+            )
+        for verb, name in actions:
+            if verb == "deleted" and orgs[name] == MAIN_ORG_ID:
+                self._module.fail_json(
+                    msg="The main organization %s can't be deleted" % name
+                )
+
+        def apply(action):
+            verb, name = action
+            if verb == "created":
+                return verb, name, self.create_org(name, lookup=False)["orgId"]
+            self.delete_org(orgs[name])
+            return verb, name, None
+
+        result = {"changed": bool(actions), "created": [], "deleted": []}
+        for verb, name, org_id in run_concurrently(apply, actions, workers):
+            result[verb].append(name)
+            if org_id is None:
+                orgs.pop(name)
+            else:
+                orgs[name] = org_id
+        result["orgs"] = orgs
+        return result
+
+
+def validate_org(module, params):
+    result = ArgumentSpecValidator(org_argument_spec).validate(params)
+    if result.error_messages:
+        module.fail_json(
+            msg="Invalid organization '%s': %s"
+            % (params.get("name"), ", ".join(result.error_messages))
+        )
+    return result.validated_parameters
+
 
 def setup_module_object():
     module = AnsibleModule(
         argument_spec=argument_spec,
         supports_check_mode=False,
         required_together=base.grafana_required_together(),
+        mutually_exclusive=[["name", "organizations"]],
+        required_one_of=[["name", "organizations"]],
     )
+    if module.params["organizations"] is not None:
+        module.params["organizations"] = [
+            validate_org(module, org) for org in module.params["organizations"]
+        ]
     return module
 
 
+org_argument_spec = dict(
+    state=dict(choices=["present", "absent"], default="present"),
+    name=dict(type="str", required=True),
+)
+
 argument_spec = base.grafana_argument_spec()
+argument_spec.update(base.grafana_session_argument_spec())
 argument_spec.update(
     state=dict(choices=["present", "absent"], default="present"),
-    name=dict(type="str", required=True),
+    name=dict(type="str"),
+    organizations=dict(type="list", elements="dict"),
+    prune=dict(type="bool", default=False),
+    protected_organizations=dict(type="list", elements="str", default=[]),
+    workers=dict(type="int", default=4),
 )
 argument_spec.pop("grafana_api_key")
 
@@ -196,6 +374,15 @@ def main():
 
     grafana_iface = GrafanaOrgInterface(module)
 
+    if module.params["organizations"] is not None:
+        result = grafana_iface.sync_orgs(
+            module.params["organizations"],
+            module.params["prune"],
+            module.params["protected_organizations"],
+            module.params["workers"],
+        )
+        module.exit_json(**result)
+
     # search org by name
     actual_org = grafana_iface.get_actual_org(name)
     if state == "present":
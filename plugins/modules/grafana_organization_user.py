@@ -32,9 +32,9 @@ description:
 options:
   login:
     type: str
-    required: True
     description:
       - Username or email.
+      - Required unless C(users) is set.
   role:
     type: str
     choices:
@@ -63,9 +63,38 @@ options:
     description:
       - Organization name.
       - Mutually exclusive with C(org_id).
+  users:
+    type: list
+    elements: dict
+    description:
+      - List of organization users to reconcile in a single module run.
+      - Each element accepts the options C(login), C(role) and C(state) of a single organization user.
+      - The users of the organization are listed once, then the missing users are added, the roles are updated and the
+        absent users are removed with at most C(workers) parallel requests.
+      - Mutually exclusive with C(login).
+    version_added: "2.4.0"
+  prune:
+    type: bool
+    default: false
+    description:
+      - Remove the users of the organization which are not listed in C(users).
+      - The user authenticating against the API is never removed.
+      - Only used with C(users).
+    version_added: "2.4.0"
+  workers:
+    type: int
+    default: 4
+    description:
+      - Maximum number of parallel requests sent to Grafana when applying C(users).
+    version_added: "2.4.0"
 
+notes:
+  - Unlike other modules from the collection, this module does not support C(grafana_api_key) authentication type. The
+    Grafana API endpoint for organization users management requires basic auth and server admin privileges, which
+    service account tokens can't be granted because they belong to one organization.
 extends_documentation_fragment:
   - community.grafana.basic_auth
+  - community.grafana.session
 """
 
 EXAMPLES = """
@@ -78,6 +107,19 @@ EXAMPLES = """
     login: john
     role: admin
 
+- name: Set the users of an organization
+  community.grafana.grafana_organization_user:
+    url: "{{ grafana_url }}"
+    url_username: "{{ grafana_username }}"
+    url_password: "{{ grafana_password }}"
+    org_name: ops
+    prune: true
+    users:
+      - login: john
+        role: admin
+      - login: jane@example.com
+        role: editor
+
 - name: Remove user from organization
   community.grafana.grafana_organization_user:
     url: "{{ grafana_url }}"
@@ -128,17 +170,41 @@ user:
                 - Admin
             sample:
               - Viewer
+added:
+    description: The logins of the users added to the organization from C(users).
+    returned: when C(users) is set
+    type: list
+    elements: str
+    sample:
+        - "john"
+updated:
+    description: The logins of the users from C(users) whose role was updated.
+    returned: when C(users) is set
+    type: list
+    elements: str
+    sample: []
+removed:
+    description: The logins of the users removed from the organization from C(users) or by C(prune).
+    returned: when C(users) is set
+    type: list
+    elements: str
+    sample: []
 """
 
 
 import json
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
 from ansible.module_utils.urls import fetch_url
 from ansible.module_utils._text import to_text
 from ansible_collections.community.grafana.plugins.module_utils.base import (
     grafana_argument_spec,
+    grafana_basic_auth_fallback,
+    grafana_session_argument_spec,
+    grafana_session_headers,
     clean_url,
+    run_concurrently,
 )
 from ansible.module_utils.urls import basic_auth_header
 
@@ -157,6 +223,7 @@ class GrafanaOrganizationUserInterface(object):
         self.headers["Authorization"] = basic_auth_header(
             module.params["url_username"], module.params["url_password"]
         )
+        grafana_session_headers(module, self.headers)
         # }}}
         self.grafana_url = clean_url(module.params.get("url"))
 
@@ -164,13 +231,24 @@ class GrafanaOrganizationUserInterface(object):
         data = None
         if payload:
             data = json.dumps(payload)
-        return fetch_url(
+        resp, info = fetch_url(
             self._module,
             self.grafana_url + "/api/" + path,
             headers=self.headers,
             method=method,
             data=data,
         )
+        if info["status"] == 401 and grafana_basic_auth_fallback(
+            self._module, self.headers
+        ):
+            resp, info = fetch_url(
+                self._module,
+                self.grafana_url + "/api/" + path,
+                headers=self.headers,
+                method=method,
+                data=data,
+            )
+        return resp, info
 
     def _organization_by_name(self, org_name):
         r, info = self._api_call("GET", "orgs/name/%s" % org_name, None)
@@ -178,13 +256,44 @@ class GrafanaOrganizationUserInterface(object):
             raise GrafanaAPIException("Unable to retrieve organization: %s" % info)
         return json.loads(to_text(r.read()))
 
-    def _organization_users(self, org_id):
-        r, info = self._api_call("GET", "orgs/%d/users" % org_id, None)
-        if info["status"] != 200:
-            raise GrafanaAPIException(
-                "Unable to retrieve organization users: %s" % info
+    def _organization_users(self, org_id, perpage=1000):
+        users = []
+        page = 1
+        while True:
+            r, info = self._api_call(
+                "GET",
+                "orgs/%d/users/search?perpage=%d&page=%d" % (org_id, perpage, page),
+                None,
             )
-        return json.loads(to_text(r.read()))
+            if info["status"] == 404 and page == 1:
+                # paginated search not available, list all the users at once
+                r, info = self._api_call("GET", "orgs/%d/users" % org_id, None)
+                if info["status"] != 200:
+                    raise GrafanaAPIException(
+                        "Unable to retrieve organization users: %s" % info
+                    )
+                return json.loads(to_text(r.read()))
+            if info["status"] != 200:
+                raise GrafanaAPIException(
+                    "Unable to retrieve organization users: %s" % info
+                )
+            response = json.loads(to_text(r.read()))
+            page_users = response.get("orgUsers") or []
+            users.extend(page_users)
+            if len(page_users) < perpage or page * perpage >= response.get(
+                "totalCount", 0
+            ):
+                return users
+            page += 1
+
+    def _organization_users_index(self, org_id):
+        """Return the users of the organization indexed by login and by email."""
+        index = {}
+        for user in self._organization_users(org_id):
+            for key in ("login", "email"):
+                if user.get(key):
+                    index.setdefault(user[key], user)
+        return index
 
     def _create_organization_user(self, org_id, login, role):
         return self._api_call(
@@ -209,9 +318,7 @@ class GrafanaOrganizationUserInterface(object):
         return self._api_call("DELETE", "orgs/%d/users/%s" % (org_id, user_id), None)
 
     def _organization_user_by_login(self, org_id, login):
-        for user in self._organization_users(org_id):
-            if login in (user["login"], user["email"]):
-                return user
+        return self._organization_users_index(org_id).get(login)
 
     def create_or_update_user(self, org_id, login, role):
         r, info = self._create_organization_user(org_id, login, role)
@@ -253,27 +360,116 @@ class GrafanaOrganizationUserInterface(object):
         else:
             raise GrafanaAPIException("Unable to delete organization user: %s" % info)
 
+    def sync_users(self, org_id, users, prune=False, workers=1):
+        """Add, update or remove organization users after a single listing of
+        the users of the organization."""
+        index = self._organization_users_index(org_id)
+        actions = []
+        managed = set()
+        for item in users:
+            user = index.get(item["login"])
+            if user is not None:
+                managed.add(user["userId"])
+            if item["state"] == "absent":
+                if user is not None:
+                    actions.append(("removed", item["login"], user["userId"], None))
+            elif user is None:
+                actions.append(("added", item["login"], None, item["role"]))
+            elif user["role"] != item["role"]:
+                actions.append(("updated", item["login"], user["userId"], item["role"]))
+
+        if prune:
+            # the authenticated user would lose its access to the organization
+            managed.update(
+                user["userId"]
+                for key, user in index.items()
+                if key == self._module.params["url_username"]
+            )
+            for user in index.values():
+                if user["userId"] not in managed:
+                    managed.add(user["userId"])
+                    actions.append(("removed", user["login"], user["userId"], None))
+
+        def apply(action):
+            verb, login, user_id, role = action
+            if verb == "added":
+                r, info = self._create_organization_user(org_id, login, role)
+                if info["status"] != 200:
+                    raise GrafanaAPIException(
+                        "Unable to add user %s to organization: %s" % (login, info)
+                    )
+            elif verb == "updated":
+                r, info = self._update_organization_user_role(org_id, user_id, role)
+                if info["status"] != 200:
+                    raise GrafanaAPIException(
+                        "Unable to update organization user %s: %s" % (login, info)
+                    )
+            else:
+                r, info = self._remove_organization_user(org_id, user_id)
+                if info["status"] != 200:
+                    raise GrafanaAPIException(
+                        "Unable to delete organization user %s: %s" % (login, info)
+                    )
+            return verb, login
+
+        result = {"changed": bool(actions), "added": [], "updated": [], "removed": []}
+        for verb, login in run_concurrently(apply, actions, workers):
+            result[verb].append(login)
+        return result
+
+
+user_argument_spec = dict(
+    login=dict(type="str", required=True),
+    role=dict(type="str", choices=["viewer", "editor", "admin"], default="viewer"),
+    state=dict(type="str", choices=["present", "absent"], default="present"),
+)
+
+
+def validate_user(module, params):
+    result = ArgumentSpecValidator(user_argument_spec).validate(params)
+    if result.error_messages:
+        module.fail_json(
+            msg="Invalid organization user '%s': %s"
+            % (params.get("login"), ", ".join(result.error_messages))
+        )
+    user = result.validated_parameters
+    user["role"] = user["role"].capitalize()
+    return user
+
 
 def main():
     argument_spec = grafana_argument_spec()
     argument_spec.pop("grafana_api_key")
+    argument_spec.update(grafana_session_argument_spec())
     argument_spec.update(
         org_id=dict(type="int", default=1),
         org_name=dict(type="str"),
-        login=dict(type="str", required=True),
+        login=dict(type="str"),
         role=dict(type="str", choices=["viewer", "editor", "admin"], default="viewer"),
+        users=dict(type="list", elements="dict"),
+        prune=dict(type="bool", default=False),
+        workers=dict(type="int", default=4),
     )
     module = AnsibleModule(
         argument_spec=argument_spec,
         supports_check_mode=False,
         mutually_exclusive=[
             ("org_id", "org_name"),
+            ("login", "users"),
+        ],
+        required_one_of=[
+            ("login", "users"),
         ],
         required_if=[
             ["state", "present", ["role"]],
         ],
     )
 
+    if module.params["users"] is not None:
+        module.params["users"] = [
+            validate_user(module, user) for user in module.params["users"]
+        ]
+
     org_id = module.params["org_id"]
     login = module.params["login"]
     iface = GrafanaOrganizationUserInterface(module)
@@ -281,7 +477,18 @@ def main():
         org_name = module.params["org_name"]
         organization = iface._organization_by_name(org_name)
         org_id = organization["id"]
-    if module.params["state"] == "present":
+    if module.params["users"] is not None:
+        try:
+            result = iface.sync_users(
+                org_id,
+                module.params["users"],
+                module.params["prune"],
+                module.params["workers"],
+            )
+        except GrafanaAPIException as e:
+            module.fail_json(msg=str(e))
+        module.exit_json(failed=False, **result)
+    elif module.params["state"] == "present":
         role = module.params["role"].capitalize()
         result = iface.create_or_update_user(org_id, login, role)
         module.exit_json(failed=False, **result)
@@ -0,0 +1,381 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import absolute_import, division, print_function
+
+DOCUMENTATION = """
+---
+module: grafana_service_account
+author:
+  - community.grafana maintainers (@ansible-collections)
+version_added: "2.4.0"
+short_description: Manage Grafana service accounts and their tokens
+description:
+  - Create/update/delete Grafana service accounts through the service accounts API.
+  - Mint a token of the service account and keep it in a local cache, so that the following tasks and runs can
+    authenticate with C(grafana_api_key) instead of basic auth, whose password is verified by Grafana on every request.
+options:
+  name:
+    description:
+      - The name of the service account.
+    type: str
+    required: true
+  role:
+    description:
+      - The organization role of the service account.
+    type: str
+    default: Viewer
+    choices: ["Viewer", "Editor", "Admin"]
+  is_disabled:
+    description:
+      - Disable the service account.
+    type: bool
+    default: false
+  state:
+    description:
+      - State of the service account.
+      - Deleting a service account revokes its tokens.
+    type: str
+    default: present
+    choices: ["present", "absent"]
+  token_name:
+    description:
+      - Name of a token of the service account to return.
+      - The token is minted when it isn't in C(token_cache) or doesn't exist anymore in Grafana, a token with the
+        same name whose key isn't cached is replaced.
+    type: str
+  token_ttl:
+    description:
+      - Lifetime in seconds of the minted tokens, C(0) for tokens which never expire.
+    type: int
+    default: 0
+  token_cache:
+    description:
+      - Path of the file caching the minted tokens, on the host running the module.
+      - The tokens are cached per Grafana instance, organization, service account and token name.
+      - The file and the lock file next to it are created only readable by their owner.
+    type: path
+    default: ~/.ansible/community.grafana/service_account_tokens.json
+  org_id:
+    description:
+      - Grafana organization ID of the service account.
+      - Not used when C(grafana_api_key) is set, because the C(grafana_api_key) only
+        belongs to one organization.
+      - Mutually exclusive with C(org_name).
+    default: 1
+    type: int
+  org_name:
+    description:
+      - Grafana organization name of the service account.
+      - Not used when C(grafana_api_key) is set, because the C(grafana_api_key) only
+        belongs to one organization.
+      - Mutually exclusive with C(org_id).
+    type: str
+extends_documentation_fragment:
+  - community.grafana.basic_auth
+  - community.grafana.session
+  - community.grafana.api_key
+notes:
+  - The tokens are returned in clear text, register the result with care.
+"""
+
+EXAMPLES = """
+---
+- name: Mint a token for the following tasks
+  community.grafana.grafana_service_account:
+    url: "https://grafana.example.com"
+    url_username: admin
+    url_password: changeme
+    name: ansible
+    role: Admin
+    token_name: ansible
+  register: grafana_service_account
+  no_log: true
+
+- name: Create a folder with the token
+  community.grafana.grafana_folder:
+    url: "https://grafana.example.com"
+    grafana_api_key: "{{ grafana_service_account.token }}"
+    title: "grafana_working_group"
+
+- name: Delete a service account
+  community.grafana.grafana_service_account:
+    url: "https://grafana.example.com"
+    url_username: admin
+    url_password: changeme
+    name: ansible
+    state: absent
+"""
+
+RETURN = """
+---
+service_account:
+    description: The service account.
+    returned: state is present
+    type: dict
+    sample:
+        id: 2
+        name: ansible
+        login: sa-ansible
+        orgId: 1
+        role: Admin
+        isDisabled: false
+token:
+    description: The key of the token named C(token_name).
+    returned: state is present and C(token_name) is set
+    type: str
+    sample: glsa_yscW25imSKJIuav8zF37RZmnbiDvB05G_fcaaf58a
+"""
+
+import json
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.urls import fetch_url, basic_auth_header
+from ansible_collections.community.grafana.plugins.module_utils import base
+from ansible.module_utils.six.moves.urllib.parse import quote
+
+__metaclass__ = type
+
+
+def token_cache_key(grafana_url, org_id, account_name, token_name):
+    return "|".join([grafana_url, str(org_id), account_name, token_name])
+
+
+class GrafanaServiceAccountInterface(object):
+    def __init__(self, module):
+        self._module = module
+        self.grafana_url = base.clean_url(module.params.get("url"))
+        self.org_id = None
+        # {{{ Authentication header
+        self.headers = {"Content-Type": "application/json"}
+        if module.params.get("grafana_api_key", None):
+            self.headers["Authorization"] = (
+                "Bearer %s" % module.params["grafana_api_key"]
+            )
+        else:
+            self.headers["Authorization"] = basic_auth_header(
+                module.params["url_username"], module.params["url_password"]
+            )
+            base.grafana_session_headers(module, self.headers)
+            self.org_id = (
+                self.organization_by_name(module.params["org_name"])
+                if module.params["org_name"]
+                else module.params["org_id"]
+            )
+            self.switch_organization(self.org_id)
+        # }}}
+
+    def _send_request(self, url, data=None, headers=None, method="GET"):
+        if data is not None:
+            data = json.dumps(data, sort_keys=True)
+        if not headers:
+            headers = []
+
+        full_url = "{grafana_url}{path}".format(grafana_url=self.grafana_url, path=url)
+        resp, info = fetch_url(
+            self._module, full_url, data=data, headers=headers, method=method
+        )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, headers
+        ):
+            resp, info = fetch_url(
+                self._module, full_url, data=data, headers=headers, method=method
+            )
+        status_code = info["status"]
+        if status_code == 404:
+            return None
+        elif status_code == 401:
+            self._module.fail_json(
+                failed=True,
+                msg="Unauthorized to perform action '%s' on '%s'" % (method, full_url),
+            )
+        elif status_code == 403:
+            self._module.fail_json(failed=True, msg="Permission Denied")
+        elif status_code in (200, 201):
+            response = resp.read() or "{}"
+            return self._module.from_json(response)
+        self._module.fail_json(
+            failed=True,
+            msg="Grafana service accounts API answered with HTTP %d" % status_code,
+        )
+
+    def switch_organization(self, org_id):
+        url = "/api/user/using/%d" % org_id
+        self._send_request(url, headers=self.headers, method="POST")
+
+    def organization_by_name(self, org_name):
+        url = "/api/user/orgs"
+        organizations = self._send_request(url, headers=self.headers, method="GET")
+        orga = next((org for org in organizations if org["name"] == org_name), None)
+        if orga:
+            return orga["orgId"]
+
+        self._module.fail_json(
+            failed=True, msg="Current user isn't member of organization: %s" % org_name
+        )
+
+    def get_service_account(self, name):
+        url = "/api/serviceaccounts/search?query={name}&perpage=1000".format(
+            name=quote(name)
+        )
+        response = self._send_request(url, headers=self.headers, method="GET")
+        return next(
+            (
+                account
+                for account in (response or {}).get("serviceAccounts") or []
+                if account["name"] == name
+            ),
+            None,
+        )
+
+    def create_service_account(self, name, role, is_disabled):
+        url = "/api/serviceaccounts"
+        account = {"name": name, "role": role, "isDisabled": is_disabled}
+        return self._send_request(
+            url, data=account, headers=self.headers, method="POST"
+        )
+
+    def update_service_account(self, account_id, name, role, is_disabled):
+        url = "/api/serviceaccounts/%d" % account_id
+        account = {"name": name, "role": role, "isDisabled": is_disabled}
+        return self._send_request(
+            url, data=account, headers=self.headers, method="PATCH"
+        )
+
+    def delete_service_account(self, account_id):
+        url = "/api/serviceaccounts/%d" % account_id
+        return self._send_request(url, headers=self.headers, method="DELETE")
+
+    def get_tokens(self, account_id):
+        url = "/api/serviceaccounts/%d/tokens" % account_id
+        return self._send_request(url, headers=self.headers, method="GET") or []
+
+    def create_token(self, account_id, name, ttl):
+        url = "/api/serviceaccounts/%d/tokens" % account_id
+        token = {"name": name}
+        if ttl:
+            token["secondsToLive"] = ttl
+        return self._send_request(url, data=token, headers=self.headers, method="POST")
+
+    def delete_token(self, account_id, token_id):
+        url = "/api/serviceaccounts/%d/tokens/%d" % (account_id, token_id)
+        return self._send_request(url, headers=self.headers, method="DELETE")
+
+    def ensure_token(self, account, token_name, ttl, cache_path):
+        """Return the key of the token of the account and whether it was minted.
+
+        The cached key is reused as long as the token still exists and hasn't
+        expired, otherwise the tokens with the same name are replaced by a new
+        one, because Grafana never returns the key of an existing token.
+        """
+        key = token_cache_key(
+            self.grafana_url, account["orgId"], account["name"], token_name
+        )
+        cached = base.read_cache(cache_path).get(key)
+        tokens = [
+            token
+            for token in self.get_tokens(account["id"])
+            if token["name"] == token_name
+        ]
+        if cached and any(
+            token["id"] == cached["id"] and not token.get("hasExpired")
+            for token in tokens
+        ):
+            return cached["key"], False
+
+        for token in tokens:
+            self.delete_token(account["id"], token["id"])
+        token = self.create_token(account["id"], token_name, ttl)
+        base.update_cache(cache_path, {key: {"id": token["id"], "key": token["key"]}})
+        return token["key"], True
+
+    def forget_tokens(self, account, cache_path):
+        prefix = token_cache_key(
+            self.grafana_url, account["orgId"], account["name"], ""
+        )
+        stale = [key for key in base.read_cache(cache_path) if key.startswith(prefix)]
+        if stale:
+            base.update_cache(cache_path, dict((key, None) for key in stale))
+
+
+def main():
+    argument_spec = base.grafana_argument_spec()
+    argument_spec.update(base.grafana_session_argument_spec())
+    argument_spec.update(
+        name=dict(type="str", required=True),
+        role=dict(type="str", default="Viewer", choices=["Viewer", "Editor", "Admin"]),
+        is_disabled=dict(type="bool", default=False),
+        token_name=dict(type="str", no_log=False),
+        token_ttl=dict(type="int", default=0, no_log=False),
+        token_cache=dict(
+            type="path",
+            default="~/.ansible/community.grafana/service_account_tokens.json",
+            no_log=False,
+        ),
+        org_id=dict(default=1, type="int"),
+        org_name=dict(type="str"),
+    )
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=False,
+        required_together=base.grafana_required_together()
+        + [["url_username", "url_password", "org_id"]],
+        mutually_exclusive=base.grafana_mutually_exclusive()
+        + [
+            ["org_id", "org_name"],
+        ],
+    )
+    name = module.params["name"]
+    role = module.params["role"]
+    is_disabled = module.params["is_disabled"]
+    module.params["url"] = base.clean_url(module.params["url"])
+
+    grafana_iface = GrafanaServiceAccountInterface(module)
+
+    changed = False
+    account = grafana_iface.get_service_account(name)
+
+    if module.params["state"] == "absent":
+        if account is None:
+            module.exit_json(changed=False)
+        grafana_iface.delete_service_account(account["id"])
+        grafana_iface.forget_tokens(account, module.params["token_cache"])
+        module.exit_json(changed=True)
+
+    if account is None:
+        account = grafana_iface.create_service_account(name, role, is_disabled)
+        changed = True
+    elif account["role"] != role or account["isDisabled"] != is_disabled:
+        grafana_iface.update_service_account(account["id"], name, role, is_disabled)
+        account.update(role=role, isDisabled=is_disabled)
+        changed = True
+    account.pop("tokens", None)
+
+    result = {"service_account": account}
+    if module.params["token_name"]:
+        result["token"], minted = grafana_iface.ensure_token(
+            account,
+            module.params["token_name"],
+            module.params["token_ttl"],
+            module.params["token_cache"],
+        )
+        changed = changed or minted
+    module.exit_json(changed=changed, **result)
+
+
+if __name__ == "__main__":
+    main()
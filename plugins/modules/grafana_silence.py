@@ -46,32 +46,59 @@ options:
   comment:
     description:
       - The comment that describes the silence.
-    required: true
+      - Required unless C(silences) or C(comment_regex) is set.
     type: str
   created_by:
     description:
       - The author that creates the silence.
-    required: true
+      - Required unless C(silences) or C(comment_regex) is set.
+      - With C(comment_regex), only the silences of this author are deleted.
     type: str
   starts_at:
     description:
       - ISO 8601 Timestamp with milliseconds  e.g. "2029-07-29T08:45:45.000Z" when the silence starts.
+      - Required unless C(silences) or C(comment_regex) is set.
     type: str
-    required: true
   ends_at:
     description:
       - ISO 8601 Timestamp with milliseconds  e.g. "2029-07-29T08:45:45.000Z" when the silence will end.
+      - Required unless C(silences) or C(comment_regex) is set.
     type: str
-    required: true
   matchers:
     description:
       - List of matchers to select which alerts are affected by the silence.
+      - Required unless C(silences) or C(comment_regex) is set.
     type: list
     elements: dict
-    required: true
+  silences:
+    description:
+      - List of silences to create or delete in a single module run.
+      - Each element accepts the options C(comment), C(created_by), C(starts_at), C(ends_at), C(matchers) and C(state)
+        of a single silence.
+      - The existing silences are listed once and the silences which have to be created or deleted are sent with at
+        most C(workers) parallel requests.
+      - Mutually exclusive with C(comment), C(starts_at), C(ends_at), C(matchers) and C(comment_regex).
+    type: list
+    elements: dict
+    version_added: "2.4.0"
+  comment_regex:
+    description:
+      - Delete all the silences whose comment matches this regular expression.
+      - Only the silences of C(created_by) are deleted when it is set.
+      - Requires C(state=absent).
+    type: str
+    version_added: "2.4.0"
+  workers:
+    description:
+      - Maximum number of parallel requests sent to Grafana when applying C(silences) or C(comment_regex).
+    type: int
+    default: 4
+    version_added: "2.4.0"
   state:
     description:
       - Delete the first occurrence of a silence with the same settings. Can be "absent" or "present".
+      - Silences are compared regardless of the order of their matchers and of the timezone of their timestamps,
+        expired silences are ignored.
     default: present
     type: str
     choices: ["present", "absent"]
@@ -84,6 +111,7 @@ options:
     default: False
 extends_documentation_fragment:
 - community.grafana.basic_auth
+- community.grafana.session
 - community.grafana.api_key
 """
 
@@ -118,6 +146,35 @@ EXAMPLES = """
         name: environment
         value: test
     state: absent
+
+- name: Open a maintenance window
+  community.grafana.grafana_silence:
+    grafana_url: "https://grafana.example.com"
+    grafana_api_key: "{{ some_api_token_value }}"
+    workers: 8
+    silences:
+      - comment: "maintenance"
+        created_by: "ansible"
+        starts_at: "2029-07-29T08:45:45.000Z"
+        ends_at: "2029-07-29T10:45:45.000Z"
+        matchers:
+          - name: host
+            value: web1
+      - comment: "maintenance"
+        created_by: "ansible"
+        starts_at: "2029-07-29T08:45:45.000Z"
+        ends_at: "2029-07-29T10:45:45.000Z"
+        matchers:
+          - name: host
+            value: web2
+
+- name: Close the maintenance window
+  community.grafana.grafana_silence:
+    grafana_url: "https://grafana.example.com"
+    grafana_api_key: "{{ some_api_token_value }}"
+    created_by: "ansible"
+    comment_regex: "^maintenance"
+    state: absent
 """
 
 RETURN = """
@@ -175,27 +232,137 @@ silence:
       type: str
       sample:
         - "2023-07-27T13:27:33.042Z"
+created:
+  description: The ids of the silences created from C(silences).
+  returned: when C(silences) or C(comment_regex) is set
+  type: list
+  elements: str
+  sample:
+    - ec27df6b-ac3c-412f-ae0b-6e3e1f41c9c3
+deleted:
+  description: The ids of the silences deleted from C(silences) or matching C(comment_regex).
+  returned: when C(silences) or C(comment_regex) is set
+  type: list
+  elements: str
+  sample: []
 """
 
 import json
+import re
+from datetime import datetime, timedelta
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
 from ansible.module_utils.urls import fetch_url, basic_auth_header
+from ansible.module_utils.six.moves.urllib.parse import urlencode
 from ansible.module_utils._text import to_text
 from ansible_collections.community.grafana.plugins.module_utils import base
+from ansible_collections.community.grafana.plugins.module_utils.base import (
+    run_concurrently,
+)
 
 __metaclass__ = type
 
 
+TIMESTAMP_RE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2})[T ](\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:?\d{2})?$"
+)
+
+
 class GrafanaError(Exception):
     pass
 
 
+def normalize_timestamp(value):
+    """Return an ISO 8601 timestamp in UTC with milliseconds.
+
+    Values which can't be parsed are returned unchanged.
+    """
+    match = TIMESTAMP_RE.match(value or "")
+    if not match:
+        return value
+    date, time, fraction, offset = match.groups()
+    timestamp = datetime.strptime("%sT%s" % (date, time), "%Y-%m-%dT%H:%M:%S")
+    timestamp += timedelta(microseconds=int((fraction or "0")[:6].ljust(6, "0")))
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        offset = offset[1:].replace(":", "")
+        timestamp -= sign * timedelta(hours=int(offset[:2]), minutes=int(offset[2:]))
+    return "%s.%03dZ" % (
+        timestamp.strftime("%Y-%m-%dT%H:%M:%S"),
+        timestamp.microsecond // 1000,
+    )
+
+
+def canonical_matchers(matchers):
+    return tuple(
+        sorted(
+            (
+                to_text(matcher.get("name")),
+                to_text(matcher.get("value")),
+                bool(matcher.get("isRegex")),
+                bool(matcher.get("isEqual", True)),
+            )
+            for matcher in matchers or []
+        )
+    )
+
+
+def silence_key(comment, created_by, starts_at, ends_at, matchers):
+    """Return the key identifying a silence regardless of the order of its
+    matchers and of the timezone of its timestamps."""
+    return (
+        comment,
+        created_by,
+        normalize_timestamp(starts_at),
+        normalize_timestamp(ends_at),
+        canonical_matchers(matchers),
+    )
+
+
+def index_silences(silences):
+    """Index the silences which are not expired by their silence_key.
+
+    When several silences share the same key the first one is kept.
+    """
+    index = {}
+    for silence in silences or []:
+        if silence.get("status", {}).get("state") == "expired":
+            continue
+        key = silence_key(
+            silence["comment"],
+            silence["createdBy"],
+            silence["startsAt"],
+            silence["endsAt"],
+            silence["matchers"],
+        )
+        index.setdefault(key, silence)
+    return index
+
+
+def silence_filters(matchers):
+    """Return the alertmanager filters selecting the silences with matchers.
+
+    Only the equality matchers can be used, alertmanager ignores the other
+    matchers of the silences when it applies the filters.
+    """
+    return [
+        '%s="%s"'
+        % (
+            matcher["name"],
+            to_text(matcher["value"]).replace("\\", "\\\\").replace('"', '\\"'),
+        )
+        for matcher in matchers or []
+        if not matcher.get("isRegex") and matcher.get("isEqual", True)
+    ]
+
+
 class GrafanaSilenceInterface(object):
     def __init__(self, module):
         self._module = module
         self.grafana_url = base.clean_url(module.params.get("url"))
         self.org_id = None
+        self.grafana_version = None
         # {{{ Authentication header
         self.headers = {"Content-Type": "application/json"}
         if module.params.get("grafana_api_key", None):
@@ -206,6 +373,7 @@ class GrafanaSilenceInterface(object):
             self.headers["Authorization"] = basic_auth_header(
                 module.params["url_username"], module.params["url_password"]
             )
+            base.grafana_session_headers(module, self.headers)
             self.org_id = (
                 self.organization_by_name(module.params["org_name"])
                 if module.params["org_name"]
@@ -235,6 +403,12 @@ class GrafanaSilenceInterface(object):
         resp, info = fetch_url(
             self._module, full_url, data=data, headers=headers, method=method
         )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, headers
+        ):
+            resp, info = fetch_url(
+                self._module, full_url, data=data, headers=headers, method=method
+            )
         status_code = info["status"]
         if status_code == 404:
             return None
@@ -269,13 +443,16 @@ class GrafanaSilenceInterface(object):
         )
 
     def get_version(self):
+        if self.grafana_version is not None:
+            return self.grafana_version
         url = "/api/health"
         response = self._send_request(
             url, data=None, headers=self.headers, method="GET"
         )
         version = response.get("version")
         if version is not None:
-            return base.parse_grafana_version(version)
+            self.grafana_version = base.parse_grafana_version(version)
+            return self.grafana_version
         raise GrafanaError("Failed to retrieve version from '%s'" % url)
 
     def create_silence(self, comment, created_by, starts_at, ends_at, matchers):
@@ -296,20 +473,8 @@ class GrafanaSilenceInterface(object):
         return response
 
     def get_silence(self, comment, created_by, starts_at, ends_at, matchers):
-        url = "/api/alertmanager/grafana/api/v2/silences"
-
-        responses = self._send_request(url, headers=self.headers, method="GET")
-
-        for response in responses:
-            if (
-                response["comment"] == comment
-                and response["createdBy"] == created_by
-                and response["startsAt"] == starts_at
-                and response["endsAt"] == ends_at
-                and response["matchers"] == matchers
-            ):
-                return response
-        return None
+        index = index_silences(self.get_silences(silence_filters(matchers)))
+        return index.get(silence_key(comment, created_by, starts_at, ends_at, matchers))
 
     def get_silence_by_id(self, silence_id):
         url = "/api/alertmanager/grafana/api/v2/silence/{SilenceId}".format(
@@ -318,8 +483,10 @@ class GrafanaSilenceInterface(object):
         response = self._send_request(url, headers=self.headers, method="GET")
         return response
 
-    def get_silences(self):
+    def get_silences(self, filters=None):
         url = "/api/alertmanager/grafana/api/v2/silences"
+        if filters:
+            url += "?%s" % urlencode([("filter", item) for item in filters])
         response = self._send_request(url, headers=self.headers, method="GET")
         return response
 
@@ -330,28 +497,131 @@ class GrafanaSilenceInterface(object):
         response = self._send_request(url, headers=self.headers, method="DELETE")
         return response
 
+    def sync_silences(self, silences, workers=1):
+        """Create or delete silences after a single listing of the existing ones."""
+        index = index_silences(self.get_silences())
+        actions = []
+        seen = set()
+        for silence in silences:
+            key = silence_key(
+                silence["comment"],
+                silence["created_by"],
+                silence["starts_at"],
+                silence["ends_at"],
+                silence["matchers"],
+            )
+            if key in seen:
+                continue
+            seen.add(key)
+            if silence["state"] == "present" and key not in index:
+                actions.append(("created", silence))
+            elif silence["state"] == "absent" and key in index:
+                actions.append(("deleted", index[key]["id"]))
+        return self._apply_silence_actions(actions, workers)
+
+    def delete_matching_silences(self, comment_regex, created_by=None, workers=1):
+        """Delete the silences of created_by whose comment matches comment_regex."""
+        pattern = re.compile(comment_regex)
+        actions = [
+            ("deleted", silence["id"])
+            for silence in index_silences(self.get_silences()).values()
+            if pattern.search(silence["comment"])
+            and (created_by is None or silence["createdBy"] == created_by)
+        ]
+        return self._apply_silence_actions(actions, workers)
+
+    def _apply_silence_actions(self, actions, workers):
+        # create_silence needs the version, resolve it before starting the workers
+        if any(verb == "created" for verb, item in actions):
+            self.get_version()
+
+        def apply(action):
+            verb, item = action
+            if verb == "created":
+                response = self.create_silence(
+                    item["comment"],
+                    item["created_by"],
+                    item["starts_at"],
+                    item["ends_at"],
+                    item["matchers"],
+                )
+                return verb, response["silenceID"]
+            self.delete_silence(item)
+            return verb, item
+
+        result = {"changed": bool(actions), "created": [], "deleted": []}
+        for verb, silence_id in run_concurrently(apply, actions, workers):
+            result[verb].append(silence_id)
+        return result
+
+
+def validate_silence(module, params):
+    result = ArgumentSpecValidator(silence_argument_spec).validate(params)
+    if result.error_messages:
+        module.fail_json(
+            msg="Invalid silence '%s': %s"
+            % (params.get("comment"), ", ".join(result.error_messages))
+        )
+    return result.validated_parameters
+
 
 def setup_module_object():
     module = AnsibleModule(
         argument_spec=argument_spec,
         supports_check_mode=False,
         required_together=base.grafana_required_together(),
-        mutually_exclusive=base.grafana_mutually_exclusive(),
+        mutually_exclusive=base.grafana_mutually_exclusive()
+        + [
+            ["silences", "comment"],
+            ["silences", "starts_at"],
+            ["silences", "ends_at"],
+            ["silences", "matchers"],
+            ["silences", "comment_regex"],
+            ["comment", "comment_regex"],
+        ],
     )
+    if module.params["silences"] is not None:
+        module.params["silences"] = [
+            validate_silence(module, silence) for silence in module.params["silences"]
+        ]
+    elif module.params["comment_regex"] is not None:
+        if module.params["state"] != "absent":
+            module.fail_json(msg="comment_regex requires state=absent")
+    else:
+        missing = [
+            key
+            for key in ("comment", "created_by", "starts_at", "ends_at", "matchers")
+            if module.params[key] is None
+        ]
+        if missing:
+            module.fail_json(msg="missing required arguments: %s" % ", ".join(missing))
     return module
 
 
-argument_spec = base.grafana_argument_spec()
-argument_spec.update(
+silence_argument_spec = dict(
     comment=dict(type="str", required=True),
     created_by=dict(type="str", required=True),
     ends_at=dict(type="str", required=True),
     matchers=dict(type="list", elements="dict", required=True),
+    starts_at=dict(type="str", required=True),
+    state=dict(type="str", choices=["present", "absent"], default="present"),
+)
+
+argument_spec = base.grafana_argument_spec()
+argument_spec.update(base.grafana_session_argument_spec())
+argument_spec.update(
+    comment=dict(type="str"),
+    comment_regex=dict(type="str"),
+    created_by=dict(type="str"),
+    ends_at=dict(type="str"),
+    matchers=dict(type="list", elements="dict"),
     org_id=dict(default=1, type="int"),
     org_name=dict(type="str"),
+    silences=dict(type="list", elements="dict"),
     skip_version_check=dict(type="bool", default=False),
-    starts_at=dict(type="str", required=True),
+    starts_at=dict(type="str"),
     state=dict(type="str", choices=["present", "absent"], default="present"),
+    workers=dict(type="int", default=4),
 )
 
 
@@ -368,6 +638,17 @@ def main():
     failed = False
     grafana_iface = GrafanaSilenceInterface(module)
 
+    if module.params["silences"] is not None:
+        result = grafana_iface.sync_silences(
+            module.params["silences"], module.params["workers"]
+        )
+        module.exit_json(failed=failed, **result)
+    if module.params["comment_regex"] is not None:
+        result = grafana_iface.delete_matching_silences(
+            module.params["comment_regex"], created_by, module.params["workers"]
+        )
+        module.exit_json(failed=failed, **result)
+
     silence = grafana_iface.get_silence(
         comment, created_by, starts_at, ends_at, matchers
     )
@@ -35,13 +35,23 @@ options:
   name:
     description:
       - The name of the Grafana Team.
-    required: true
+      - Required unless C(teams) is set.
     type: str
   email:
     description:
       - The mail address associated with the Team.
-    required: true
+      - Required unless C(teams) is set.
     type: str
+  teams:
+    description:
+      - List of teams to reconcile in a single module run.
+      - Each element accepts the options C(name), C(email), C(members), C(enforce_members) and C(state) of a single team.
+      - The existing teams are listed once, then the teams and their members are created, updated or deleted with at
+        most C(workers) parallel requests.
+      - Mutually exclusive with C(name).
+    type: list
+    elements: dict
+    version_added: "2.4.0"
   members:
     description:
       - List of team members (emails).
@@ -59,8 +69,17 @@ options:
     description:
       - Delete the members not found in the C(members) parameters from the
       - list of members found on the Team.
+      - Starting Grafana 10, the whole list of members is set in a single request, the members are added and
+        deleted one by one when the Grafana release doesn't provide the endpoint.
     default: false
     type: bool
+  workers:
+    description:
+      - Maximum number of parallel requests sent to Grafana when adding or removing members, or when reconciling
+        C(teams).
+    type: int
+    default: 4
+    version_added: "2.4.0"
   skip_version_check:
     description:
       - Skip Grafana version check and try to reach api endpoint anyway.
@@ -86,6 +105,7 @@ options:
     type: str
 extends_documentation_fragment:
 - community.grafana.basic_auth
+- community.grafana.session
 - community.grafana.api_key
 """
 
@@ -122,6 +142,19 @@ EXAMPLES = """
     enforce_members: true
     state: present
 
+- name: Reconcile several teams
+  community.grafana.grafana_team:
+    url: "https://grafana.example.com"
+    grafana_api_key: "{{ some_api_token_value }}"
+    teams:
+      - name: "grafana_working_group"
+        email: "foo.bar@example.com"
+        members:
+          - john.doe@example.com
+        enforce_members: true
+      - name: "legacy_group"
+        state: absent
+
 - name: Delete a team
   community.grafana.grafana_team:
     url: "https://grafana.example.com"
@@ -200,16 +233,43 @@ team:
             type: int
             sample:
                 - 1
+created:
+    description: The names of the teams created from C(teams).
+    returned: when C(teams) is set
+    type: list
+    elements: str
+    sample:
+        - "grafana_working_group"
+updated:
+    description: The names of the teams from C(teams) whose email or members were updated.
+    returned: when C(teams) is set
+    type: list
+    elements: str
+    sample: []
+deleted:
+    description: The names of the teams deleted from C(teams).
+    returned: when C(teams) is set
+    type: list
+    elements: str
+    sample:
+        - "legacy_group"
 """
 
 import json
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
 from ansible.module_utils.urls import fetch_url, basic_auth_header
 from ansible.module_utils._text import to_text
 from ansible_collections.community.grafana.plugins.module_utils import base
+from ansible_collections.community.grafana.plugins.module_utils.base import (
+    run_concurrently,
+)
 from ansible.module_utils.six.moves.urllib.parse import quote
 
+# team member permission of the team administrators
+TEAM_ADMIN_PERMISSION = 4
+
 __metaclass__ = type
 
 
@@ -221,6 +281,8 @@ class GrafanaTeamInterface(object):
     def __init__(self, module):
         self._module = module
         self.grafana_url = base.clean_url(module.params.get("url"))
+        self.grafana_version = None
+        self.org_user_ids = None
 
         # {{{ Authentication header
         self.headers = {"Content-Type": "application/json"}
@@ -229,10 +291,10 @@ class GrafanaTeamInterface(object):
 
         if module.params.get("skip_version_check") is False:
             try:
-                grafana_version = self.get_version()
+                self.grafana_version = self.get_version()
             except GrafanaError as e:
                 self._module.fail_json(failed=True, msg=to_text(e))
-            if grafana_version["major"] < 5:
+            if self.grafana_version["major"] < 5:
                 self._module.fail_json(
                     failed=True, msg="Teams API is available starting Grafana v5"
                 )
@@ -244,6 +306,15 @@ class GrafanaTeamInterface(object):
             headers=self.headers,
             method="POST",
         )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, self.headers
+        ):
+            r, info = fetch_url(
+                self._module,
+                "%s/api/user/using/%s" % (self.grafana_url, org_id),
+                headers=self.headers,
+                method="POST",
+            )
 
         if info["status"] != 200:
             self._module.fail_json(
@@ -277,6 +348,7 @@ class GrafanaTeamInterface(object):
             self.headers["Authorization"] = basic_auth_header(
                 self._module.params["url_username"], self._module.params["url_password"]
             )
+            base.grafana_session_headers(self._module, self.headers)
             self.org_id = (
                 self.organization_by_name(self._module.params["org_name"])
                 if self._module.params["org_name"]
@@ -294,6 +366,12 @@ class GrafanaTeamInterface(object):
         resp, info = fetch_url(
             self._module, full_url, data=data, headers=headers, method=method
         )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, headers
+        ):
+            resp, info = fetch_url(
+                self._module, full_url, data=data, headers=headers, method=method
+            )
         status_code = info["status"]
         if status_code == 404:
             return None
@@ -333,12 +411,31 @@ class GrafanaTeamInterface(object):
     def get_team(self, name):
         url = "/api/teams/search?name={team}".format(team=quote(name))
         response = self._send_request(url, headers=self.headers, method="GET")
-        if not response.get("totalCount") <= 1:
-            raise AssertionError("Expected 1 team, got %d" % response["totalCount"])
-
-        if len(response.get("teams")) == 0:
+        # the search may also return teams whose name only starts with name
+        teams = [
+            team for team in response.get("teams") or [] if team.get("name") == name
+        ]
+        if not teams:
             return None
-        return response.get("teams")[0]
+        return teams[0]
+
+    def get_teams(self, perpage=1000):
+        """Return all the teams of the organization indexed by name."""
+        teams = {}
+        page = 1
+        while True:
+            url = "/api/teams/search?perpage={perpage}&page={page}".format(
+                perpage=perpage, page=page
+            )
+            response = self._send_request(url, headers=self.headers, method="GET")
+            page_teams = response.get("teams") or []
+            for team in page_teams:
+                teams.setdefault(team["name"], team)
+            if len(page_teams) < perpage or page * perpage >= response.get(
+                "totalCount", 0
+            ):
+                return teams
+            page += 1
 
     def update_team(self, team_id, name, email):
         url = "/api/teams/{team_id}".format(team_id=team_id)
@@ -353,24 +450,159 @@ class GrafanaTeamInterface(object):
         response = self._send_request(url, headers=self.headers, method="DELETE")
         return response
 
-    def get_team_members(self, team_id):
+    def get_team_members(self, team_id, details=False):
         url = "/api/teams/{team_id}/members".format(team_id=team_id)
         response = self._send_request(url, headers=self.headers, method="GET")
+        if details:
+            return response
         members = [item.get("email") for item in response]
         return members
 
-    def add_team_member(self, team_id, email):
+    def add_team_member(self, team_id, email, user_id=None):
         url = "/api/teams/{team_id}/members".format(team_id=team_id)
-        data = {"userId": self.get_user_id_from_mail(email)}
+        if user_id is None:
+            user_id = self.get_user_id_from_mail(email)
+        data = {"userId": user_id}
         self._send_request(url, data=data, headers=self.headers, method="POST")
 
-    def delete_team_member(self, team_id, email):
-        user_id = self.get_user_id_from_mail(email)
+    def delete_team_member(self, team_id, email, user_id=None):
+        if user_id is None:
+            user_id = self.get_user_id_from_mail(email)
         url = "/api/teams/{team_id}/members/{user_id}".format(
             team_id=team_id, user_id=user_id
         )
         self._send_request(url, headers=self.headers, method="DELETE")
 
+    def set_team_members(self, team_id, members, admins):
+        url = "/api/teams/{team_id}/members".format(team_id=team_id)
+        data = {"members": members, "admins": admins}
+        # Grafana releases without the endpoint answer with HTTP 404
+        response = self._send_request(
+            url, data=data, headers=self.headers, method="PUT"
+        )
+        return response is not None
+
+    def get_org_user_ids(self, perpage=1000):
+        """Return the ids of the users of the organization by lowercased email and login.
+
+        The index is built once per module run. An empty index is returned when
+        the paginated search of the organization users is not available.
+        """
+        if self.org_user_ids is not None:
+            return self.org_user_ids
+        self.org_user_ids = user_ids = {}
+        page = 1
+        while True:
+            url = "/api/org/users/search?perpage={perpage}&page={page}".format(
+                perpage=perpage, page=page
+            )
+            response = self._send_request(url, headers=self.headers, method="GET")
+            if not response:
+                return user_ids
+            users = response.get("orgUsers") or []
+            for user in users:
+                for key in ("login", "email"):
+                    if user.get(key):
+                        user_ids[user[key].lower()] = user["userId"]
+            if len(users) < perpage or page * perpage >= response.get("totalCount", 0):
+                return user_ids
+            page += 1
+
+    def sync_team_members(self, team_id, members, enforce_members, workers=1):
+        """Add the missing members of the team and, when enforce_members is set,
+        delete the members not listed in members.
+
+        Return the list of emails of the team members after the changes, or
+        None when the team was left unchanged.
+        """
+        members = list(dict.fromkeys(members))
+        current = self.get_team_members(team_id, details=True)
+        plan = diff_members(members, [item.get("email") for item in current])
+        to_add = plan["to_add"]
+        to_del = plan["to_del"] if enforce_members else []
+        if not to_add and not to_del:
+            return None
+
+        if (
+            enforce_members
+            and self.grafana_version
+            and self.grafana_version["major"] >= 10
+        ):
+            # keep the administrators of the team, they are not demoted
+            target = set(members)
+            admins = set(
+                item.get("email")
+                for item in current
+                if item.get("permission") == TEAM_ADMIN_PERMISSION
+                and item.get("email") in target
+            )
+            if self.set_team_members(
+                team_id,
+                [member for member in members if member not in admins],
+                [member for member in members if member in admins],
+            ):
+                return members
+
+        user_ids = self.get_org_user_ids() if to_add else {}
+        current_ids = dict((item.get("email"), item.get("userId")) for item in current)
+
+        def apply(action):
+            verb, member = action
+            if verb == "add":
+                self.add_team_member(team_id, member, user_ids.get(member.lower()))
+            else:
+                self.delete_team_member(team_id, member, current_ids.get(member))
+
+        run_concurrently(
+            apply,
+            [("add", member) for member in to_add]
+            + [("delete", member) for member in to_del],
+            workers,
+        )
+        deleted = set(to_del)
+        return [
+            item.get("email") for item in current if item.get("email") not in deleted
+        ] + to_add
+
+    def sync_teams(self, teams, workers=1):
+        """Create, update or delete teams and their members after a single
+        listing of the existing teams."""
+        existing = self.get_teams()
+        if any(team["state"] == "present" and team["members"] for team in teams):
+            # build the user index before starting the workers
+            self.get_org_user_ids()
+
+        def apply(team):
+            current = existing.get(team["name"])
+            if team["state"] == "absent":
+                if current is None:
+                    return None
+                self.delete_team(current["id"])
+                return "deleted"
+            verb = None
+            if current is None:
+                team_id = self.create_team(team["name"], team["email"])["teamId"]
+                verb = "created"
+            else:
+                team_id = current["id"]
+                if current.get("email") != team["email"]:
+                    self.update_team(team_id, team["name"], team["email"])
+                    verb = "updated"
+            if team["members"] is not None:
+                members = self.sync_team_members(
+                    team_id, team["members"], team["enforce_members"]
+                )
+                if members is not None:
+                    verb = verb or "updated"
+            return verb
+
+        result = {"changed": False, "created": [], "updated": [], "deleted": []}
+        for team, verb in zip(teams, run_concurrently(apply, teams, workers)):
+            if verb:
+                result["changed"] = True
+                result[verb].append(team["name"])
+        return result
+
     def get_user_id_from_mail(self, email):
         url = "/api/users/lookup?loginOrEmail={email}".format(email=quote(email))
         user = self._send_request(url, headers=self.headers, method="GET")
@@ -379,6 +611,19 @@ class GrafanaTeamInterface(object):
         return user.get("id")
 
 
+def validate_team(module, params):
+    validator = ArgumentSpecValidator(
+        team_argument_spec, required_if=[["state", "present", ["email"]]]
+    )
+    result = validator.validate(params)
+    if result.error_messages:
+        module.fail_json(
+            msg="Invalid team '%s': %s"
+            % (params.get("name"), ", ".join(result.error_messages))
+        )
+    return result.validated_parameters
+
+
 def setup_module_object():
     module = AnsibleModule(
         argument_spec=argument_spec,
@@ -388,20 +633,40 @@ def setup_module_object():
         mutually_exclusive=base.grafana_mutually_exclusive()
         + [
             ["org_id", "org_name"],
+            ["name", "teams"],
         ],
     )
+    if module.params["teams"] is not None:
+        module.params["teams"] = [
+            validate_team(module, team) for team in module.params["teams"]
+        ]
+    else:
+        missing = [key for key in ("name", "email") if module.params[key] is None]
+        if missing:
+            module.fail_json(msg="missing required arguments: %s" % ", ".join(missing))
     return module
 
 
+team_argument_spec = dict(
+    name=dict(type="str", required=True),
+    email=dict(type="str"),
+    members=dict(type="list", elements="str"),
+    enforce_members=dict(type="bool", default=False),
+    state=dict(type="str", default="present", choices=["present", "absent"]),
+)
+
 argument_spec = base.grafana_argument_spec()
+argument_spec.update(base.grafana_session_argument_spec())
 argument_spec.update(
-    name=dict(type="str", required=True),
+    name=dict(type="str"),
     org_id=dict(default=1, type="int"),
     org_name=dict(type="str"),
-    email=dict(type="str", required=True),
+    email=dict(type="str"),
+    teams=dict(type="list", elements="dict"),
     members=dict(type="list", elements="str", required=False),
     enforce_members=dict(type="bool", default=False),
     skip_version_check=dict(type="bool", default=False),
+    workers=dict(type="int", default=4),
 )
 
 
@@ -415,6 +680,12 @@ def main():
 
     grafana_iface = GrafanaTeamInterface(module)
 
+    if module.params["teams"] is not None:
+        result = grafana_iface.sync_teams(
+            module.params["teams"], module.params["workers"]
+        )
+        module.exit_json(failed=False, **result)
+
     changed = False
     if state == "present":
         team = grafana_iface.get_team(name)
@@ -422,18 +693,17 @@ def main():
             grafana_iface.create_team(name, email)
             team = grafana_iface.get_team(name)
             changed = True
+        team_members = None
         if members is not None:
-            cur_members = grafana_iface.get_team_members(team.get("id"))
-            plan = diff_members(members, cur_members)
-            for member in plan.get("to_add"):
-                grafana_iface.add_team_member(team.get("id"), member)
+            team_members = grafana_iface.sync_team_members(
+                team.get("id"), members, enforce_members, module.params["workers"]
+            )
+            if team_members is not None:
                 changed = True
-            if enforce_members:
-                for member in plan.get("to_del"):
-                    grafana_iface.delete_team_member(team.get("id"), member)
-                    changed = True
-            team = grafana_iface.get_team(name)
-        team["members"] = grafana_iface.get_team_members(team.get("id"))
+                team = grafana_iface.get_team(name)
+        if team_members is None:
+            team_members = grafana_iface.get_team_members(team.get("id"))
+        team["members"] = team_members
         module.exit_json(failed=False, changed=changed, team=team)
     elif state == "absent":
         team = grafana_iface.get_team(name)
@@ -444,13 +714,17 @@ def main():
 
 
 def diff_members(target, current):
+    target_set = set(target)
+    current_set = set(current)
     diff = {"to_del": [], "to_add": []}
     for member in target:
-        if member not in current:
+        if member not in current_set:
             diff["to_add"].append(member)
+            current_set.add(member)
     for member in current:
-        if member not in target:
+        if member not in target_set:
             diff["to_del"].append(member)
+            target_set.add(member)
     return diff
 
 
@@ -47,7 +47,7 @@ options:
   login:
     description:
       - The login of the Grafana User.
-    required: true
+      - Required unless C(users_file) is set.
     type: str
   password:
     description:
@@ -67,11 +67,41 @@ options:
     default: present
     type: str
     choices: ["present", "absent"]
+  users_file:
+    description:
+      - Path of a file listing the users to create, update or delete, on the host running the module.
+      - Each record accepts the fields C(login), C(name), C(email), C(password), C(is_admin) and C(state) of a single
+        user, the defaults of a single user apply to the missing fields.
+      - The file is read as a stream, C(batch_size) records at a time, and the existing users are listed only once.
+      - Mutually exclusive with C(login).
+    type: path
+    version_added: "2.4.0"
+  users_format:
+    description:
+      - Format of C(users_file), a CSV file with a header line or a file with one JSON object per line.
+      - Guessed from the extension of C(users_file) when not set, C(.csv) files are read as CSV and all other files as
+        JSON lines.
+    type: str
+    choices: ["csv", "jsonl"]
+    version_added: "2.4.0"
+  batch_size:
+    description:
+      - Number of records of C(users_file) read and applied at a time.
+    type: int
+    default: 1000
+    version_added: "2.4.0"
+  workers:
+    description:
+      - Maximum number of parallel requests sent to Grafana when applying C(users_file).
+    type: int
+    default: 4
+    version_added: "2.4.0"
 notes:
 - Unlike other modules from the collection, this module does not support C(grafana_api_key) authentication type. The Grafana API endpoint for users management
   requires basic auth and admin privileges.
 extends_documentation_fragment:
 - community.grafana.basic_auth
+- community.grafana.session
 """
 
 EXAMPLES = """
@@ -88,6 +118,14 @@ EXAMPLES = """
     is_admin: true
     state: present
 
+- name: Create or update the Grafana users exported from the HR system
+  community.grafana.grafana_user:
+    url: "https://grafana.example.com"
+    url_username: admin
+    url_password: changeme
+    users_file: /srv/exports/users.csv
+    workers: 8
+
 - name: Delete a Grafana user
   community.grafana.grafana_user:
     url: "https://grafana.example.com"
@@ -152,13 +190,40 @@ user:
             type: bool
             sample:
                 - false
+created:
+    description: The logins of the users created from C(users_file).
+    returned: when C(users_file) is set
+    type: list
+    elements: str
+    sample:
+        - "batman"
+updated:
+    description: The logins of the users from C(users_file) which were updated.
+    returned: when C(users_file) is set
+    type: list
+    elements: str
+    sample: []
+deleted:
+    description: The logins of the users deleted from C(users_file).
+    returned: when C(users_file) is set
+    type: list
+    elements: str
+    sample: []
 """
 
+import csv
+import io
 import json
+from itertools import islice
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils._text import to_native
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
 from ansible.module_utils.urls import fetch_url, basic_auth_header
 from ansible_collections.community.grafana.plugins.module_utils import base
+from ansible_collections.community.grafana.plugins.module_utils.base import (
+    run_concurrently,
+)
 from ansible.module_utils.six.moves.urllib.parse import quote
 
 __metaclass__ = type
@@ -172,6 +237,7 @@ class GrafanaUserInterface(object):
         self.headers["Authorization"] = basic_auth_header(
             module.params["url_username"], module.params["url_password"]
         )
+        base.grafana_session_headers(module, self.headers)
         # }}}
         self.grafana_url = base.clean_url(module.params.get("url"))
 
@@ -185,6 +251,12 @@ class GrafanaUserInterface(object):
         resp, info = fetch_url(
             self._module, full_url, data=data, headers=headers, method=method
         )
+        if info["status"] == 401 and base.grafana_basic_auth_fallback(
+            self._module, headers
+        ):
+            resp, info = fetch_url(
+                self._module, full_url, data=data, headers=headers, method=method
+            )
         status_code = info["status"]
         if status_code == 404:
             return None
@@ -204,7 +276,7 @@ class GrafanaUserInterface(object):
             body=self._module.from_json(resp.read()),
         )
 
-    def create_user(self, name, email, login, password):
+    def create_user(self, name, email, login, password, lookup=True):
         # https://grafana.com/docs/http_api/admin/#global-users
         if not password:
             self._module.fail_json(
@@ -212,19 +284,47 @@ class GrafanaUserInterface(object):
             )
         url = "/api/admin/users"
         user = dict(name=name, email=email, login=login, password=password)
-        self._send_request(url, data=user, headers=self.headers, method="POST")
+        response = self._send_request(
+            url, data=user, headers=self.headers, method="POST"
+        )
+        if not lookup:
+            return response
         return self.get_user_from_login(login)
 
+    def get_users(self, perpage=1000):
+        """Return all the users indexed by login, in the format of the user lookup."""
+        # https://grafana.com/docs/grafana/latest/http_api/user/#search-users-with-paging
+        users = {}
+        page = 1
+        while True:
+            url = "/api/users/search?perpage={perpage}&page={page}".format(
+                perpage=perpage, page=page
+            )
+            response = self._send_request(url, headers=self.headers, method="GET")
+            page_users = response.get("users") or []
+            for user in page_users:
+                user["isGrafanaAdmin"] = user.pop("isAdmin", False)
+                users[user["login"]] = user
+            if len(page_users) < perpage or page * perpage >= response.get(
+                "totalCount", 0
+            ):
+                return users
+            page += 1
+
     def get_user_from_login(self, login):
         # https://grafana.com/docs/grafana/latest/http_api/user/#get-single-user-by-usernamelogin-or-email
         url = "/api/users/lookup?loginOrEmail={login}".format(login=quote(login))
         return self._send_request(url, headers=self.headers, method="GET")
 
-    def update_user(self, user_id, email, name, login):
+    def update_user(self, user_id, email, name, login, lookup=True):
         # https://grafana.com/docs/http_api/user/#user-update
         url = "/api/users/{user_id}".format(user_id=user_id)
         user = dict(email=email, name=name, login=login)
-        self._send_request(url, data=user, headers=self.headers, method="PUT")
+        response = self._send_request(
+            url, data=user, headers=self.headers, method="PUT"
+        )
+        if not lookup:
+            return response
         return self.get_user_from_login(login)
 
     def update_user_permissions(self, user_id, is_admin):
@@ -240,6 +340,76 @@ class GrafanaUserInterface(object):
         url = "/api/admin/users/{user_id}".format(user_id=user_id)
         return self._send_request(url, headers=self.headers, method="DELETE")
 
+    def sync_users(self, records, batch_size=1000, workers=1):
+        """Create, update or delete the users of records, batch_size records at
+        a time, after a single listing of the existing users."""
+        existing = self.get_users()
+        result = {"changed": False, "created": [], "updated": [], "deleted": []}
+
+        def apply(action):
+            verb, user, current = action
+            if verb == "created":
+                current = self.create_user(
+                    user["name"],
+                    user["email"],
+                    user["login"],
+                    user["password"],
+                    lookup=False,
+                )
+                if user["is_admin"]:
+                    self.update_user_permissions(current["id"], True)
+            elif verb == "updated":
+                if user["is_admin"] != current.get("isGrafanaAdmin"):
+                    self.update_user_permissions(current["id"], user["is_admin"])
+                self.update_user(
+                    current["id"],
+                    user["email"],
+                    user["name"],
+                    user["login"],
+                    lookup=False,
+                )
+            else:
+                self.delete_user(current["id"])
+            return verb, user["login"]
+
+        records = iter(records)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return result
+            actions = []
+            for user in batch:
+                current = existing.get(user["login"])
+                if user["state"] == "absent":
+                    if current is not None:
+                        actions.append(("deleted", user, current))
+                        existing.pop(user["login"])
+                elif current is None:
+                    if not user["password"]:
+                        self._module.fail_json(
+                            failed=True,
+                            msg="missing required arguments: password, for user '%s'"
+                            % user["login"],
+                        )
+                    actions.append(("created", user, None))
+                    existing[user["login"]] = dict(
+                        email=user["email"],
+                        name=user["name"],
+                        login=user["login"],
+                        isGrafanaAdmin=user["is_admin"],
+                    )
+                elif is_user_update_required(
+                    current,
+                    user["email"],
+                    user["name"],
+                    user["login"],
+                    user["is_admin"],
+                ):
+                    actions.append(("updated", user, current))
+            for verb, login in run_concurrently(apply, actions, workers):
+                result["changed"] = True
+                result[verb].append(login)
+
 
 def is_user_update_required(target_user, email, name, login, is_admin):
     # compare value before in target_user object and param
@@ -253,20 +423,57 @@ def is_user_update_required(target_user, email, name, login, is_admin):
     return target_user_dict != param_dict
 
 
+def read_users_file(module, path, users_format=None):
+    """Yield the validated records of a CSV or JSON lines users file."""
+    if users_format is None:
+        users_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    validator = ArgumentSpecValidator(
+        user_argument_spec, required_if=[["state", "present", ["name", "email"]]]
+    )
+    with io.open(path, "r", newline="", encoding="utf-8") as users_file:
+        if users_format == "csv":
+            records = csv.DictReader(users_file)
+        else:
+            records = (json.loads(line) for line in users_file if line.strip())
+        for number, record in enumerate(records, 1):
+            record = dict(
+                (key, value) for key, value in record.items() if value not in (None, "")
+            )
+            result = validator.validate(record)
+            if result.error_messages:
+                module.fail_json(
+                    failed=True,
+                    msg="Invalid user at record %d of %s: %s"
+                    % (number, path, ", ".join(result.error_messages)),
+                )
+            # the records aren't module parameters, mask their no_log fields
+            module.no_log_values.update(
+                to_native(result.validated_parameters[name])
+                for name, spec in user_argument_spec.items()
+                if spec.get("no_log") and result.validated_parameters.get(name)
+            )
+            yield result.validated_parameters
+
+
 def setup_module_object():
     module = AnsibleModule(
         argument_spec=argument_spec,
         supports_check_mode=False,
-        required_if=[
-            ["state", "present", ["name", "email"]],
-        ],
         required_together=base.grafana_required_together(),
+        mutually_exclusive=[["login", "users_file"]],
+        required_one_of=[["login", "users_file"]],
     )
+    if module.params["users_file"] is None and module.params["state"] == "present":
+        missing = [key for key in ("name", "email") if module.params[key] is None]
+        if missing:
+            module.fail_json(
+                msg="state is present but all of the following are missing: %s"
+                % ", ".join(missing)
+            )
     return module
 
 
-argument_spec = base.grafana_argument_spec()
-argument_spec.update(
+user_argument_spec = dict(
     state=dict(choices=["present", "absent"], default="present"),
     name=dict(type="str", required=False),
     email=dict(type="str", required=False),
@@ -274,6 +481,17 @@ argument_spec.update(
     password=dict(type="str", required=False, no_log=True),
     is_admin=dict(type="bool", default=False),
 )
+
+argument_spec = base.grafana_argument_spec()
+argument_spec.update(base.grafana_session_argument_spec())
+argument_spec.update(user_argument_spec)
+argument_spec.update(
+    login=dict(type="str", required=False),
+    users_file=dict(type="path"),
+    users_format=dict(type="str", choices=["csv", "jsonl"]),
+    batch_size=dict(type="int", default=1000),
+    workers=dict(type="int", default=4),
+)
 argument_spec.pop("grafana_api_key")
 
 
@@ -288,6 +506,15 @@ def main():
 
     grafana_iface = GrafanaUserInterface(module)
 
+    if module.params["users_file"] is not None:
+        records = read_users_file(
+            module, module.params["users_file"], module.params["users_format"]
+        )
+        result = grafana_iface.sync_users(
+            records, module.params["batch_size"], module.params["workers"]
+        )
+        module.exit_json(**result)
+
     # search user by login
     actual_grafana_user = grafana_iface.get_user_from_login(login)
     if state == "present":
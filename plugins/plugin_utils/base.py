@@ -0,0 +1,187 @@
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""HTTP client of the Grafana API and result cache shared by the lookup plugins."""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from ansible.module_utils.urls import basic_auth_header, open_url, SSLValidationError
+from ansible.module_utils._text import to_bytes, to_native
+from ansible.module_utils.six.moves.urllib.parse import urlencode
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.utils.display import Display
+
+display = Display()
+
+# maximum number of results of a page of /api/search
+SEARCH_PAGE_LIMIT = 5000
+# returned by GrafanaResultCache.get when no result is cached, None can be cached
+MISSING = object()
+
+
+class GrafanaAPIException(Exception):
+    def __init__(self, message, status=None):
+        super(GrafanaAPIException, self).__init__(message)
+        # HTTP status of the response of Grafana, None without response
+        self.status = status
+
+
+class GrafanaResultCache(object):
+    """Cache of lookup results expiring after ttl seconds.
+
+    The results are kept in memory for the lifetime of the process and, when
+    path is set, in one file per key in path so that they are shared between
+    the forks of ansible.
+    """
+
+    # results of the current process, by key
+    memory = {}
+
+    def __init__(self, ttl, path=None):
+        self.ttl = ttl
+        self.path = path
+
+    @staticmethod
+    def key(*identity):
+        return hashlib.sha256(
+            to_bytes(json.dumps(identity, sort_keys=True))
+        ).hexdigest()
+
+    def get(self, key):
+        if not self.ttl:
+            return MISSING
+        now = time.time()
+        entry = self.memory.get(key)
+        if entry is None and self.path:
+            try:
+                with open(os.path.join(self.path, key + ".json")) as cache_file:
+                    entry = json.load(cache_file)
+            except (IOError, OSError, ValueError):
+                entry = None
+        # a shorter ttl than the one used to store the entry still applies
+        if entry is None or min(entry["expires"], entry["stored"] + self.ttl) <= now:
+            return MISSING
+        self.memory[key] = entry
+        return entry["result"]
+
+    def set(self, key, result):
+        if not self.ttl:
+            return
+        now = time.time()
+        entry = {"stored": now, "expires": now + self.ttl, "result": result}
+        self.memory[key] = entry
+        if not self.path:
+            return
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path, 0o700)
+            # mkstemp creates the file with mode 0600
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix=".%s." % key)
+            with os.fdopen(fd, "w") as cache_file:
+                json.dump(entry, cache_file)
+            os.rename(tmp_path, os.path.join(self.path, key + ".json"))
+        except (IOError, OSError) as e:
+            display.warning("Unable to write grafana lookup cache: %s" % to_native(e))
+
+
+class GrafanaClient(object):
+    """Send GET requests to the Grafana API with the credentials of a lookup."""
+
+    def __init__(
+        self,
+        validate_certs,
+        ca_path,
+        grafana_url="http://127.0.0.1:3000",
+        grafana_api_key=None,
+        grafana_user="admin",
+        grafana_password="admin",
+        grafana_org_id=1,
+    ):
+        self.grafana_url = grafana_url
+        self.grafana_api_key = grafana_api_key
+        self.grafana_user = grafana_user
+        self.grafana_password = grafana_password
+        self.grafana_org_id = grafana_org_id
+        self.validate_certs = validate_certs
+        self.ca_path = ca_path
+
+    def grafana_switch_organisation(self, headers):
+        try:
+            r = open_url(
+                "%s/api/user/using/%s" % (self.grafana_url, self.grafana_org_id),
+                headers=headers,
+                method="POST",
+                validate_certs=self.validate_certs,
+                ca_path=self.ca_path,
+            )
+        except HTTPError as e:
+            raise GrafanaAPIException(
+                "Unable to switch to organization %s : %s"
+                % (self.grafana_org_id, to_native(e))
+            )
+        except SSLValidationError as e:
+            raise GrafanaAPIException(
+                "Unable to validate server's certificate with %s: %s"
+                % (self.ca_path, to_native(e))
+            )
+        if r.getcode() != 200:
+            raise GrafanaAPIException(
+                "Unable to switch to organization %s : %s"
+                % (self.grafana_org_id, str(r.getcode()))
+            )
+
+    def cache_identity(self):
+        """Return the Grafana instance, organization and credentials fingerprint."""
+        if self.grafana_api_key:
+            credentials, org_id = "Bearer %s" % self.grafana_api_key, None
+        else:
+            credentials = basic_auth_header(self.grafana_user, self.grafana_password)
+            org_id = str(self.grafana_org_id)
+        return [
+            self.grafana_url.rstrip("/"),
+            org_id,
+            hashlib.sha256(to_bytes(credentials)).hexdigest(),
+        ]
+
+    def grafana_headers(self):
+        headers = {"content-type": "application/json; charset=utf8"}
+        if self.grafana_api_key:
+            headers["Authorization"] = "Bearer %s" % self.grafana_api_key
+        else:
+            headers["Authorization"] = basic_auth_header(
+                self.grafana_user, self.grafana_password
+            )
+            self.grafana_switch_organisation(headers)
+
+        return headers
+
+    def grafana_get(self, path, params, headers, action):
+        try:
+            r = open_url(
+                "%s%s%s"
+                % (self.grafana_url, path, "?" + urlencode(params) if params else ""),
+                headers=headers,
+                method="GET",
+                validate_certs=self.validate_certs,
+                ca_path=self.ca_path,
+            )
+        except HTTPError as e:
+            raise GrafanaAPIException(
+                "Unable to %s : %s" % (action, to_native(e)), status=e.code
+            )
+        except SSLValidationError as e:
+            raise GrafanaAPIException(
+                "Unable to validate server's certificate with %s: %s"
+                % (self.ca_path, to_native(e))
+            )
+        if r.getcode() != 200:
+            raise GrafanaAPIException("Unable to %s : %s" % (action, str(r.getcode())))
+        try:
+            return json.loads(r.read())
+        except Exception as e:
+            raise GrafanaAPIException("Unable to parse json list %s" % to_native(e))
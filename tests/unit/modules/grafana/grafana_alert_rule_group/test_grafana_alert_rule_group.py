@@ -0,0 +1,319 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import patch
+from ansible_collections.community.grafana.plugins.modules import (
+    grafana_alert_rule_group,
+)
+from ansible.module_utils import basic
+from contextlib import contextmanager
+import json
+
+__metaclass__ = type
+
+
+class MockedReponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if "changed" not in kwargs:
+        kwargs["changed"] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs["failed"] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+    pass
+
+
+@contextmanager
+def set_module_args(args):
+    """Context manager that sets module arguments for AnsibleModule"""
+
+    try:
+        from ansible.module_utils.testing import patch_module_args
+    except ImportError:
+        from ansible.module_utils._text import to_bytes
+
+        serialized_args = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+        with patch.object(basic, "_ANSIBLE_ARGS", serialized_args):
+            yield
+    else:
+        with patch_module_args(args):
+            yield
+
+
+def rule(uid="disk-usage", title="Disk usage", **kwargs):
+    rule = {
+        "uid": uid,
+        "title": title,
+        "condition": "C",
+        "for": "5m",
+        "labels": {"team": "ops"},
+        "data": [{"refId": "C", "datasourceUid": "__expr__", "model": {}}],
+    }
+    rule.update(kwargs)
+    return rule
+
+
+def current_group():
+    return {
+        "title": "disk",
+        "folderUid": "alerts",
+        "interval": 60,
+        "rules": [
+            rule(
+                id=12,
+                orgID=1,
+                folderUID="alerts",
+                ruleGroup="disk",
+                updated="2024-01-01T00:00:00Z",
+                provenance="api",
+                isPaused=False,
+                annotations={},
+                **{"for": "300s"}
+            )
+        ],
+    }
+
+
+def group_resp(group, status=200):
+    return (MockedReponse(json.dumps(group)), {"status": status})
+
+
+def group_args(**kwargs):
+    args = {
+        "url": "https://grafana.example.com",
+        "grafana_api_key": "token",
+        "folder_uid": "alerts",
+        "name": "disk",
+        "rules": [rule(uid=None)],
+    }
+    args.update(kwargs)
+    return dict((key, value) for key, value in args.items() if value is not None)
+
+
+class GrafanaAlertRuleGroupTest(TestCase):
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(
+            basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json
+        )
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    def test_duration_seconds(self):
+        self.assertEqual(grafana_alert_rule_group.duration_seconds("1h30m"), 5400)
+        self.assertEqual(grafana_alert_rule_group.duration_seconds("300s"), 300)
+        # text durations of python 2 targets
+        self.assertEqual(grafana_alert_rule_group.duration_seconds(u"5m"), 300)
+        self.assertEqual(grafana_alert_rule_group.duration_seconds("soon"), "soon")
+
+    def test_payload_reuses_uid_of_current_rule(self):
+        payload = grafana_alert_rule_group.grafana_rule_group_payload(
+            group_args(interval=60), "alerts", current_group()
+        )
+        self.assertEqual(payload["rules"][0]["uid"], "disk-usage")
+        self.assertEqual(payload["rules"][0]["folderUID"], "alerts")
+        self.assertEqual(payload["rules"][0]["ruleGroup"], "disk")
+        self.assertEqual(
+            grafana_alert_rule_group.canonical_rule_group(payload),
+            grafana_alert_rule_group.canonical_rule_group(current_group()),
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_alert_rule_group.fetch_url"
+    )
+    def test_unchanged_group_is_not_written(self, mock_fetch_url):
+        mock_fetch_url.return_value = group_resp(current_group())
+        with set_module_args(group_args()):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_alert_rule_group.main()
+        self.assertFalse(result.exception.args[0]["changed"])
+        self.assertEqual(mock_fetch_url.call_count, 1)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_alert_rule_group.fetch_url"
+    )
+    def test_group_is_written_in_one_request(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            (
+                MockedReponse(json.dumps([{"uid": "alerts", "title": "Alerts"}])),
+                {"status": 200},
+            ),
+            group_resp(current_group()),
+            group_resp(current_group()),
+        ]
+        with set_module_args(
+            group_args(
+                folder_uid=None,
+                folder_title="Alerts",
+                rules=[rule(uid=None), rule(uid="disk-io", title="Disk IO")],
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_alert_rule_group.main()
+        self.assertTrue(result.exception.args[0]["changed"])
+        self.assertEqual(mock_fetch_url.call_count, 3)
+        url = mock_fetch_url.call_args[0][1]
+        self.assertEqual(
+            url,
+            "https://grafana.example.com/api/v1/provisioning/folder/alerts/rule-groups/disk",
+        )
+        self.assertEqual(mock_fetch_url.call_args[1]["method"], "PUT")
+        written = json.loads(mock_fetch_url.call_args[1]["data"])
+        self.assertEqual(
+            [item["uid"] for item in written["rules"]], ["disk-usage", "disk-io"]
+        )
+
+    def test_server_defaults_are_ignored(self):
+        rules = [
+            {
+                "uid": "disk-usage",
+                "title": "Disk usage",
+                "condition": "B",
+                "for": "5m",
+                "noDataState": "NoData",
+                "execErrState": "Error",
+                "labels": {"team": "ops"},
+                "data": [
+                    {
+                        "refId": "A",
+                        "datasourceUid": "__expr__",
+                        "model": {"type": "math", "expression": "1"},
+                    },
+                    {
+                        "refId": "B",
+                        "datasourceUid": "__expr__",
+                        "model": {"type": "threshold", "expression": "A"},
+                    },
+                ],
+            }
+        ]
+        # answer of Grafana 11 to GET on the rule group created from rules
+        current = {
+            "title": "disk",
+            "folderUid": "alert-rules",
+            "interval": 60,
+            "rules": [
+                {
+                    "id": 1,
+                    "uid": "disk-usage",
+                    "orgID": 1,
+                    "folderUID": "alert-rules",
+                    "ruleGroup": "disk",
+                    "title": "Disk usage",
+                    "condition": "B",
+                    "data": [
+                        {
+                            "refId": "A",
+                            "queryType": "",
+                            "relativeTimeRange": {"from": 0, "to": 0},
+                            "datasourceUid": "__expr__",
+                            "model": {
+                                "expression": "1",
+                                "intervalMs": 1000,
+                                "maxDataPoints": 43200,
+                                "refId": "A",
+                                "type": "math",
+                            },
+                        },
+                        {
+                            "refId": "B",
+                            "queryType": "",
+                            "relativeTimeRange": {"from": 0, "to": 0},
+                            "datasourceUid": "__expr__",
+                            "model": {
+                                "expression": "A",
+                                "intervalMs": 1000,
+                                "maxDataPoints": 43200,
+                                "refId": "B",
+                                "type": "threshold",
+                            },
+                        },
+                    ],
+                    "updated": "2024-06-01T12:00:00Z",
+                    "noDataState": "NoData",
+                    "execErrState": "Error",
+                    "for": "5m",
+                    "keep_firing_for": "0s",
+                    "annotations": None,
+                    "labels": {"team": "ops"},
+                    "provenance": "api",
+                    "isPaused": False,
+                    "notification_settings": None,
+                    "record": None,
+                }
+            ],
+        }
+        payload = grafana_alert_rule_group.grafana_rule_group_payload(
+            group_args(name="disk", interval=60, rules=rules), "alert-rules", current
+        )
+        self.assertEqual(
+            grafana_alert_rule_group.canonical_rule_group(payload),
+            grafana_alert_rule_group.canonical_rule_group(current),
+        )
+
+        current["rules"][0]["keep_firing_for"] = "1m"
+        self.assertNotEqual(
+            grafana_alert_rule_group.canonical_rule_group(payload),
+            grafana_alert_rule_group.canonical_rule_group(current),
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_alert_rule_group.fetch_url"
+    )
+    def test_folder_is_found_on_next_page(self, mock_fetch_url):
+        first_page = [
+            {"uid": "folder-%d" % index, "title": "Folder %d" % index}
+            for index in range(1000)
+        ]
+        mock_fetch_url.side_effect = [
+            (MockedReponse(json.dumps(first_page)), {"status": 200}),
+            (
+                MockedReponse(json.dumps([{"uid": "alerts", "title": "Alerts"}])),
+                {"status": 200},
+            ),
+            group_resp(current_group()),
+        ]
+        with set_module_args(group_args(folder_uid=None, folder_title="Alerts")):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_alert_rule_group.main()
+        self.assertFalse(result.exception.args[0]["changed"])
+        self.assertEqual(
+            [call[0][1] for call in mock_fetch_url.call_args_list[:2]],
+            [
+                "https://grafana.example.com/api/folders?limit=1000&page=1",
+                "https://grafana.example.com/api/folders?limit=1000&page=2",
+            ],
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_alert_rule_group.fetch_url"
+    )
+    def test_missing_folder_fails(self, mock_fetch_url):
+        mock_fetch_url.return_value = (MockedReponse("[]"), {"status": 200})
+        with set_module_args(group_args(folder_uid=None, folder_title="Alerts")):
+            with self.assertRaises(AnsibleFailJson) as result:
+                grafana_alert_rule_group.main()
+        self.assertEqual(
+            result.exception.args[0]["msg"], "Folder 'Alerts' does not exist"
+        )
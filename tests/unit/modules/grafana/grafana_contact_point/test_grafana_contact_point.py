@@ -0,0 +1,335 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import patch
+from ansible_collections.community.grafana.plugins.modules import (
+    grafana_contact_point,
+)
+from ansible.module_utils import basic
+from contextlib import contextmanager
+import json
+
+__metaclass__ = type
+
+
+class MockedReponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if "changed" not in kwargs:
+        kwargs["changed"] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs["failed"] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+    pass
+
+
+@contextmanager
+def set_module_args(args):
+    """Context manager that sets module arguments for AnsibleModule"""
+
+    try:
+        from ansible.module_utils.testing import patch_module_args
+    except ImportError:
+        from ansible.module_utils._text import to_bytes
+
+        serialized_args = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+        with patch.object(basic, "_ANSIBLE_ARGS", serialized_args):
+            yield
+    else:
+        with patch_module_args(args):
+            yield
+
+
+def slack_contact_point_args(**kwargs):
+    args = {
+        "url": "https://grafana.example.com",
+        "grafana_api_key": "token",
+        "uid": "slack",
+        "name": "Slack",
+        "type": "slack",
+        "slack_recipient": "#alerts",
+        "slack_token": "xoxb-secret",
+        "slack_url": "https://hooks.slack.com/services/secret",
+    }
+    args.update(kwargs)
+    return args
+
+
+def slack_contact_point(**settings):
+    contact_point = {
+        "uid": "slack",
+        "name": "Slack",
+        "type": "slack",
+        "disableResolveMessage": False,
+        "provenance": "api",
+        "settings": {
+            "recipient": "#alerts",
+            "token": "[REDACTED]",
+            "url": "[REDACTED]",
+        },
+    }
+    contact_point["settings"].update(settings)
+    return contact_point
+
+
+def contact_points_resp(*contact_points):
+    server_response = json.dumps(list(contact_points))
+    return (MockedReponse(server_response), {"status": 200})
+
+
+def contact_point_updated_resp():
+    return (MockedReponse(""), {"status": 202})
+
+
+class GrafanaContactPointTest(TestCase):
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(
+            basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json
+        )
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    def test_compare_contact_points_ignores_redacted_settings(self):
+        with set_module_args(slack_contact_point_args()):
+            params = grafana_contact_point.setup_module_object().params
+        payload = grafana_contact_point.grafana_contact_point_payload(params)
+        diff = grafana_contact_point.compare_contact_points(
+            payload, slack_contact_point(), params
+        )
+        self.assertEqual(diff["before"], diff["after"])
+
+    def test_compare_contact_points_detects_changed_setting(self):
+        with set_module_args(slack_contact_point_args(slack_recipient="#ops")):
+            params = grafana_contact_point.setup_module_object().params
+        payload = grafana_contact_point.grafana_contact_point_payload(params)
+        diff = grafana_contact_point.compare_contact_points(
+            payload, slack_contact_point(), params
+        )
+        self.assertEqual(diff["before"]["settings"]["recipient"], "#alerts")
+        self.assertEqual(diff["after"]["settings"]["recipient"], "#ops")
+
+    def test_compare_contact_points_enforces_secure_data(self):
+        with set_module_args(slack_contact_point_args()):
+            params = grafana_contact_point.setup_module_object().params
+        payload = grafana_contact_point.grafana_contact_point_payload(params)
+        diff = grafana_contact_point.compare_contact_points(
+            payload, slack_contact_point(), params, True
+        )
+        self.assertNotEqual(diff["before"], diff["after"])
+
+    def test_compare_contact_points_detects_provenance_change(self):
+        current = slack_contact_point()
+        del current["provenance"]
+        with set_module_args(slack_contact_point_args()):
+            params = grafana_contact_point.setup_module_object().params
+        payload = grafana_contact_point.grafana_contact_point_payload(params)
+        diff = grafana_contact_point.compare_contact_points(payload, current, params)
+        self.assertNotEqual(diff["before"], diff["after"])
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_contact_point.fetch_url"
+    )
+    def test_unchanged_contact_point_is_not_updated(self, mock_fetch_url):
+        mock_fetch_url.return_value = contact_points_resp(slack_contact_point())
+        with set_module_args(slack_contact_point_args()):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_contact_point.main()
+        self.assertFalse(result.exception.args[0]["changed"])
+        self.assertEqual(mock_fetch_url.call_count, 1)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_contact_point.fetch_url"
+    )
+    def test_changed_contact_point_is_updated(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            contact_points_resp(slack_contact_point()),
+            contact_point_updated_resp(),
+            contact_points_resp(slack_contact_point(recipient="#ops")),
+        ]
+        with set_module_args(slack_contact_point_args(slack_recipient="#ops")):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_contact_point.main()
+        self.assertTrue(result.exception.args[0]["changed"])
+        self.assertEqual(mock_fetch_url.call_args_list[1][1]["method"], "PUT")
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_contact_point.fetch_url"
+    )
+    def test_sync_contact_points(self, mock_fetch_url):
+        unmanaged = slack_contact_point()
+        unmanaged["uid"] = "unmanaged"
+        provisioned = slack_contact_point()
+        provisioned.update(uid="provisioned", provenance="file")
+        mock_fetch_url.side_effect = lambda module, url, **kwargs: (
+            contact_points_resp(slack_contact_point(), unmanaged, provisioned)
+            if kwargs["method"] == "GET"
+            else (MockedReponse(json.dumps({"uid": "email"})), {"status": 202})
+        )
+        args = slack_contact_point_args(prune=True, workers=1)
+        args["contact_points"] = [
+            dict(
+                (key, value)
+                for key, value in args.items()
+                if key in ("uid", "name", "type") or key.startswith("slack_")
+            ),
+            {
+                "uid": "email",
+                "name": "E-Mail",
+                "type": "email",
+                "email_addresses": ["example@example.com"],
+            },
+        ]
+        for key in list(args):
+            if key in ("uid", "name", "type") or key.startswith("slack_"):
+                del args[key]
+        with set_module_args(args):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_contact_point.main()
+        result = result.exception.args[0]
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["created"], ["email"])
+        self.assertEqual(result["updated"], [])
+        self.assertEqual(result["deleted"], ["unmanaged"])
+        self.assertEqual(
+            [call[1]["method"] for call in mock_fetch_url.call_args_list],
+            ["GET", "POST", "DELETE"],
+        )
+
+    def test_sync_contact_points_fails_on_invalid_contact_point(self):
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "grafana_api_key": "token",
+                "contact_points": [{"uid": "email", "name": "E-Mail", "type": "email"}],
+            }
+        ):
+            with self.assertRaises(AnsibleFailJson) as result:
+                grafana_contact_point.main()
+        self.assertIn("email_addresses", result.exception.args[0]["msg"])
+
+    def test_sync_contact_points_masks_secure_settings(self):
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "grafana_api_key": "token",
+                "contact_points": [
+                    {
+                        "uid": "slack",
+                        "name": "Slack",
+                        "type": "slack",
+                        "slack_recipient": "#alerts",
+                        "slack_token": "xoxb-secret",
+                        "slack_url": "https://hooks.slack.com/services/secret",
+                    }
+                ],
+            }
+        ):
+            module = grafana_contact_point.setup_module_object()
+        self.assertIn("xoxb-secret", module.no_log_values)
+        self.assertNotIn("#alerts", module.no_log_values)
+
+    def test_sync_contact_points_fails_on_duplicate_uids(self):
+        email = {
+            "uid": "email",
+            "name": "E-Mail",
+            "type": "email",
+            "email_addresses": ["example@example.com"],
+        }
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "grafana_api_key": "token",
+                "contact_points": [email, dict(email, name="Other")],
+            }
+        ):
+            with self.assertRaises(AnsibleFailJson) as result:
+                grafana_contact_point.main()
+        self.assertEqual(
+            result.exception.args[0]["msg"],
+            "contact_points lists the same uid more than once: email",
+        )
+
+    def test_contact_point_payloads(self):
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "grafana_api_key": "token",
+                "uid": "email",
+                "name": "E-Mail",
+                "type": "email",
+                "email_addresses": ["foo@example.com", "bar@example.com"],
+            }
+        ):
+            email = grafana_contact_point.setup_module_object().params
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "grafana_api_key": "token",
+                "uid": "am",
+                "name": "Alertmanager",
+                "type": "alertmanager",
+                "alertmanager_url": "http://alertmanager:9093",
+            }
+        ):
+            alertmanager = grafana_contact_point.setup_module_object().params
+        payloads = grafana_contact_point.grafana_contact_point_payloads(
+            [email, alertmanager]
+        )
+        self.assertEqual(
+            payloads,
+            [
+                {
+                    "uid": "email",
+                    "name": "E-Mail",
+                    "type": "email",
+                    "disableResolveMessage": False,
+                    "settings": {"addresses": "foo@example.com;bar@example.com"},
+                },
+                {
+                    "uid": "am",
+                    "name": "Alertmanager",
+                    "type": "prometheus-alertmanager",
+                    "disableResolveMessage": False,
+                    "settings": {"url": "http://alertmanager:9093"},
+                },
+            ],
+        )
+
+    def test_argument_spec_is_generated_from_integrations(self):
+        argument_spec = grafana_contact_point.contact_point_argument_spec()
+        required_if = dict(
+            (integration, options)
+            for key, integration, options in grafana_contact_point.contact_point_required_if()
+        )
+        self.assertEqual(
+            argument_spec["slack_mention_users"], {"type": "list", "elements": "str"}
+        )
+        self.assertEqual(
+            required_if["slack"], ["slack_recipient", "slack_token", "slack_url"]
+        )
+        self.assertEqual(
+            sorted(argument_spec["type"]["choices"]),
+            sorted(grafana_contact_point.CONTACT_POINT_INTEGRATIONS),
+        )
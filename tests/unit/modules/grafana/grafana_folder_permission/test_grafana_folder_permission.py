@@ -0,0 +1,265 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import patch
+from ansible_collections.community.grafana.plugins.modules import (
+    grafana_folder_permission,
+)
+from ansible.module_utils import basic
+from contextlib import contextmanager
+import json
+
+__metaclass__ = type
+
+
+class MockedReponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if "changed" not in kwargs:
+        kwargs["changed"] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs["failed"] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+    pass
+
+
+@contextmanager
+def set_module_args(args):
+    """Context manager that sets module arguments for AnsibleModule"""
+
+    try:
+        from ansible.module_utils.testing import patch_module_args
+    except ImportError:
+        from ansible.module_utils._text import to_bytes
+
+        serialized_args = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+        with patch.object(basic, "_ANSIBLE_ARGS", serialized_args):
+            yield
+    else:
+        with patch_module_args(args):
+            yield
+
+
+FETCH_URL = "ansible_collections.community.grafana.plugins.modules.grafana_folder_permission.fetch_url"
+
+
+def json_resp(data):
+    return (MockedReponse(json.dumps(data)), {"status": 200})
+
+
+def permission_args(**kwargs):
+    args = {"url": "https://grafana.example.com", "grafana_api_key": "token"}
+    args.update(kwargs)
+    return args
+
+
+def current_acl():
+    return [
+        {"role": "Viewer", "teamId": 0, "userId": 0, "permission": 1},
+        {"role": "", "teamId": 3, "userId": 0, "permission": 2},
+        {"role": "", "teamId": 0, "userId": 7, "permission": 4, "inherited": True},
+    ]
+
+
+TEAMS = {"teams": [{"id": 3, "name": "ops"}, {"id": 5, "name": "dev"}]}
+
+
+class GrafanaFolderPermissionTest(TestCase):
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(
+            basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json
+        )
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    def test_acl_set_ignores_order_and_inherited_entries(self):
+        self.assertEqual(
+            grafana_folder_permission.acl_set(current_acl()),
+            grafana_folder_permission.acl_set(
+                [{"teamId": 3, "permission": 2}, {"role": "Viewer", "permission": 1}]
+            ),
+        )
+
+    @patch(FETCH_URL)
+    def test_unchanged_acl_is_not_written(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [json_resp(TEAMS), json_resp(current_acl())]
+        with set_module_args(
+            permission_args(
+                folder_uid="ops",
+                permissions=[
+                    {"team": "ops", "permission": "Edit"},
+                    {"role": "Viewer", "permission": "View"},
+                ],
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_folder_permission.main()
+        self.assertFalse(result.exception.args[0]["changed"])
+        self.assertEqual(mock_fetch_url.call_count, 2)
+
+    @patch(FETCH_URL)
+    def test_changed_acl_is_written_once(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            json_resp([{"title": "ops", "uid": "ops-uid"}]),
+            json_resp(TEAMS),
+            json_resp(current_acl()),
+            json_resp({"message": "Folder permissions updated"}),
+        ]
+        with set_module_args(
+            permission_args(
+                folder_title="ops",
+                permissions=[{"team": "dev", "permission": "Admin"}],
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_folder_permission.main()
+        self.assertTrue(result.exception.args[0]["changed"])
+        self.assertEqual(mock_fetch_url.call_count, 4)
+        self.assertEqual(
+            mock_fetch_url.call_args[0][1],
+            "https://grafana.example.com/api/folders/ops-uid/permissions",
+        )
+        self.assertEqual(
+            json.loads(mock_fetch_url.call_args[1]["data"]),
+            {"items": [{"teamId": 5, "permission": 4}]},
+        )
+
+    @patch(FETCH_URL)
+    def test_folders_are_reconciled_in_one_run(self, mock_fetch_url):
+        acls = {"a": current_acl(), "b": [{"role": "Editor", "permission": 2}]}
+
+        def fetch(module, url, data=None, headers=None, method="GET"):
+            if url.endswith("/api/teams/search?perpage=1000&page=1"):
+                return json_resp(TEAMS)
+            uid = url.split("/")[-2]
+            if method == "GET":
+                return json_resp(acls[uid])
+            return json_resp({"message": "Folder permissions updated"})
+
+        mock_fetch_url.side_effect = fetch
+        with set_module_args(
+            permission_args(
+                folders=[
+                    {
+                        "uid": "a",
+                        "permissions": [
+                            {"role": "Viewer", "permission": "View"},
+                            {"team": "ops", "permission": "Edit"},
+                        ],
+                    },
+                    {
+                        "uid": "b",
+                        "permissions": [{"role": "Viewer", "permission": "View"}],
+                    },
+                ]
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_folder_permission.main()
+        self.assertEqual(result.exception.args[0]["changed_folders"], ["b"])
+        posts = [
+            call
+            for call in mock_fetch_url.call_args_list
+            if call[1]["method"] == "POST"
+        ]
+        self.assertEqual(len(posts), 1)
+
+    @patch(FETCH_URL)
+    def test_unknown_team_fails(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [json_resp(TEAMS)]
+        with set_module_args(
+            permission_args(
+                folder_uid="ops",
+                permissions=[{"team": "qa", "permission": "View"}],
+            )
+        ):
+            with self.assertRaises(AnsibleFailJson) as result:
+                grafana_folder_permission.main()
+        self.assertEqual(result.exception.args[0]["msg"], "Team 'qa' not found")
+
+    @patch(FETCH_URL)
+    def test_dashboard_acl_is_written_once(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            json_resp(TEAMS),
+            json_resp(current_acl()),
+            json_resp({"message": "Dashboard permissions updated"}),
+        ]
+        with set_module_args(
+            permission_args(
+                dashboard_uid="node",
+                permissions=[{"team": "dev", "permission": "Edit"}],
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_folder_permission.main()
+        self.assertTrue(result.exception.args[0]["changed"])
+        self.assertEqual(
+            mock_fetch_url.call_args_list[1][0][1],
+            "https://grafana.example.com/api/dashboards/uid/node/permissions",
+        )
+        self.assertEqual(mock_fetch_url.call_args[1]["method"], "POST")
+        self.assertEqual(
+            json.loads(mock_fetch_url.call_args[1]["data"]),
+            {"items": [{"teamId": 5, "permission": 2}]},
+        )
+
+    @patch(FETCH_URL)
+    def test_folders_and_dashboards_are_reconciled_in_one_run(self, mock_fetch_url):
+        acls = {
+            "/api/folders/a/permissions": [{"role": "Editor", "permission": 2}],
+            "/api/dashboards/uid/d/permissions": current_acl(),
+        }
+
+        def fetch(module, url, data=None, headers=None, method="GET"):
+            if url.endswith("/api/teams/search?perpage=1000&page=1"):
+                return json_resp(TEAMS)
+            if method == "GET":
+                return json_resp(acls[url[len("https://grafana.example.com") :]])
+            return json_resp({"message": "Permissions updated"})
+
+        mock_fetch_url.side_effect = fetch
+        with set_module_args(
+            permission_args(
+                folders=[
+                    {
+                        "uid": "a",
+                        "permissions": [{"role": "Viewer", "permission": "View"}],
+                    }
+                ],
+                dashboards=[
+                    {
+                        "uid": "d",
+                        "permissions": [
+                            {"role": "Viewer", "permission": "View"},
+                            {"team": "ops", "permission": "Edit"},
+                        ],
+                    }
+                ],
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_folder_permission.main()
+        self.assertEqual(result.exception.args[0]["changed_folders"], ["a"])
+        self.assertEqual(result.exception.args[0]["changed_dashboards"], [])
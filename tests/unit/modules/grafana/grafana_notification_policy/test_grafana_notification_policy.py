@@ -0,0 +1,204 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import patch
+from ansible_collections.community.grafana.plugins.modules import (
+    grafana_notification_policy,
+)
+from ansible.module_utils import basic
+from contextlib import contextmanager
+import json
+
+__metaclass__ = type
+
+
+class MockedReponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if "changed" not in kwargs:
+        kwargs["changed"] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs["failed"] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+    pass
+
+
+@contextmanager
+def set_module_args(args):
+    """Context manager that sets module arguments for AnsibleModule"""
+
+    try:
+        from ansible.module_utils.testing import patch_module_args
+    except ImportError:
+        from ansible.module_utils._text import to_bytes
+
+        serialized_args = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+        with patch.object(basic, "_ANSIBLE_ARGS", serialized_args):
+            yield
+    else:
+        with patch_module_args(args):
+            yield
+
+
+def policy_tree():
+    return {
+        "receiver": "default",
+        "group_by": ["grafana_folder", "alertname"],
+        "provenance": "api",
+        "routes": [
+            {
+                "receiver": "ops",
+                "object_matchers": [["team", "=", "ops"]],
+                "routes": [
+                    {
+                        "receiver": "ops-pager",
+                        "object_matchers": [["severity", "=", "critical"]],
+                    }
+                ],
+            },
+            {"receiver": "dev", "object_matchers": [["team", "=", "dev"]]},
+        ],
+    }
+
+
+def policy_resp(policy):
+    return (MockedReponse(json.dumps(policy)), {"status": 200})
+
+
+def policy_args(routes):
+    return {
+        "url": "https://grafana.example.com",
+        "grafana_api_key": "token",
+        "routes": routes,
+    }
+
+
+class GrafanaNotificationPolicyTest(TestCase):
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(
+            basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json
+        )
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    def test_find_route(self):
+        tree = policy_tree()
+        parent, index, route = grafana_notification_policy.find_route(
+            tree, [[["team", "=", "ops"]], [["severity", "=", "critical"]]]
+        )
+        self.assertEqual(route["receiver"], "ops-pager")
+        self.assertEqual(index, 0)
+        self.assertIs(parent, tree["routes"][0])
+
+        parent, index, route = grafana_notification_policy.find_route(
+            tree, [[["team", "=", "qa"]], [["severity", "=", "critical"]]]
+        )
+        self.assertEqual((parent, index, route), (None, None, None))
+
+    def test_apply_route_edit_creates_route(self):
+        tree = policy_tree()
+        grafana_notification_policy.apply_route_edit(
+            tree,
+            {
+                "path": [[["team", "=", "dev"]], [["severity", "=", "warning"]]],
+                "state": "present",
+                "receiver": "dev-chat",
+            },
+        )
+        self.assertEqual(
+            tree["routes"][1]["routes"],
+            [
+                {
+                    "object_matchers": [["severity", "=", "warning"]],
+                    "receiver": "dev-chat",
+                }
+            ],
+        )
+
+    def test_apply_route_edit_fails_without_parent(self):
+        with self.assertRaises(grafana_notification_policy.GrafanaAPIException):
+            grafana_notification_policy.apply_route_edit(
+                policy_tree(),
+                {
+                    "path": [[["team", "=", "qa"]], [["severity", "=", "warning"]]],
+                    "state": "present",
+                    "receiver": "qa",
+                },
+            )
+
+    def test_canonical_policy_ignores_matcher_order_and_empty_fields(self):
+        tree = policy_tree()
+        other = policy_tree()
+        other["routes"][0]["object_matchers"] = [["team", "=", "ops"]]
+        other["routes"][0]["continue"] = False
+        other["group_by"] = ["alertname", "grafana_folder"]
+        del other["provenance"]
+        self.assertEqual(
+            grafana_notification_policy.canonical_policy(tree),
+            grafana_notification_policy.canonical_policy(other),
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_notification_policy.fetch_url"
+    )
+    def test_unchanged_policy_is_not_written(self, mock_fetch_url):
+        mock_fetch_url.return_value = policy_resp(policy_tree())
+        with set_module_args(
+            policy_args(
+                [
+                    {"path": [], "group_by": ["alertname", "grafana_folder"]},
+                    {"path": [[["team", "=", "dev"]]], "receiver": "dev"},
+                ]
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_notification_policy.main()
+        self.assertFalse(result.exception.args[0]["changed"])
+        self.assertEqual(mock_fetch_url.call_count, 1)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_notification_policy.fetch_url"
+    )
+    def test_policy_is_written_once(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            policy_resp(policy_tree()),
+            (MockedReponse(""), {"status": 202}),
+        ]
+        with set_module_args(
+            policy_args(
+                [
+                    {"path": [[["team", "=", "dev"]]], "state": "absent"},
+                    {"path": [[["team", "=", "ops"]]], "group_wait": "1m"},
+                ]
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_notification_policy.main()
+        self.assertTrue(result.exception.args[0]["changed"])
+        self.assertEqual(mock_fetch_url.call_count, 2)
+        written = json.loads(mock_fetch_url.call_args[1]["data"])
+        self.assertEqual(len(written["routes"]), 1)
+        self.assertEqual(written["routes"][0]["group_wait"], "1m")
+        self.assertNotIn("provenance", written)
@@ -0,0 +1,151 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import patch
+from ansible_collections.community.grafana.plugins.modules import (
+    grafana_organization,
+)
+from ansible.module_utils import basic
+from contextlib import contextmanager
+import json
+
+__metaclass__ = type
+
+
+class MockedReponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if "changed" not in kwargs:
+        kwargs["changed"] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs["failed"] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+    pass
+
+
+@contextmanager
+def set_module_args(args):
+    """Context manager that sets module arguments for AnsibleModule"""
+
+    try:
+        from ansible.module_utils.testing import patch_module_args
+    except ImportError:
+        from ansible.module_utils._text import to_bytes
+
+        serialized_args = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+        with patch.object(basic, "_ANSIBLE_ARGS", serialized_args):
+            yield
+    else:
+        with patch_module_args(args):
+            yield
+
+
+def resp(data, status=200):
+    return (MockedReponse(json.dumps(data)), {"status": status})
+
+
+def orgs_args(organizations, **kwargs):
+    args = {
+        "url": "https://grafana.example.com",
+        "url_username": "admin",
+        "url_password": "admin",
+        "workers": 1,
+        "organizations": organizations,
+    }
+    args.update(kwargs)
+    return args
+
+
+class GrafanaOrganizationTest(TestCase):
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(
+            basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json
+        )
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_organization.fetch_url"
+    )
+    def test_sync_orgs(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            resp(
+                [
+                    {"id": 1, "name": "Main Org."},
+                    {"id": 2, "name": "ops"},
+                    {"id": 3, "name": "legacy"},
+                    {"id": 4, "name": "old"},
+                    {"id": 5, "name": "gone"},
+                ]
+            ),
+            resp({"orgId": 6, "message": "Organization created"}),
+            resp({"message": "Organization deleted"}),
+            resp({"message": "Organization deleted"}),
+        ]
+        with set_module_args(
+            orgs_args(
+                [
+                    {"name": "ops"},
+                    {"name": "dev"},
+                    {"name": "dev"},
+                    {"name": "gone", "state": "absent"},
+                ],
+                prune=True,
+                protected_organizations=["legacy"],
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_organization.main()
+        result = result.exception.args[0]
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["created"], ["dev"])
+        self.assertEqual(result["deleted"], ["gone", "old"])
+        self.assertEqual(
+            result["orgs"], {"Main Org.": 1, "ops": 2, "legacy": 3, "dev": 6}
+        )
+        calls = [(c[1]["method"], c[0][1]) for c in mock_fetch_url.call_args_list]
+        self.assertEqual(
+            calls,
+            [
+                ("GET", "https://grafana.example.com/api/orgs?perpage=1000&page=1"),
+                ("POST", "https://grafana.example.com/api/orgs"),
+                ("DELETE", "https://grafana.example.com/api/orgs/5"),
+                ("DELETE", "https://grafana.example.com/api/orgs/4"),
+            ],
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_organization.fetch_url"
+    )
+    def test_sync_orgs_refuses_to_delete_main_org(self, mock_fetch_url):
+        mock_fetch_url.return_value = resp([{"id": 1, "name": "Main Org."}])
+        with set_module_args(orgs_args([{"name": "Main Org.", "state": "absent"}])):
+            with self.assertRaises(AnsibleFailJson) as result:
+                grafana_organization.main()
+        self.assertEqual(
+            result.exception.args[0]["msg"],
+            "The main organization Main Org. can't be deleted",
+        )
+        self.assertEqual(mock_fetch_url.call_count, 1)
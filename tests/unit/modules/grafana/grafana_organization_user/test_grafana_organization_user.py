@@ -0,0 +1,213 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import patch
+from ansible_collections.community.grafana.plugins.modules import (
+    grafana_organization_user,
+)
+from ansible.module_utils import basic
+from contextlib import contextmanager
+import json
+
+__metaclass__ = type
+
+
+class MockedReponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if "changed" not in kwargs:
+        kwargs["changed"] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs["failed"] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+    pass
+
+
+@contextmanager
+def set_module_args(args):
+    """Context manager that sets module arguments for AnsibleModule"""
+
+    try:
+        from ansible.module_utils.testing import patch_module_args
+    except ImportError:
+        from ansible.module_utils._text import to_bytes
+
+        serialized_args = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+        with patch.object(basic, "_ANSIBLE_ARGS", serialized_args):
+            yield
+    else:
+        with patch_module_args(args):
+            yield
+
+
+def resp(data, status=200):
+    return (MockedReponse(json.dumps(data)), {"status": status})
+
+
+def org_user(user_id, login, role="Viewer"):
+    return {
+        "userId": user_id,
+        "login": login,
+        "email": "%s@example.com" % login,
+        "role": role,
+    }
+
+
+def sync_args(users, **kwargs):
+    args = {
+        "url": "https://grafana.example.com",
+        "url_username": "admin",
+        "url_password": "admin",
+        "org_id": 2,
+        "workers": 1,
+        "users": users,
+    }
+    args.update(kwargs)
+    return args
+
+
+class GrafanaOrganizationUserTest(TestCase):
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(
+            basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json
+        )
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_organization_user.fetch_url"
+    )
+    def test_sync_users(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            resp(
+                {
+                    "totalCount": 4,
+                    "orgUsers": [
+                        org_user(1, "admin", "Admin"),
+                        org_user(2, "john"),
+                        org_user(3, "jane"),
+                        org_user(4, "bob"),
+                    ],
+                }
+            ),
+            resp({"message": "User added to organization"}),
+            resp({"message": "Organization user updated"}),
+            resp({"message": "User removed from organization"}),
+        ]
+        with set_module_args(
+            sync_args(
+                [
+                    {"login": "new@example.com", "role": "editor"},
+                    {"login": "john@example.com", "role": "admin"},
+                    {"login": "jane"},
+                    {"login": "bob", "state": "absent"},
+                    {"login": "ghost", "state": "absent"},
+                ]
+            )
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_organization_user.main()
+        result = result.exception.args[0]
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["added"], ["new@example.com"])
+        self.assertEqual(result["updated"], ["john@example.com"])
+        self.assertEqual(result["removed"], ["bob"])
+        calls = [
+            (c[1]["method"], c[0][1], c[1]["data"])
+            for c in mock_fetch_url.call_args_list
+        ]
+        self.assertEqual(
+            calls,
+            [
+                (
+                    "GET",
+                    "https://grafana.example.com/api/orgs/2/users/search?perpage=1000&page=1",
+                    None,
+                ),
+                (
+                    "POST",
+                    "https://grafana.example.com/api/orgs/2/users",
+                    json.dumps({"loginOrEmail": "new@example.com", "role": "Editor"}),
+                ),
+                (
+                    "PATCH",
+                    "https://grafana.example.com/api/orgs/2/users/2",
+                    json.dumps({"role": "Admin"}),
+                ),
+                ("DELETE", "https://grafana.example.com/api/orgs/2/users/4", None),
+            ],
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_organization_user.fetch_url"
+    )
+    def test_sync_users_prune_keeps_authenticated_user(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            (None, {"status": 404}),
+            resp(
+                [
+                    org_user(1, "admin", "Admin"),
+                    org_user(2, "john"),
+                    org_user(3, "jane"),
+                ]
+            ),
+            resp({"message": "User removed from organization"}),
+        ]
+        with set_module_args(sync_args([{"login": "john"}], prune=True)):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_organization_user.main()
+        result = result.exception.args[0]
+        self.assertEqual(result["removed"], ["jane"])
+        self.assertEqual(
+            mock_fetch_url.call_args[0][1],
+            "https://grafana.example.com/api/orgs/2/users/3",
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_organization_user.fetch_url"
+    )
+    def test_organization_users_walks_pages(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            resp({"totalCount": 3, "orgUsers": [org_user(1, "a"), org_user(2, "b")]}),
+            resp({"totalCount": 3, "orgUsers": [org_user(3, "c")]}),
+        ]
+        with set_module_args(sync_args([{"login": "a"}])):
+            module = basic.AnsibleModule(
+                argument_spec=dict(
+                    url=dict(type="str"),
+                    url_username=dict(type="str"),
+                    url_password=dict(type="str", no_log=True),
+                    org_id=dict(type="int"),
+                    workers=dict(type="int"),
+                    users=dict(type="list", elements="dict"),
+                )
+            )
+        iface = grafana_organization_user.GrafanaOrganizationUserInterface(module)
+        users = iface._organization_users(2, perpage=2)
+        self.assertEqual([user["login"] for user in users], ["a", "b", "c"])
+        self.assertEqual(
+            mock_fetch_url.call_args[0][1],
+            "https://grafana.example.com/api/orgs/2/users/search?perpage=2&page=2",
+        )
@@ -0,0 +1,214 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import patch
+from ansible_collections.community.grafana.plugins.modules import (
+    grafana_service_account,
+)
+from ansible.module_utils import basic
+from contextlib import contextmanager
+import json
+import os
+import shutil
+import stat
+import tempfile
+
+__metaclass__ = type
+
+
+class MockedReponse(object):
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+
+def exit_json(*args, **kwargs):
+    """function to patch over exit_json; package return data into an exception"""
+    if "changed" not in kwargs:
+        kwargs["changed"] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs["failed"] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+    pass
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+    pass
+
+
+@contextmanager
+def set_module_args(args):
+    """Context manager that sets module arguments for AnsibleModule"""
+
+    try:
+        from ansible.module_utils.testing import patch_module_args
+    except ImportError:
+        from ansible.module_utils._text import to_bytes
+
+        serialized_args = to_bytes(json.dumps({"ANSIBLE_MODULE_ARGS": args}))
+        with patch.object(basic, "_ANSIBLE_ARGS", serialized_args):
+            yield
+    else:
+        with patch_module_args(args):
+            yield
+
+
+FETCH_URL = "ansible_collections.community.grafana.plugins.modules.grafana_service_account.fetch_url"
+
+
+def json_resp(data, status=200):
+    return (MockedReponse(json.dumps(data)), {"status": status})
+
+
+def account():
+    return {
+        "id": 2,
+        "name": "ansible",
+        "login": "sa-ansible",
+        "orgId": 1,
+        "role": "Admin",
+        "isDisabled": False,
+        "tokens": 1,
+    }
+
+
+class GrafanaServiceAccountTest(TestCase):
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(
+            basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json
+        )
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.cache = os.path.join(self.tmpdir, "cache", "tokens.json")
+
+    def module_args(self, **kwargs):
+        args = {
+            "url": "https://grafana.example.com",
+            "grafana_api_key": "bootstrap",
+            "name": "ansible",
+            "role": "Admin",
+            "token_name": "ansible",
+            "token_cache": self.cache,
+        }
+        args.update(kwargs)
+        return args
+
+    def run_module(self, **kwargs):
+        with set_module_args(self.module_args(**kwargs)):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_service_account.main()
+        return result.exception.args[0]
+
+    @patch(FETCH_URL)
+    def test_token_is_minted_and_cached(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            json_resp({"serviceAccounts": [], "totalCount": 0}),
+            json_resp(account(), 201),
+            json_resp([]),
+            json_resp({"id": 7, "name": "ansible", "key": "glsa_secret"}),
+        ]
+        result = self.run_module()
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["token"], "glsa_secret")
+        self.assertEqual(
+            json.loads(mock_fetch_url.call_args[1]["data"]), {"name": "ansible"}
+        )
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache).st_mode), 0o600)
+        self.assertEqual(
+            stat.S_IMODE(os.stat(os.path.dirname(self.cache)).st_mode), 0o700
+        )
+
+        mock_fetch_url.reset_mock()
+        mock_fetch_url.side_effect = [
+            json_resp({"serviceAccounts": [account()], "totalCount": 1}),
+            json_resp([{"id": 7, "name": "ansible", "hasExpired": False}]),
+        ]
+        result = self.run_module()
+        self.assertFalse(result["changed"])
+        self.assertEqual(result["token"], "glsa_secret")
+        self.assertEqual(mock_fetch_url.call_count, 2)
+
+    @patch(FETCH_URL)
+    def test_expired_token_is_replaced(self, mock_fetch_url):
+        grafana_service_account.base.update_cache(
+            self.cache,
+            {
+                "https://grafana.example.com|1|ansible|ansible": {
+                    "id": 7,
+                    "key": "glsa_expired",
+                }
+            },
+        )
+        mock_fetch_url.side_effect = [
+            json_resp({"serviceAccounts": [account()], "totalCount": 1}),
+            json_resp([{"id": 7, "name": "ansible", "hasExpired": True}]),
+            json_resp({"message": "API key deleted"}),
+            json_resp({"id": 8, "name": "ansible", "key": "glsa_new"}),
+        ]
+        result = self.run_module(token_ttl=3600)
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["token"], "glsa_new")
+        self.assertEqual(
+            mock_fetch_url.call_args_list[2][0][1],
+            "https://grafana.example.com/api/serviceaccounts/2/tokens/7",
+        )
+        self.assertEqual(
+            json.loads(mock_fetch_url.call_args[1]["data"]),
+            {"name": "ansible", "secondsToLive": 3600},
+        )
+        self.assertEqual(
+            grafana_service_account.base.read_cache(self.cache),
+            {
+                "https://grafana.example.com|1|ansible|ansible": {
+                    "id": 8,
+                    "key": "glsa_new",
+                }
+            },
+        )
+
+    @patch(FETCH_URL)
+    def test_role_is_updated(self, mock_fetch_url):
+        mock_fetch_url.side_effect = [
+            json_resp({"serviceAccounts": [account()], "totalCount": 1}),
+            json_resp({"message": "Service account updated"}),
+        ]
+        result = self.run_module(role="Editor", token_name=None)
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["service_account"]["role"], "Editor")
+        self.assertEqual(mock_fetch_url.call_args[1]["method"], "PATCH")
+        self.assertNotIn("token", result)
+
+    @patch(FETCH_URL)
+    def test_delete_service_account_forgets_tokens(self, mock_fetch_url):
+        grafana_service_account.base.update_cache(
+            self.cache,
+            {
+                "https://grafana.example.com|1|ansible|ansible": {"id": 7, "key": "a"},
+                "https://grafana.example.com|1|other|ansible": {"id": 9, "key": "b"},
+            },
+        )
+        mock_fetch_url.side_effect = [
+            json_resp({"serviceAccounts": [account()], "totalCount": 1}),
+            json_resp({"message": "Service account deleted"}),
+        ]
+        result = self.run_module(state="absent")
+        self.assertTrue(result["changed"])
+        self.assertEqual(
+            list(grafana_service_account.base.read_cache(self.cache)),
+            ["https://grafana.example.com|1|other|ansible"],
+        )
@@ -222,3 +222,200 @@ class GrafanaSilenceTest(TestCase):
                 method="DELETE",
             )
             self.assertEqual(result, {"message": "silence deleted"})
+
+    def test_silence_key_ignores_matcher_order_and_timezone(self):
+        matchers = [
+            {"isEqual": True, "isRegex": False, "name": "host", "value": "web1"},
+            {"isRegex": True, "name": "environment", "value": "test"},
+        ]
+        self.assertEqual(
+            grafana_silence.silence_key(
+                "a testcomment",
+                "me",
+                "2029-07-29T10:45:45+02:00",
+                "2029-07-29T08:55:45Z",
+                matchers,
+            ),
+            grafana_silence.silence_key(
+                "a testcomment",
+                "me",
+                "2029-07-29T08:45:45.000Z",
+                "2029-07-29T08:55:45.000Z",
+                list(reversed(matchers)),
+            ),
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_silence.GrafanaSilenceInterface.get_version"
+    )
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_silence.fetch_url"
+    )
+    def test_get_silence_uses_filters_and_skips_expired(
+        self, mock_fetch_url, mock_get_version
+    ):
+        matchers = [
+            {"isEqual": True, "isRegex": False, "name": "host", "value": "web1"},
+            {"isEqual": True, "isRegex": True, "name": "environment", "value": "t.*"},
+        ]
+        silence = {
+            "comment": "a testcomment",
+            "createdBy": "me",
+            "startsAt": "2029-07-29T08:45:45.000Z",
+            "endsAt": "2029-07-29T08:55:45.000Z",
+            "matchers": list(reversed(matchers)),
+        }
+        server_response = json.dumps(
+            [
+                dict(silence, id="expired", status={"state": "expired"}),
+                dict(silence, id="active", status={"state": "active"}),
+            ]
+        )
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "url_username": "admin",
+                "url_password": "changeme",
+                "comment": "a testcomment",
+                "created_by": "me",
+                "starts_at": "2029-07-29T08:45:45.000Z",
+                "ends_at": "2029-07-29T08:55:45.000Z",
+                "matchers": matchers,
+            }
+        ):
+            module = grafana_silence.setup_module_object()
+            mock_get_version.return_value = get_version_resp()
+            mock_fetch_url.return_value = (
+                MockedReponse(server_response),
+                {"status": 200},
+            )
+
+            grafana_iface = grafana_silence.GrafanaSilenceInterface(module)
+            result = grafana_iface.get_silence(
+                "a testcomment",
+                "me",
+                "2029-07-29T08:45:45Z",
+                "2029-07-29T08:55:45Z",
+                matchers,
+            )
+            self.assertEqual(
+                mock_fetch_url.call_args[0][1],
+                "https://grafana.example.com/api/alertmanager/grafana/api/v2/silences"
+                "?filter=host%3D%22web1%22",
+            )
+            self.assertEqual(result["id"], "active")
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_silence.fetch_url"
+    )
+    def test_sync_silences_lists_once(self, mock_fetch_url):
+        def silence(host, **kwargs):
+            return dict(
+                comment="maintenance",
+                created_by="ansible",
+                starts_at="2029-07-29T08:45:45.000Z",
+                ends_at="2029-07-29T10:45:45.000Z",
+                matchers=[{"name": "host", "value": host}],
+                **kwargs
+            )
+
+        existing = [
+            {
+                "id": "web2-silence",
+                "comment": "maintenance",
+                "createdBy": "ansible",
+                "startsAt": "2029-07-29T08:45:45.000Z",
+                "endsAt": "2029-07-29T10:45:45.000Z",
+                "matchers": [{"name": "host", "value": "web2", "isRegex": False}],
+                "status": {"state": "pending"},
+            }
+        ]
+        mock_fetch_url.side_effect = [
+            (MockedReponse(json.dumps({"version": "10.0.0"})), {"status": 200}),
+            (MockedReponse(json.dumps(existing)), {"status": 200}),
+            silence_created_resp(),
+            silence_deleted_resp(),
+        ]
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "grafana_api_key": "token",
+                "workers": 1,
+                "silences": [
+                    silence("web1"),
+                    silence("web1"),
+                    silence("web2", state="absent"),
+                    silence("web3", state="absent"),
+                ],
+            }
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_silence.main()
+        result = result.exception.args[0]
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["created"], ["470b7116-8f06-4bb6-9e6c-6258aa92218e"])
+        self.assertEqual(result["deleted"], ["web2-silence"])
+        self.assertEqual(mock_fetch_url.call_count, 4)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_silence.fetch_url"
+    )
+    def test_delete_silences_matching_comment(self, mock_fetch_url):
+        def existing(silence_id, comment, created_by, state="active"):
+            return {
+                "id": silence_id,
+                "comment": comment,
+                "createdBy": created_by,
+                "startsAt": "2029-07-29T08:45:45.000Z",
+                "endsAt": "2029-07-29T10:45:45.000Z",
+                "matchers": [{"name": "host", "value": silence_id}],
+                "status": {"state": state},
+            }
+
+        mock_fetch_url.side_effect = [
+            (MockedReponse(json.dumps({"version": "10.0.0"})), {"status": 200}),
+            (
+                MockedReponse(
+                    json.dumps(
+                        [
+                            existing("a", "maintenance web", "ansible"),
+                            existing("b", "maintenance db", "someone"),
+                            existing("c", "maintenance old", "ansible", "expired"),
+                            existing("d", "incident", "ansible"),
+                        ]
+                    )
+                ),
+                {"status": 200},
+            ),
+            silence_deleted_resp(),
+        ]
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "grafana_api_key": "token",
+                "created_by": "ansible",
+                "comment_regex": "^maintenance",
+                "state": "absent",
+            }
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_silence.main()
+        self.assertEqual(result.exception.args[0]["deleted"], ["a"])
+        self.assertEqual(
+            mock_fetch_url.call_args[0][1],
+            "https://grafana.example.com/api/alertmanager/grafana/api/v2/silence/a",
+        )
+
+    def test_comment_regex_requires_state_absent(self):
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "grafana_api_key": "token",
+                "comment_regex": "^maintenance",
+            }
+        ):
+            with self.assertRaises(AnsibleFailJson) as result:
+                grafana_silence.setup_module_object()
+        self.assertEqual(
+            result.exception.args[0]["msg"], "comment_regex requires state=absent"
+        )
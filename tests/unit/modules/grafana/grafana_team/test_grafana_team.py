@@ -733,3 +733,303 @@ class GrafanaTeamsTest(TestCase):
         self.assertEqual(
             res, {"to_del": ["random@example.com"], "to_add": ["foo@example.com"]}
         )
+
+    def test_diff_members_function_ignores_duplicates(self):
+        res = grafana_team.diff_members(
+            ["foo@example.com", "foo@example.com", "bar@example.com"],
+            ["bar@example.com", "random@example.com", "random@example.com"],
+        )
+        self.assertEqual(
+            res, {"to_del": ["random@example.com"], "to_add": ["foo@example.com"]}
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.GrafanaTeamInterface.get_version"
+    )
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.fetch_url"
+    )
+    def test_sync_team_members_resolves_user_ids_in_bulk(
+        self, mock_fetch_url, mock_get_version
+    ):
+        with set_module_args(
+            {
+                "state": "present",
+                "name": "MyTestTeam",
+                "email": "email@test.com",
+                "url": "http://grafana.example.com",
+            }
+        ):
+            module = grafana_team.setup_module_object()
+            org_users_resp = (
+                MockedReponse(
+                    json.dumps(
+                        {
+                            "totalCount": 2,
+                            "orgUsers": [
+                                {
+                                    "userId": 4,
+                                    "login": "user4",
+                                    "email": "user4@email.com",
+                                },
+                                {
+                                    "userId": 5,
+                                    "login": "user5",
+                                    "email": "User5@email.com",
+                                },
+                            ],
+                        }
+                    )
+                ),
+                {"status": 200},
+            )
+            mock_fetch_url.side_effect = [
+                switch_org_resp(),
+                team_members_resp(),
+                org_users_resp,
+                add_team_member_resp(),
+                add_team_member_resp(),
+                delete_team_member_resp(),
+            ]
+            mock_get_version.return_value = get_version_resp()
+
+            grafana_iface = grafana_team.GrafanaTeamInterface(module)
+            res = grafana_iface.sync_team_members(
+                2,
+                ["user1@email.com", "user4@email.com", "user5@email.com"],
+                True,
+            )
+            self.assertEqual(
+                res, ["user1@email.com", "user4@email.com", "user5@email.com"]
+            )
+            self.assertEqual(mock_fetch_url.call_count, 6)
+            calls = [(c[0][1], c[1].get("data")) for c in mock_fetch_url.call_args_list]
+            self.assertEqual(
+                calls[2][0],
+                "http://grafana.example.com/api/org/users/search?perpage=1000&page=1",
+            )
+            self.assertEqual(
+                calls[3:],
+                [
+                    (
+                        "http://grafana.example.com/api/teams/2/members",
+                        json.dumps({"userId": 4}),
+                    ),
+                    (
+                        "http://grafana.example.com/api/teams/2/members",
+                        json.dumps({"userId": 5}),
+                    ),
+                    ("http://grafana.example.com/api/teams/2/members/2", None),
+                ],
+            )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.GrafanaTeamInterface.get_version"
+    )
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.fetch_url"
+    )
+    def test_sync_team_members_sets_members_in_one_request(
+        self, mock_fetch_url, mock_get_version
+    ):
+        with set_module_args(
+            {
+                "state": "present",
+                "name": "MyTestTeam",
+                "email": "email@test.com",
+                "url": "http://grafana.example.com",
+            }
+        ):
+            module = grafana_team.setup_module_object()
+            mock_fetch_url.side_effect = [
+                switch_org_resp(),
+                team_members_resp(),
+                (MockedReponse(json.dumps({"message": "ok"})), {"status": 200}),
+            ]
+            mock_get_version.return_value = {"major": 10, "minor": 0, "rev": 0}
+
+            grafana_iface = grafana_team.GrafanaTeamInterface(module)
+            res = grafana_iface.sync_team_members(
+                2, ["user1@email.com", "user4@email.com"], True
+            )
+            self.assertEqual(res, ["user1@email.com", "user4@email.com"])
+            self.assertEqual(mock_fetch_url.call_count, 3)
+            mock_fetch_url.assert_called_with(
+                module,
+                "http://grafana.example.com/api/teams/2/members",
+                data=json.dumps(
+                    {"admins": [], "members": ["user1@email.com", "user4@email.com"]},
+                    sort_keys=True,
+                ),
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": self.authorization,
+                },
+                method="PUT",
+            )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.GrafanaTeamInterface.get_version"
+    )
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.fetch_url"
+    )
+    def test_sync_team_members_falls_back_without_bulk_endpoint(
+        self, mock_fetch_url, mock_get_version
+    ):
+        with set_module_args(
+            {
+                "state": "present",
+                "name": "MyTestTeam",
+                "email": "email@test.com",
+                "url": "http://grafana.example.com",
+            }
+        ):
+            module = grafana_team.setup_module_object()
+            mock_fetch_url.side_effect = [
+                switch_org_resp(),
+                team_members_resp(),
+                (MockedReponse(""), {"status": 404}),
+                (MockedReponse(json.dumps({"message": "ok"})), {"status": 200}),
+            ]
+            mock_get_version.return_value = {"major": 10, "minor": 0, "rev": 0}
+
+            grafana_iface = grafana_team.GrafanaTeamInterface(module)
+            res = grafana_iface.sync_team_members(2, ["user1@email.com"], True)
+            self.assertEqual(res, ["user1@email.com"])
+            self.assertEqual(
+                [call[1]["method"] for call in mock_fetch_url.call_args_list[2:]],
+                ["PUT", "DELETE"],
+            )
+            self.assertEqual(
+                mock_fetch_url.call_args[0][1],
+                "http://grafana.example.com/api/teams/2/members/2",
+            )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.GrafanaTeamInterface.get_version"
+    )
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.fetch_url"
+    )
+    def test_get_team_method_ignores_prefix_matches(
+        self, mock_fetch_url, mock_get_version
+    ):
+        with set_module_args(
+            {
+                "state": "present",
+                "name": "MyTestTeam",
+                "email": "email@test.com",
+                "url": "http://grafana.example.com",
+            }
+        ):
+            module = grafana_team.setup_module_object()
+            mock_fetch_url.return_value = (
+                MockedReponse(
+                    json.dumps(
+                        {
+                            "totalCount": 2,
+                            "teams": [
+                                {"id": 3, "name": "MyTestTeam2"},
+                                {"id": 2, "name": "MyTestTeam"},
+                            ],
+                        }
+                    )
+                ),
+                {"status": 200},
+            )
+            mock_get_version.return_value = get_version_resp()
+
+            grafana_iface = grafana_team.GrafanaTeamInterface(module)
+            res = grafana_iface.get_team("MyTestTeam")
+            self.assertEqual(res, {"id": 2, "name": "MyTestTeam"})
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.GrafanaTeamInterface.get_version"
+    )
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.fetch_url"
+    )
+    def test_sync_teams(self, mock_fetch_url, mock_get_version):
+        def teams_page(teams, total):
+            return (
+                MockedReponse(json.dumps({"totalCount": total, "teams": teams})),
+                {"status": 200},
+            )
+
+        with set_module_args(
+            {
+                "url": "http://grafana.example.com",
+                "workers": 1,
+                "teams": [
+                    {"name": "new", "email": "new@test.com"},
+                    {"name": "renamed", "email": "renamed@test.com"},
+                    {"name": "unchanged", "email": "unchanged@test.com"},
+                    {"name": "old", "state": "absent"},
+                    {"name": "missing", "state": "absent"},
+                ],
+            }
+        ):
+            mock_get_version.return_value = get_version_resp()
+            mock_fetch_url.side_effect = [
+                switch_org_resp(),
+                teams_page(
+                    [
+                        {"id": 1, "name": "renamed", "email": "other@test.com"},
+                        {"id": 2, "name": "unchanged", "email": "unchanged@test.com"},
+                        {"id": 3, "name": "old", "email": "old@test.com"},
+                    ],
+                    3,
+                ),
+                team_created_resp(),
+                team_updated_resp(),
+                team_deleted_resp(),
+            ]
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_team.main()
+            result = result.exception.args[0]
+            self.assertEqual(result["created"], ["new"])
+            self.assertEqual(result["updated"], ["renamed"])
+            self.assertEqual(result["deleted"], ["old"])
+            self.assertEqual(mock_fetch_url.call_count, 5)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.GrafanaTeamInterface.get_version"
+    )
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_team.fetch_url"
+    )
+    def test_get_teams_method_walks_pages(self, mock_fetch_url, mock_get_version):
+        def teams_page(names):
+            return (
+                MockedReponse(
+                    json.dumps(
+                        {"totalCount": 3, "teams": [{"name": name} for name in names]}
+                    )
+                ),
+                {"status": 200},
+            )
+
+        with set_module_args(
+            {
+                "state": "present",
+                "name": "MyTestTeam",
+                "email": "email@test.com",
+                "url": "http://grafana.example.com",
+            }
+        ):
+            module = grafana_team.setup_module_object()
+            mock_fetch_url.side_effect = [
+                switch_org_resp(),
+                teams_page(["a", "b"]),
+                teams_page(["c"]),
+            ]
+            mock_get_version.return_value = get_version_resp()
+
+            grafana_iface = grafana_team.GrafanaTeamInterface(module)
+            res = grafana_iface.get_teams(perpage=2)
+            self.assertEqual(sorted(res), ["a", "b", "c"])
+            self.assertEqual(
+                mock_fetch_url.call_args[0][1],
+                "http://grafana.example.com/api/teams/search?perpage=2&page=2",
+            )
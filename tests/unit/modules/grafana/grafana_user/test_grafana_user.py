@@ -7,6 +7,8 @@ from ansible.module_utils import basic
 from ansible.module_utils.urls import basic_auth_header
 from contextlib import contextmanager
 import json
+import os
+import tempfile
 
 __metaclass__ = type
 
@@ -252,3 +254,253 @@ class GrafanaUserTest(TestCase):
                 method="DELETE",
             )
             self.assertEqual(result, {"message": "User deleted"})
+
+    def test_users_file_passwords_are_masked(self):
+        users_file = tempfile.NamedTemporaryFile(mode="wb", suffix=".csv", delete=False)
+        self.addCleanup(os.remove, users_file.name)
+        with users_file:
+            users_file.write(
+                "login,name,email,password\n"
+                "robin,Röbin,robin@gotham.com,oups\n".encode("utf-8")
+            )
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "url_username": "admin",
+                "url_password": "changeme",
+                "users_file": users_file.name,
+            }
+        ):
+            module = grafana_user.setup_module_object()
+        records = list(grafana_user.read_users_file(module, users_file.name))
+        self.assertEqual(records[0]["name"], "Röbin")
+        self.assertIn("oups", module.no_log_values)
+        self.assertNotIn("robin", module.no_log_values)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_user.fetch_url"
+    )
+    def test_sync_users_from_csv_file(self, mock_fetch_url):
+        users_file = tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False)
+        self.addCleanup(os.remove, users_file.name)
+        with users_file:
+            users_file.write(
+                "login,name,email,password,is_admin,state\n"
+                "robin,Robin,robin@gotham.com,oups,true,\n"
+                "joker,Joker,joker@gotham.com,,,\n"
+                "batman,Bruce Wayne,batman@gotham.city,,false,\n"
+                "alfred,,,,,absent\n"
+                "riddler,,,,,absent\n"
+            )
+
+        def resp(data):
+            return (MockedReponse(json.dumps(data)), {"status": 200})
+
+        mock_fetch_url.side_effect = [
+            resp(
+                {
+                    "totalCount": 3,
+                    "users": [
+                        {
+                            "id": 1,
+                            "login": "batman",
+                            "name": "Bruce Wayne",
+                            "email": "batman@gotham.city",
+                            "isAdmin": False,
+                        },
+                        {
+                            "id": 2,
+                            "login": "joker",
+                            "name": "Joker",
+                            "email": "joker@arkham.com",
+                            "isAdmin": False,
+                        },
+                        {
+                            "id": 3,
+                            "login": "alfred",
+                            "name": "Alfred",
+                            "email": "alfred@gotham.city",
+                            "isAdmin": False,
+                        },
+                    ],
+                }
+            ),
+            resp({"id": 4, "message": "User created"}),
+            resp({"message": "User permissions updated"}),
+            resp({"message": "User updated"}),
+            resp({"message": "User deleted"}),
+        ]
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "url_username": "admin",
+                "url_password": "changeme",
+                "users_file": users_file.name,
+                "workers": 1,
+            }
+        ):
+            with self.assertRaises(AnsibleExitJson) as result:
+                grafana_user.main()
+        result = result.exception.args[0]
+        self.assertTrue(result["changed"])
+        self.assertEqual(result["created"], ["robin"])
+        self.assertEqual(result["updated"], ["joker"])
+        self.assertEqual(result["deleted"], ["alfred"])
+        calls = [(c[1]["method"], c[0][1]) for c in mock_fetch_url.call_args_list]
+        self.assertEqual(
+            calls,
+            [
+                (
+                    "GET",
+                    "https://grafana.example.com/api/users/search?perpage=1000&page=1",
+                ),
+                ("POST", "https://grafana.example.com/api/admin/users"),
+                ("PUT", "https://grafana.example.com/api/admin/users/4/permissions"),
+                ("PUT", "https://grafana.example.com/api/users/2"),
+                ("DELETE", "https://grafana.example.com/api/admin/users/3"),
+            ],
+        )
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_user.fetch_url"
+    )
+    def test_sync_users_from_jsonl_file_requires_password(self, mock_fetch_url):
+        users_file = tempfile.NamedTemporaryFile(
+            mode="w", suffix=".jsonl", delete=False
+        )
+        self.addCleanup(os.remove, users_file.name)
+        with users_file:
+            users_file.write(
+                '{"login": "robin", "name": "Robin", "email": "robin@gotham.com"}\n'
+            )
+        mock_fetch_url.return_value = (
+            MockedReponse(json.dumps({"totalCount": 0, "users": []})),
+            {"status": 200},
+        )
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "url_username": "admin",
+                "url_password": "changeme",
+                "users_file": users_file.name,
+            }
+        ):
+            with self.assertRaises(AnsibleFailJson) as result:
+                grafana_user.main()
+        self.assertEqual(
+            result.exception.args[0]["msg"],
+            "missing required arguments: password, for user 'robin'",
+        )
+        self.assertEqual(mock_fetch_url.call_count, 1)
+
+    def session_module(self, cache):
+        with set_module_args(
+            {
+                "url": "https://grafana.example.com",
+                "url_username": "admin",
+                "url_password": "changeme",
+                "login": "batman",
+                "state": "absent",
+                "session_cache": cache,
+            }
+        ):
+            return grafana_user.setup_module_object()
+
+    @patch("ansible_collections.community.grafana.plugins.module_utils.base.fetch_url")
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_user.fetch_url"
+    )
+    def test_session_cookie_is_reused(self, mock_fetch_url, mock_login):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, cache_dir)
+        cache = os.path.join(cache_dir, "sessions.json")
+        self.addCleanup(os.remove, cache)
+        self.addCleanup(os.remove, cache + ".lock")
+        mock_login.return_value = (
+            MockedReponse(json.dumps({"message": "Logged in"})),
+            {
+                "status": 200,
+                "set-cookie": "grafana_session=abc; Path=/; Max-Age=3600; HttpOnly",
+                "cookies": {"grafana_session": "abc"},
+            },
+        )
+        mock_fetch_url.return_value = user_deleted_resp()
+
+        for run in range(2):
+            module = self.session_module(cache)
+            grafana_iface = grafana_user.GrafanaUserInterface(module)
+            grafana_iface.delete_user(42)
+
+        self.assertEqual(mock_login.call_count, 1)
+        self.assertEqual(
+            json.loads(mock_login.call_args[1]["data"]),
+            {"user": "admin", "password": "changeme"},
+        )
+        self.assertEqual(
+            mock_fetch_url.call_args[1]["headers"],
+            {"Content-Type": "application/json", "Cookie": "grafana_session=abc"},
+        )
+        self.assertEqual(os.stat(cache).st_mode & 0o777, 0o600)
+
+    def test_session_expiry_of_merged_set_cookie_headers(self):
+        # the Set-Cookie headers of a Grafana login, merged by fetch_url
+        info = {
+            "set-cookie": "grafana_session=abc; Path=/; "
+            "Expires=Wed, 21 Oct 2026 07:28:00 GMT; Max-Age=3600; HttpOnly, "
+            "grafana_session_expiry=2000000000; Path=/; Max-Age=3600",
+            "cookies": {"grafana_session": "abc"},
+        }
+        self.assertEqual(grafana_user.base.session_expiry(info, 1000), 4600)
+
+        info["set-cookie"] = (
+            "grafana_session=abc; Path=/; Expires=Wed, 21 Oct 2026 07:28:00 GMT, "
+            "grafana_session_expiry=2000000000; Path=/"
+        )
+        self.assertEqual(grafana_user.base.session_expiry(info, 1000), 1792567680)
+
+    @patch(
+        "ansible_collections.community.grafana.plugins.modules.grafana_user.fetch_url"
+    )
+    def test_rejected_session_falls_back_to_basic_auth(self, mock_fetch_url):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, cache_dir)
+        cache = os.path.join(cache_dir, "sessions.json")
+        self.addCleanup(os.remove, cache)
+        self.addCleanup(os.remove, cache + ".lock")
+        grafana_user.base.update_cache(
+            cache,
+            {
+                "https://grafana.example.com|admin": {
+                    "cookie": "expired",
+                    "expires": 2**40,
+                }
+            },
+        )
+        sent_headers = []
+        responses = [(None, {"status": 401}), user_deleted_resp()]
+
+        def fetch(module, url, data=None, headers=None, method=None):
+            sent_headers.append(dict(headers))
+            return responses.pop(0)
+
+        mock_fetch_url.side_effect = fetch
+
+        module = self.session_module(cache)
+        grafana_iface = grafana_user.GrafanaUserInterface(module)
+        result = grafana_iface.delete_user(42)
+
+        self.assertEqual(result, {"message": "User deleted"})
+        self.assertEqual(
+            sent_headers,
+            [
+                {
+                    "Content-Type": "application/json",
+                    "Cookie": "grafana_session=expired",
+                },
+                {
+                    "Content-Type": "application/json",
+                    "Authorization": self.authorization,
+                },
+            ],
+        )
+        self.assertEqual(grafana_user.base.read_cache(cache), {})
@@ -0,0 +1,467 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+from ansible.module_utils.six.moves import BaseHTTPServer, socketserver
+from ansible.module_utils.six.moves.urllib.parse import parse_qs, urlsplit
+from ansible.plugins.loader import callback_loader
+from ansible_collections.community.grafana.plugins.callback import (
+    grafana_annotations,
+)
+from datetime import datetime
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+__metaclass__ = type
+
+
+class GrafanaHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(
+            (self.path, dict(self.headers), json.loads(body.decode("utf-8")))
+        )
+        self.server.connections.add(self.client_address)
+        self.server.gate.wait()
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if status == 200:
+            self.server.annotations.append(self.server.requests[-1][2])
+        self.respond(status, {})
+
+    def do_GET(self):
+        tags = parse_qs(urlsplit(self.path).query)["tags"]
+        self.respond(
+            200,
+            [
+                annotation
+                for annotation in self.server.annotations
+                if set(tags) <= set(annotation["tags"])
+            ],
+        )
+
+    def do_CONNECT(self):
+        # acting as a proxy which can't reach Grafana
+        self.server.requests.append((self.path, dict(self.headers), None))
+        self.respond(502, {})
+
+    def respond(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class GrafanaServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    # the keep-alive connections left open don't block the shutdown
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ("127.0.0.1", 0), GrafanaHandler)
+        self.requests = []
+        self.annotations = []
+        self.connections = set()
+        self.statuses = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d/api/annotations" % self.server_address[1]
+
+
+class Playbook(object):
+    _file_name = "site.yml"
+
+
+class Stats(object):
+    processed = {"host1": 1}
+
+    def summarize(self, host):
+        return {"ok": 1}
+
+
+class Task(object):
+    def __init__(self, name):
+        self._uuid = name
+        self.name = name
+
+    def __str__(self):
+        return "TASK: %s" % self.name
+
+    def get_name(self):
+        return self.name
+
+
+class Play(object):
+    def get_name(self):
+        return "deploy"
+
+
+class Host(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class Result(object):
+    def __init__(self, task, host):
+        self._task = task
+        self._host = Host(host)
+        self._result = {"msg": "failed on %s" % host}
+
+
+class GrafanaAnnotationsCallbackTest(TestCase):
+    def setUp(self):
+        self.server = GrafanaServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(self.server.gate.set)
+
+    def callback(self, **options):
+        callback = callback_loader.get("community.grafana.grafana_annotations")
+        callback._display = MagicMock(verbosity=0)
+        options.setdefault("grafana_url", self.server.url)
+        callback.set_options(direct=options)
+        return callback
+
+    def test_annotations_are_sent_over_one_connection(self):
+        callback = self.callback(grafana_api_key="key", grafana_panel_ids=[1, 2])
+        callback.v2_playbook_on_start(Playbook())
+        callback.v2_playbook_on_stats(Stats())
+
+        self.assertEqual(
+            [(path, data.get("panelId")) for path, _, data in self.server.requests],
+            [
+                ("/api/annotations", None),
+                ("/api/annotations", 1),
+                ("/api/annotations", 2),
+            ],
+        )
+        self.assertEqual(self.server.requests[0][1]["Authorization"], "Bearer key")
+        self.assertEqual(len(self.server.connections), 1)
+        callback._display.warning.assert_not_called()
+
+    def test_basic_auth_is_sent(self):
+        callback = self.callback(grafana_user="bob", grafana_password="secret")
+        callback.v2_playbook_on_start(Playbook())
+        callback.v2_playbook_on_stats(Stats())
+
+        self.assertEqual(
+            self.server.requests[0][1]["Authorization"], "Basic Ym9iOnNlY3JldA=="
+        )
+
+    def test_http_proxy_of_the_environment_is_used(self):
+        proxy = "http://user:pw@127.0.0.1:%d" % self.server.server_address[1]
+        with patch.dict(os.environ, {"http_proxy": proxy, "no_proxy": ""}):
+            callback = self.callback(
+                grafana_url="http://grafana.example.com/api/annotations"
+            )
+            callback.v2_playbook_on_start(Playbook())
+            callback.v2_playbook_on_stats(Stats())
+
+        path, headers, annotation = self.server.requests[0]
+        self.assertEqual(path, "http://grafana.example.com/api/annotations")
+        self.assertEqual(headers["Proxy-Authorization"], "Basic dXNlcjpwdw==")
+
+    def test_https_is_tunneled_through_the_proxy(self):
+        proxy = "http://user:pw@127.0.0.1:%d" % self.server.server_address[1]
+        with patch.dict(os.environ, {"https_proxy": proxy, "no_proxy": ""}):
+            callback = self.callback(
+                grafana_url="https://grafana.example.com/api/annotations"
+            )
+            callback.v2_playbook_on_start(Playbook())
+            callback.v2_playbook_on_stats(Stats())
+
+        path, headers, annotation = self.server.requests[0]
+        self.assertEqual(path, "grafana.example.com:443")
+        self.assertEqual(headers["Proxy-Authorization"], "Basic dXNlcjpwdw==")
+        self.assertEqual(self.server.annotations, [])
+
+    def test_no_proxy_bypasses_the_proxy(self):
+        with patch.dict(
+            os.environ, {"http_proxy": "http://127.0.0.1:9", "no_proxy": "127.0.0.1"}
+        ):
+            callback = self.callback()
+            callback.v2_playbook_on_start(Playbook())
+            callback.v2_playbook_on_stats(Stats())
+
+        self.assertEqual(self.server.requests[0][0], "/api/annotations")
+        callback._display.warning.assert_not_called()
+
+    def test_errors_are_reported_at_the_end(self):
+        self.server.statuses = [500]
+        callback = self.callback()
+        callback.v2_playbook_on_start(Playbook())
+        callback.v2_playbook_on_stats(Stats())
+
+        self.assertEqual(len(self.server.requests), 2)
+        callback._display.warning.assert_called_once_with(
+            "Could not submit 1 annotations to %s: "
+            "Grafana answered with HTTP 500 Internal Server Error" % self.server.url
+        )
+
+    def test_full_queue_and_drain_timeout_drop_annotations(self):
+        self.server.gate.clear()
+        callback = self.callback(queue_size=1, drain_timeout=0.2)
+        callback.v2_playbook_on_start(Playbook())
+        # the first annotation is being sent, the second one waits in the queue
+        while not self.server.requests:
+            threading.Event().wait(0.01)
+        callback._send_annotation({"text": "queued"})
+        callback._send_annotation({"text": "dropped"})
+        callback.v2_playbook_on_stats(Stats())
+
+        # the two dropped ones, the queued one and the one being sent
+        self.assertEqual(callback.targets[0]["sender"].dropped, 4)
+        callback._display.warning.assert_called_once_with(
+            "4 annotations were not sent to %s, the queue was full or "
+            "Grafana didn't answer before the drain timeout" % self.server.url
+        )
+
+    def test_failures_of_a_task_are_aggregated(self):
+        callback = self.callback(failure_window=60, failure_max_hosts=2)
+        callback.v2_playbook_on_start(Playbook())
+        install, restart = Task("install"), Task("restart")
+        for host in ("web1", "web2", "web3"):
+            callback.v2_runner_on_failed(Result(install, host))
+        callback.v2_playbook_on_task_start(restart, False)
+        callback.v2_runner_on_failed(Result(restart, "web1"))
+        callback.v2_playbook_on_stats(Stats())
+
+        texts = [data["text"] for _, _, data in self.server.requests]
+        self.assertEqual(len(texts), 4)
+        self.assertIn(
+            "'TASK: install' failed on 3 hosts: web1, web2 and 1 more", texts[1]
+        )
+        self.assertIn("debug (web1): ", texts[1])
+        self.assertIn("'TASK: restart' failed on web1", texts[2])
+        self.assertTrue(texts[3].startswith("Playbook site.yml\n"))
+        self.assertEqual(callback.errors, 4)
+
+    def test_failures_are_sent_once_the_window_has_passed(self):
+        callback = self.callback(failure_window=0.01)
+        callback.v2_playbook_on_start(Playbook())
+        install = Task("install")
+        callback.v2_runner_on_failed(Result(install, "web1"))
+        threading.Event().wait(0.02)
+        callback.v2_runner_on_failed(Result(install, "web2"))
+
+        self.assertEqual(list(callback.failures), ["install"])
+        self.assertEqual(callback.failures["install"]["hosts"], ["web2"])
+        callback.v2_playbook_on_stats(Stats())
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_failure_annotations_are_capped(self):
+        callback = self.callback(max_annotations=1)
+        callback.v2_playbook_on_start(Playbook())
+        for host in ("web1", "web2", "web3"):
+            callback.v2_runner_on_failed(Result(Task("install"), host))
+        callback.v2_playbook_on_stats(Stats())
+
+        self.assertEqual(len(self.server.requests), 3)
+        callback._display.warning.assert_called_once_with(
+            "2 failure annotations were not sent to Grafana, above max_annotations"
+        )
+
+    def test_unsent_annotations_are_spooled_and_replayed(self):
+        spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool_dir)
+        self.server.statuses = [503]
+        callback = self.callback(spool_dir=spool_dir)
+        callback.v2_playbook_on_start(Playbook())
+        callback.v2_playbook_on_stats(Stats())
+
+        # Grafana isn't retried after the failure
+        self.assertEqual(len(self.server.requests), 1)
+        with open(callback.targets[0]["sender"].spool.path) as f:
+            spooled = [json.loads(line) for line in f]
+        self.assertEqual(
+            [annotation["tags"][1] for annotation in spooled],
+            ["ansible_event_start", "ansible_report"],
+        )
+        self.assertTrue(spooled[0]["tags"][-1].startswith("ansible_id:"))
+        callback._display.warning.assert_called_once_with(
+            "2 annotations were spooled to %s, they will be sent by the next run"
+            % callback.targets[0]["sender"].spool.path
+        )
+
+        # the report was created by Grafana despite the error
+        self.server.annotations.append(spooled[1])
+        self.server.requests = []
+        callback = self.callback(spool_dir=spool_dir)
+        callback.v2_playbook_on_start(Playbook())
+        callback.v2_playbook_on_stats(Stats())
+
+        self.assertEqual(
+            [data["tags"][1] for _, _, data in self.server.requests],
+            ["ansible_event_start", "ansible_event_start", "ansible_report"],
+        )
+        self.assertEqual(self.server.requests[0][2], spooled[0])
+        self.assertEqual(os.listdir(spool_dir), [])
+        callback._display.warning.assert_not_called()
+
+    def test_post_failing_after_the_drain_timeout_is_dropped(self):
+        spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool_dir)
+        # Grafana answers slower than drain_timeout, with an error
+        self.server.gate.clear()
+        self.server.statuses = [503]
+        callback = self.callback(spool_dir=spool_dir, drain_timeout=0.2)
+        callback.v2_playbook_on_start(Playbook())
+        callback.v2_playbook_on_stats(Stats())
+        sender = callback.targets[0]["sender"]
+        self.server.gate.set()
+        sender.thread.join(5)
+
+        self.assertFalse(sender.thread.is_alive())
+        self.assertIsNone(sender.spool.file)
+        self.assertEqual(sender.dropped, 1)
+        with open(sender.spool.path) as f:
+            spooled = [json.loads(line) for line in f]
+        self.assertEqual(
+            [annotation["tags"][1] for annotation in spooled], ["ansible_report"]
+        )
+
+    def test_replay_files_of_dead_runs_are_claimed(self):
+        spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool_dir)
+        spool = grafana_annotations.GrafanaAnnotationSpool(spool_dir, "annotations")
+        first = {"time": 1, "tags": ["ansible_id:1"]}
+        second = {"time": 2, "tags": ["ansible_id:2"]}
+        with open(spool.path + ".replay-999999999", "w") as f:
+            f.write(json.dumps(second) + "\n" + json.dumps(first) + "\n{")
+        spool.append(second)
+        spool.close()
+
+        self.assertEqual(spool.claim(), [first, second])
+        spool.forget_replayed()
+        self.assertEqual(os.listdir(spool_dir), [])
+
+    def test_slow_tasks_and_timing_summary(self):
+        callback = self.callback(slow_task_threshold=0.05)
+        callback.v2_playbook_on_start(Playbook())
+        callback.v2_playbook_on_play_start(Play())
+        install, restart = Task("install"), Task("restart")
+        callback.v2_playbook_on_task_start(install, False)
+        for host in ("web1", "web2"):
+            callback.v2_runner_on_start(Host(host), install)
+        threading.Event().wait(0.06)
+        for host in ("web1", "web2"):
+            callback.v2_runner_on_ok(Result(install, host))
+        callback.v2_playbook_on_task_start(restart, False)
+        callback.v2_runner_on_start(Host("web1"), restart)
+        callback.v2_runner_on_skipped(Result(restart, "web1"))
+        callback.v2_playbook_on_stats(Stats())
+
+        slow, stats = self.server.requests[1][2], self.server.requests[2][2]
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(slow["tags"][1], "ansible_slow_task")
+        self.assertTrue(slow["isRegion"])
+        self.assertGreaterEqual(slow["timeEnd"] - slow["time"], 60)
+        self.assertIn("'install' of play 'deploy' took 0.", slow["text"])
+        self.assertIn("on 2 hosts", slow["text"])
+        self.assertIn("Plays:\n  deploy: ", stats["text"])
+        summary = stats["text"].split("Slowest tasks (p50/p95 across hosts):\n")[1]
+        self.assertTrue(summary.startswith("  [deploy] install: 0.0"))
+        self.assertIn("\n  [deploy] restart: 0.0", summary)
+
+    def test_to_millis_keeps_the_milliseconds(self):
+        dt = datetime.fromtimestamp(1700000000.123)
+        self.assertEqual(grafana_annotations.to_millis(dt), 1700000000123)
+
+    def test_percentile(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(grafana_annotations.percentile(values, 50), 3)
+        self.assertEqual(grafana_annotations.percentile(values, 95), 5)
+        self.assertEqual(grafana_annotations.percentile([2], 95), 2)
+
+    def test_annotations_are_sent_to_all_targets(self):
+        other = GrafanaServer()
+        thread = threading.Thread(target=other.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(other.server_close)
+        self.addCleanup(other.shutdown)
+        targets_file = tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False)
+        self.addCleanup(os.remove, targets_file.name)
+        with targets_file:
+            targets_file.write(
+                "- url: %s\n"
+                "  api_key: dr\n"
+                "  dashboard_uid: deploys\n"
+                "  panel_ids: [3, 4]\n" % other.url
+            )
+
+        callback = self.callback(
+            grafana_api_key="prod",
+            grafana_dashboard_id=1,
+            grafana_targets_file=targets_file.name,
+        )
+        callback.v2_playbook_on_start(Playbook())
+        callback.v2_playbook_on_stats(Stats())
+
+        self.assertEqual(
+            [
+                (headers["Authorization"], data.get("dashboardId"))
+                for _, headers, data in self.server.requests
+            ],
+            [("Bearer prod", None), ("Bearer prod", 1)],
+        )
+        self.assertEqual(
+            [
+                (
+                    headers["Authorization"],
+                    data.get("dashboardUID"),
+                    data.get("panelId"),
+                )
+                for _, headers, data in other.requests
+            ],
+            [
+                ("Bearer dr", None, None),
+                ("Bearer dr", "deploys", 3),
+                ("Bearer dr", "deploys", 4),
+            ],
+        )
+        self.assertEqual(len(other.connections), 1)
+
+    def test_invalid_targets_file_disables_the_callback(self):
+        targets_file = tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False)
+        self.addCleanup(os.remove, targets_file.name)
+        with targets_file:
+            targets_file.write("- api_key: dr\n")
+
+        callback = self.callback(grafana_targets_file=targets_file.name)
+        self.assertTrue(callback.disabled)
+        callback._display.warning.assert_called_once_with(
+            "Could not read the Grafana targets of %s: each target must be a dict "
+            "with an url" % targets_file.name
+        )
+
+    def test_no_url_disables_the_callback(self):
+        callback = callback_loader.get("community.grafana.grafana_annotations")
+        callback._display = MagicMock()
+        callback.set_options(direct={})
+        self.assertTrue(callback.disabled)
+        self.assertEqual(callback.targets, [])
+
+
+class GrafanaAnnotationSenderTest(TestCase):
+    def test_path_keeps_the_query(self):
+        sender = grafana_annotations.GrafanaAnnotationSender(
+            "https://grafana:3000/api/annotations?orgId=2", {}
+        )
+        self.assertEqual(sender.path, "/api/annotations?orgId=2")
+        self.assertEqual(sender.url.port, 3000)
@@ -0,0 +1,173 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+from ansible.errors import AnsibleError
+from ansible.plugins.loader import lookup_loader
+from ansible_collections.community.grafana.plugins.lookup import grafana_api
+from ansible_collections.community.grafana.plugins.plugin_utils import base
+import json
+import shutil
+import tempfile
+
+__metaclass__ = type
+
+OPEN_URL = "ansible_collections.community.grafana.plugins.plugin_utils.base.open_url"
+
+
+class MockedReponse(object):
+    def __init__(self, data, code=200):
+        self.data = data
+        self.code = code
+
+    def read(self):
+        return json.dumps(self.data)
+
+    def getcode(self):
+        return self.code
+
+
+class GrafanaApiLookupTest(TestCase):
+    def setUp(self):
+        self.lookup = lookup_loader.get("community.grafana.grafana_api")
+        memory = patch.dict(base.GrafanaResultCache.memory, clear=True)
+        memory.start()
+        self.addCleanup(memory.stop)
+        # temporary directory of the run
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        local_tmp = patch.object(grafana_api.C, "DEFAULT_LOCAL_TMP", self.tmpdir)
+        local_tmp.start()
+        self.addCleanup(local_tmp.stop)
+
+    @patch(OPEN_URL)
+    def test_endpoint_is_queried_with_params(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse({"uid": "prom", "name": "Prom"})
+        result = self.lookup.run(
+            ["/api/datasources/name/Prom?x=1"],
+            {},
+            grafana_url="http://grafana",
+            grafana_api_key="key",
+            params={"y": True, "z": ["a", "b"]},
+        )
+        self.assertEqual(result, [{"uid": "prom", "name": "Prom"}])
+        self.assertEqual(
+            mock_open_url.call_args[0][0],
+            "http://grafana/api/datasources/name/Prom?x=1&y=true&z=a&z=b",
+        )
+        self.assertEqual(
+            mock_open_url.call_args[1]["headers"]["Authorization"], "Bearer key"
+        )
+
+    @patch(OPEN_URL)
+    def test_paginated_endpoint_returns_all_items(self, mock_open_url):
+        mock_open_url.side_effect = [
+            MockedReponse({"teams": [{"id": 1}, {"id": 2}], "totalCount": 3}),
+            MockedReponse({"teams": [{"id": 3}], "totalCount": 3}),
+        ]
+        result = self.lookup.run(
+            ["/api/teams/search"],
+            {},
+            grafana_url="http://grafana",
+            grafana_api_key="key",
+            page_size=2,
+        )
+        self.assertEqual(result, [[{"id": 1}, {"id": 2}, {"id": 3}]])
+        self.assertEqual(
+            mock_open_url.call_args[0][0],
+            "http://grafana/api/teams/search?perpage=2&page=2",
+        )
+
+    @patch(OPEN_URL)
+    def test_search_page_size_is_capped_by_grafana_limit(self, mock_open_url):
+        dashboards = [{"uid": str(index)} for index in range(7000)]
+        mock_open_url.side_effect = [
+            MockedReponse(dashboards[:5000]),
+            MockedReponse(dashboards[5000:]),
+        ]
+        result = self.lookup.run(
+            ["/api/search"],
+            {},
+            grafana_url="http://grafana",
+            grafana_api_key="key",
+            page_size=10000,
+        )
+        self.assertEqual(len(result[0]), 7000)
+        self.assertEqual(
+            mock_open_url.call_args[0][0],
+            "http://grafana/api/search?limit=5000&page=2",
+        )
+
+    @patch(OPEN_URL)
+    def test_responses_are_cached(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse([{"id": 1, "uid": "a"}])
+        for run in range(3):
+            result = self.lookup.run(
+                ["/api/datasources"],
+                {},
+                grafana_url="http://grafana",
+                grafana_user="admin",
+                grafana_password="pw",
+            )
+        self.assertEqual(result, [[{"id": 1, "uid": "a"}]])
+        # org switch and request
+        self.assertEqual(mock_open_url.call_count, 2)
+
+    @patch(OPEN_URL)
+    def test_responses_are_shared_by_the_forks_of_the_run(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse([{"id": 1, "uid": "a"}])
+        for run in range(2):
+            # each host is templated in a new fork, with an empty memory cache
+            base.GrafanaResultCache.memory.clear()
+            result = self.lookup.run(
+                ["/api/datasources"],
+                {},
+                grafana_url="http://grafana",
+                grafana_api_key="key",
+            )
+        self.assertEqual(result, [[{"id": 1, "uid": "a"}]])
+        self.assertEqual(mock_open_url.call_count, 1)
+
+    @patch(OPEN_URL)
+    def test_null_responses_are_cached(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse(None)
+        for run in range(2):
+            result = self.lookup.run(
+                ["/api/user/preferences"],
+                {},
+                grafana_url="http://grafana",
+                grafana_api_key="key",
+            )
+        self.assertEqual(result, [None])
+        self.assertEqual(mock_open_url.call_count, 1)
+
+    @patch(OPEN_URL)
+    def test_cache_can_be_disabled(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse([])
+        for run in range(2):
+            self.lookup.run(
+                ["/api/folders"],
+                {},
+                grafana_url="http://grafana",
+                grafana_api_key="key",
+                cache_ttl=0,
+            )
+        self.assertEqual(mock_open_url.call_count, 2)
+
+    @skipUnless(grafana_api.HAS_JMESPATH, "jmespath is not installed")
+    @patch(OPEN_URL)
+    def test_query_projects_the_response(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse([{"title": "A", "uid": "a"}])
+        result = self.lookup.run(
+            ["/api/folders"],
+            {},
+            grafana_url="http://grafana",
+            grafana_api_key="key",
+            query="[].uid",
+        )
+        self.assertEqual(result, [["a"]])
+
+    @skipUnless(not grafana_api.HAS_JMESPATH, "jmespath is installed")
+    def test_query_requires_jmespath(self):
+        with self.assertRaises(AnsibleError):
+            self.lookup.run(["/api/folders"], {}, query="[].uid")
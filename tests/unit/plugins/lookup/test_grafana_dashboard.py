@@ -0,0 +1,215 @@
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from unittest.mock import patch
+from ansible.errors import AnsibleError
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.plugins.loader import lookup_loader
+from ansible_collections.community.grafana.plugins.lookup import grafana_dashboard
+from ansible_collections.community.grafana.plugins.plugin_utils import base
+import json
+import os
+import shutil
+import stat
+import tempfile
+
+__metaclass__ = type
+
+OPEN_URL = "ansible_collections.community.grafana.plugins.plugin_utils.base.open_url"
+
+
+class MockedReponse(object):
+    def __init__(self, data, code=200):
+        self.data = data
+        self.code = code
+
+    def read(self):
+        return json.dumps(self.data)
+
+    def getcode(self):
+        return self.code
+
+
+DASHBOARDS = [
+    {"uid": "a", "title": "A", "type": "dash-db"},
+    {"uid": "b", "title": "B", "type": "dash-db"},
+]
+
+
+class GrafanaDashboardLookupTest(TestCase):
+    def setUp(self):
+        self.lookup = lookup_loader.get("community.grafana.grafana_dashboard")
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.cache_path = os.path.join(self.tmpdir, "cache")
+        memory = patch.dict(base.GrafanaResultCache.memory, clear=True)
+        memory.start()
+        self.addCleanup(memory.stop)
+
+    @patch(OPEN_URL)
+    def test_without_cache_every_call_searches(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse(DASHBOARDS)
+        for run in range(2):
+            result = self.lookup.run(
+                ["grafana_url=http://grafana grafana_api_key=key search=foo"], {}
+            )
+        self.assertEqual(result, DASHBOARDS)
+        self.assertEqual(mock_open_url.call_count, 2)
+
+    @patch(OPEN_URL)
+    def test_results_are_cached_by_search_and_credentials(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse(DASHBOARDS)
+        terms = ["grafana_url=http://grafana grafana_api_key=key search=foo"]
+        for run in range(3):
+            self.lookup.run(terms, {}, cache_ttl=60)
+        self.assertEqual(mock_open_url.call_count, 1)
+
+        self.lookup.run(
+            ["grafana_url=http://grafana grafana_api_key=other search=foo"],
+            {},
+            cache_ttl=60,
+        )
+        self.lookup.run(
+            ["grafana_url=http://grafana grafana_api_key=key search=bar"],
+            {},
+            cache_ttl=60,
+        )
+        self.assertEqual(mock_open_url.call_count, 3)
+
+    @patch(OPEN_URL)
+    def test_disk_cache_is_shared(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse(DASHBOARDS)
+        terms = ["grafana_url=http://grafana grafana_user=admin grafana_password=pw"]
+        self.lookup.run(terms, {}, cache_ttl=60, cache_path=self.cache_path)
+        # org switch and search
+        self.assertEqual(mock_open_url.call_count, 2)
+
+        base.GrafanaResultCache.memory.clear()
+        result = self.lookup.run(terms, {}, cache_ttl=60, cache_path=self.cache_path)
+        self.assertEqual(result, DASHBOARDS)
+        self.assertEqual(mock_open_url.call_count, 2)
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache_path).st_mode), 0o700)
+        for name in os.listdir(self.cache_path):
+            self.assertEqual(
+                stat.S_IMODE(os.stat(os.path.join(self.cache_path, name)).st_mode),
+                0o600,
+            )
+            self.assertNotIn("pw", open(os.path.join(self.cache_path, name)).read())
+
+    @patch(OPEN_URL)
+    def test_filters_are_sent_to_grafana(self, mock_open_url):
+        mock_open_url.return_value = MockedReponse(DASHBOARDS)
+        result = self.lookup.run(
+            [
+                "grafana_url=http://grafana grafana_api_key=key search=foo&bar"
+                " tag=prod,team folder_uids=ops type=dash-db starred=true"
+                " fields=uid,title"
+            ],
+            {},
+            dashboard_uids=["a", "b"],
+        )
+        self.assertEqual(
+            mock_open_url.call_args[0][0],
+            "http://grafana/api/search?query=foo%26bar&tag=prod&tag=team"
+            "&folderUIDs=ops&dashboardUIDs=a&dashboardUIDs=b&type=dash-db&starred=true"
+            "&limit=1000&page=1",
+        )
+        self.assertEqual(
+            result, [{"uid": "a", "title": "A"}, {"uid": "b", "title": "B"}]
+        )
+
+    def test_invalid_type_fails(self):
+        with self.assertRaises(AnsibleError):
+            self.lookup.run(
+                ["grafana_url=http://grafana grafana_api_key=key type=dashboard"], {}
+            )
+
+    @patch(OPEN_URL)
+    def test_all_pages_are_listed(self, mock_open_url):
+        pages = [
+            [{"uid": "a"}, {"uid": "b"}],
+            [{"uid": "c"}, {"uid": "d"}],
+            [{"uid": "e"}],
+        ]
+        mock_open_url.side_effect = [MockedReponse(page) for page in pages]
+        result = self.lookup.run(
+            ["grafana_url=http://grafana grafana_api_key=key page_size=2"], {}
+        )
+        self.assertEqual([item["uid"] for item in result], ["a", "b", "c", "d", "e"])
+        self.assertEqual(
+            [call[0][0] for call in mock_open_url.call_args_list],
+            [
+                "http://grafana/api/search?limit=2&page=1",
+                "http://grafana/api/search?limit=2&page=2",
+                "http://grafana/api/search?limit=2&page=3",
+            ],
+        )
+
+    @patch(OPEN_URL)
+    def test_page_size_is_capped_by_grafana_limit(self, mock_open_url):
+        dashboards = [{"uid": str(index)} for index in range(7000)]
+        mock_open_url.side_effect = [
+            MockedReponse(dashboards[:5000]),
+            MockedReponse(dashboards[5000:]),
+        ]
+        result = self.lookup.run(
+            ["grafana_url=http://grafana grafana_api_key=key page_size=10000"], {}
+        )
+        self.assertEqual(len(result), 7000)
+        self.assertEqual(
+            [call[0][0] for call in mock_open_url.call_args_list],
+            [
+                "http://grafana/api/search?limit=5000&page=1",
+                "http://grafana/api/search?limit=5000&page=2",
+            ],
+        )
+
+    @patch(OPEN_URL)
+    def test_all_organizations_are_searched(self, mock_open_url):
+        org_dashboards = {"1": [{"uid": "a", "title": "A"}], "2": [{"uid": "b"}]}
+
+        def open_url(url, headers=None, **kwargs):
+            if url == "http://grafana/api/user/orgs":
+                return MockedReponse(
+                    [
+                        {"orgId": 1, "name": "Main", "role": "Admin"},
+                        {"orgId": 2, "name": "Ops", "role": "Viewer"},
+                    ]
+                )
+            self.assertNotIn("/api/user/using", url)
+            return MockedReponse(org_dashboards[headers["X-Grafana-Org-Id"]])
+
+        mock_open_url.side_effect = open_url
+        result = self.lookup.run(
+            ["grafana_url=http://grafana grafana_user=admin grafana_password=pw"],
+            {},
+            org_ids="all",
+            fields=["uid"],
+        )
+        self.assertEqual(result, [{"uid": "a", "orgId": 1}, {"uid": "b", "orgId": 2}])
+        self.assertEqual(mock_open_url.call_count, 3)
+
+    @patch(OPEN_URL)
+    def test_organizations_the_user_isnt_member_of_are_skipped(self, mock_open_url):
+        def open_url(url, headers=None, **kwargs):
+            if headers["X-Grafana-Org-Id"] == "3":
+                raise HTTPError(url, 401, "Unauthorized", {}, None)
+            return MockedReponse([{"uid": "a"}])
+
+        mock_open_url.side_effect = open_url
+        with patch.object(grafana_dashboard.display, "warning") as warning:
+            result = self.lookup.run(
+                ["grafana_url=http://grafana grafana_user=admin grafana_password=pw"],
+                {},
+                org_ids="1,3",
+                fields=["uid"],
+            )
+        self.assertEqual(result, [{"uid": "a", "orgId": 1}])
+        self.assertIn("Skipping grafana organization 3", warning.call_args[0][0])
+
+    def test_org_ids_requires_basic_auth(self):
+        with self.assertRaises(AnsibleError):
+            self.lookup.run(
+                ["grafana_url=http://grafana grafana_api_key=key org_ids=1,2"], {}
+            )